@@ -1,10 +1,29 @@
-from django.contrib import admin
+from typing import Any
 
-from .models import Comment, Post
+from django.contrib import admin, messages
+from django.db.models import QuerySet
+from django.http import HttpRequest, StreamingHttpResponse
+
+from . import exports, moderation
+from .models import Comment, OutgoingEmail, Post
+
+
+class ExportActionsMixin:
+    """
+    Admin actions that stream the selected rows as a file download.
+    """
+
+    @admin.action(description="Export selected rows as CSV")
+    def export_csv(self, request: HttpRequest, queryset: QuerySet[Any]) -> StreamingHttpResponse:
+        return exports.streaming_response(request, queryset, "csv")
+
+    @admin.action(description="Export selected rows as JSON Lines")
+    def export_jsonl(self, request: HttpRequest, queryset: QuerySet[Any]) -> StreamingHttpResponse:
+        return exports.streaming_response(request, queryset, "jsonl")
 
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin[Post]):
+class PostAdmin(ExportActionsMixin, admin.ModelAdmin[Post]):
     list_display = ["title", "slug", "author", "publish", "status"]
     list_filter = ["status", "created", "publish", "author"]
     search_fields = ["title", "body"]
@@ -13,10 +32,47 @@ class PostAdmin(admin.ModelAdmin[Post]):
     date_hierarchy = "publish"
     ordering = ["status", "publish"]
     show_facets = admin.ShowFacets.ALWAYS
+    actions = ["export_csv", "export_jsonl"]
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin[Comment]):
+class CommentAdmin(ExportActionsMixin, admin.ModelAdmin[Comment]):
     list_display = ["name", "email", "post", "created", "active"]
     list_filter = ["active", "created", "updated"]
     search_fields = ["name", "email", "body"]
+    actions = [
+        "activate_comments",
+        "deactivate_comments",
+        "delete_comments",
+        "export_csv",
+        "export_jsonl",
+    ]
+
+    def get_actions(self, request: HttpRequest) -> dict[str, Any]:
+        actions = super().get_actions(request)
+        # Superseded by `delete_comments`, which doesn't load and delete each row.
+        actions.pop("delete_selected", None)
+        return actions
+
+    @admin.action(description="Activate selected comments", permissions=["change"])
+    def activate_comments(self, request: HttpRequest, queryset: QuerySet[Comment]) -> None:
+        updated = moderation.set_active(queryset, active=True)
+        self.message_user(request, f"{updated} comment(s) activated.", messages.SUCCESS)
+
+    @admin.action(description="Deactivate selected comments", permissions=["change"])
+    def deactivate_comments(self, request: HttpRequest, queryset: QuerySet[Comment]) -> None:
+        updated = moderation.set_active(queryset, active=False)
+        self.message_user(request, f"{updated} comment(s) deactivated.", messages.SUCCESS)
+
+    @admin.action(description="Delete selected comments", permissions=["delete"])
+    def delete_comments(self, request: HttpRequest, queryset: QuerySet[Comment]) -> None:
+        deleted = moderation.delete(queryset)
+        self.message_user(request, f"{deleted} comment(s) deleted.", messages.SUCCESS)
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin[OutgoingEmail]):
+    list_display = ["to", "subject", "status", "attempts", "next_attempt", "sent"]
+    list_filter = ["status", "created"]
+    search_fields = ["to", "subject"]
+    readonly_fields = ["created", "sent", "last_error"]
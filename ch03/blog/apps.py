@@ -4,3 +4,18 @@ from django.apps import AppConfig
 class BlogConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "blog"
+
+    def ready(self) -> None:
+        # Connects the cache invalidation receivers and registers the checks
+        from . import (  # noqa: F401
+            archive,
+            authorstats,
+            autocomplete,
+            bloom,
+            bus,
+            checks,
+            lookups,
+            pagecache,
+            tagcounts,
+            tagindex,
+        )
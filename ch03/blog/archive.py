@@ -0,0 +1,116 @@
+"""
+Monthly counts of the published posts, for the archive pages and the sidebar.
+
+`ArchiveMonth` rows are recounted for the months a change touches: a post
+published, unpublished, moved to another date or deleted. Counting a month,
+like listing the posts of a year or a month, is a range scan of the `publish`
+index between the bounds of the period, where `publish__year` and
+`publish__month` would extract them from every row. The months are kept in the
+two-tier cache until their counts change.
+"""
+
+import operator
+from collections.abc import Iterable
+from datetime import datetime
+from functools import reduce
+from typing import Any
+
+from django.db import transaction
+from django.db.models import Q, QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import ArchiveMonth, Post, saved
+from .tiered import cache
+
+MONTHS_KEY = "blog:archive:months"
+MONTHS_TIMEOUT = 24 * 60 * 60
+
+
+def bounds(year: int, month: int | None = None) -> tuple[datetime, datetime]:
+    """
+    The start and the end, excluded, of a year or a month in the current time
+    zone. Raises `ValueError` for a period out of range.
+    """
+    tz = timezone.get_current_timezone()
+    if month is None:
+        return datetime(year, 1, 1, tzinfo=tz), datetime(year + 1, 1, 1, tzinfo=tz)
+    start = datetime(year, month, 1, tzinfo=tz)
+    return start, datetime(year + month // 12, month % 12 + 1, 1, tzinfo=tz)
+
+
+def published_in(year: int, month: int | None = None) -> QuerySet[Post]:
+    """
+    The posts published in a year or a month. Raises `ValueError` for a period
+    out of range.
+    """
+    start, end = bounds(year, month)
+    return Post.published.filter(publish__gte=start, publish__lt=end)
+
+
+def _month(publish: datetime | str) -> tuple[int, int]:
+    # A post saved with its date as a string still has it.
+    value: datetime = Post._meta.get_field("publish").to_python(publish)
+    # Archive URLs have the date in the current time zone, as post URLs do.
+    local = timezone.localtime(value)
+    return local.year, local.month
+
+
+def refresh(months: Iterable[tuple[int, int]]) -> None:
+    """
+    Recount the published posts of the months.
+    """
+    counts = {(year, month): published_in(year, month).count() for year, month in set(months)}
+    if not counts:
+        return
+    empty = [Q(year=year, month=month) for (year, month), count in counts.items() if not count]
+    if empty:
+        ArchiveMonth.objects.filter(reduce(operator.or_, empty)).delete()
+    ArchiveMonth.objects.bulk_create(
+        [ArchiveMonth(year=y, month=m, posts=count) for (y, m), count in counts.items() if count],
+        update_conflicts=True,
+        unique_fields=["year", "month"],
+        update_fields=["posts"],
+    )
+    # Not before the commit, or a request meanwhile could cache the old months again.
+    transaction.on_commit(lambda: cache.delete(MONTHS_KEY))
+
+
+def rebuild() -> None:
+    """
+    Recount every month, after writes that send no signals.
+    """
+    months = set(ArchiveMonth.objects.values_list("year", "month"))
+    months.update(map(_month, Post.published.values_list("publish", flat=True)))
+    refresh(months)
+
+
+def months(fresh: bool = False) -> list[ArchiveMonth]:
+    """
+    The months with published posts, the latest first. With `fresh`, bypasses
+    the cache.
+    """
+    found: list[ArchiveMonth] | None = None if fresh else cache.get(MONTHS_KEY)
+    if found is None:
+        found = list(ArchiveMonth.objects.all())
+        if not fresh:
+            cache.set(MONTHS_KEY, found, MONTHS_TIMEOUT)
+    return found
+
+
+@receiver(post_save, sender=Post)
+def _post_saved(sender: type[Post], instance: Post, **kwargs: Any) -> None:
+    months = []
+    # The month the post was counted in, if it was published
+    if (row := saved(instance)) and row["status"] == Post.Status.PUBLISHED:
+        months.append(_month(row["publish"]))
+    if instance.status == Post.Status.PUBLISHED:
+        months.append(_month(instance.publish))
+    refresh(months)
+
+
+@receiver(post_delete, sender=Post)
+def _post_deleted(sender: type[Post], instance: Post, **kwargs: Any) -> None:
+    if instance.status == Post.Status.PUBLISHED:
+        refresh([_month(instance.publish)])
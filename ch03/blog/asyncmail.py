@@ -0,0 +1,287 @@
+"""
+Asyncio SMTP delivery for outgoing blog mail.
+
+`AsyncEmailBackend` sends messages over a few concurrent SMTP connections,
+pipelining the envelope commands of each message when the server supports it,
+so many messages go out without a thread or a connection per message.
+"""
+
+import asyncio
+import base64
+import re
+import ssl
+from collections.abc import Iterator, Sequence
+from smtplib import (
+    SMTPDataError,
+    SMTPException,
+    SMTPRecipientsRefused,
+    SMTPResponseException,
+    SMTPSenderRefused,
+    SMTPServerDisconnected,
+)
+
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.core.mail.message import sanitize_address
+from django.core.mail.utils import DNS_NAME
+
+CONNECTIONS = 4
+# Seconds to wait before each new attempt to connect, after which the
+# messages left fail instead of each trying a connection of its own
+RECONNECT_DELAYS = (0.5, 2.0)
+
+# Lines starting with a dot must be escaped inside the DATA section (RFC 5321, 4.5.2).
+DOT_STUFFING = re.compile(rb"^\.", re.MULTILINE)
+
+
+class AsyncSMTPConnection:
+    """
+    A single SMTP session on asyncio streams.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str = "",
+        password: str = "",
+        use_tls: bool = False,
+        use_ssl: bool = False,
+        timeout: float | None = None,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.use_ssl = use_ssl
+        self.timeout = timeout
+        self.extensions: set[str] = set()
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+
+    async def _read_reply(self) -> tuple[int, bytes]:
+        assert self._reader is not None
+        lines = []
+        while True:
+            line = await asyncio.wait_for(self._reader.readline(), self.timeout)
+            if not line:
+                raise SMTPServerDisconnected("Connection unexpectedly closed")
+            lines.append(line[4:].rstrip())
+            # Continuation lines have a dash after the code, the last one a space.
+            if line[3:4] != b"-":
+                return int(line[:3]), b"\n".join(lines)
+
+    async def _ask(self, command: str) -> tuple[int, bytes]:
+        assert self._writer is not None
+        self._writer.write(command.encode() + b"\r\n")
+        return await self._read_reply()
+
+    async def _command(self, command: str, expect: int = 250) -> bytes:
+        code, reply = await self._ask(command)
+        if code != expect:
+            raise SMTPResponseException(code, reply)
+        return reply
+
+    async def _ehlo(self) -> None:
+        reply = await self._command(f"EHLO {DNS_NAME}")
+        self.extensions = {line.split()[0].upper().decode() for line in reply.splitlines()[1:]}
+
+    async def open(self) -> None:
+        """
+        Connect, greet and log in. On failure the connection is closed, never
+        left half open.
+        """
+        context = ssl.create_default_context() if self.use_tls or self.use_ssl else None
+        self._reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port, ssl=context if self.use_ssl else None),
+            self.timeout,
+        )
+        self._writer = writer
+        try:
+            code, reply = await self._read_reply()
+            if code != 220:
+                raise SMTPResponseException(code, reply)
+            await self._ehlo()
+            if self.use_tls and context is not None:
+                await self._command("STARTTLS", expect=220)
+                await writer.start_tls(context, server_hostname=self.host)
+                await self._ehlo()
+            if self.username:
+                await self._login()
+        except BaseException:
+            await self.close()
+            raise
+
+    async def _login(self) -> None:
+        token = base64.b64encode(f"\0{self.username}\0{self.password}".encode()).decode()
+        await self._command(f"AUTH PLAIN {token}", expect=235)
+
+    async def send(self, message: EmailMessage) -> None:
+        assert self._writer is not None
+        encoding = message.encoding or settings.DEFAULT_CHARSET
+        sender = sanitize_address(message.from_email, encoding)
+        recipients = [sanitize_address(addr, encoding) for addr in message.recipients()]
+        commands = [f"MAIL FROM:<{sender}>", *(f"RCPT TO:<{r}>" for r in recipients)]
+
+        data_reply: tuple[int, bytes] | None = None
+        if "PIPELINING" in self.extensions:
+            # One write and one round trip for the whole envelope (RFC 2920).
+            self._writer.write("".join(f"{c}\r\n" for c in [*commands, "DATA"]).encode())
+            replies = [await self._read_reply() for _ in commands]
+            data_reply = await self._read_reply()
+        else:
+            replies = [await self._ask(command) for command in commands]
+
+        (mail_code, mail_reply), *rcpt_replies = replies
+        refused = {
+            r: (code, reply)
+            for r, (code, reply) in zip(recipients, rcpt_replies, strict=True)
+            if code not in (250, 251)
+        }
+        error: SMTPException | None = None
+        if mail_code != 250:
+            error = SMTPSenderRefused(mail_code, mail_reply, sender)
+        elif len(refused) == len(recipients):
+            error = SMTPRecipientsRefused(refused)
+        if error is not None:
+            if data_reply is not None and data_reply[0] == 354:
+                # The server waits for the message anyway: an empty one ends the
+                # data phase, and is refused for want of recipients.
+                self._writer.write(b".\r\n")
+                await self._read_reply()
+            await self.reset()
+            raise error
+        if data_reply is None:
+            # Without pipelining, DATA only follows an accepted envelope.
+            data_reply = await self._ask("DATA")
+        data_code, data_text = data_reply
+        if data_code != 354:
+            await self.reset()
+            raise SMTPDataError(data_code, data_text)
+
+        data = message.message().as_bytes(linesep="\r\n")
+        data = DOT_STUFFING.sub(b"..", data)
+        if not data.endswith(b"\r\n"):
+            data += b"\r\n"
+        self._writer.write(data + b".\r\n")
+        await self._writer.drain()
+        code, reply = await self._read_reply()
+        if code != 250:
+            raise SMTPDataError(code, reply)
+
+    async def reset(self) -> None:
+        await self._command("RSET")
+
+    async def close(self) -> None:
+        if self._writer is None:
+            return
+        try:
+            await self._command("QUIT", expect=221)
+        except (SMTPException, OSError, TimeoutError):
+            pass
+        finally:
+            self._writer.close()
+            self._writer = None
+            self._reader = None
+
+
+class AsyncEmailBackend:
+    """
+    Sends messages over at most `connections` concurrent SMTP sessions,
+    configured with the same settings as Django's SMTP backend.
+    """
+
+    def __init__(self, connections: int = CONNECTIONS, fail_silently: bool = False) -> None:
+        self.connections = connections
+        self.fail_silently = fail_silently
+
+    def _connection(self) -> AsyncSMTPConnection:
+        return AsyncSMTPConnection(
+            host=settings.EMAIL_HOST,
+            port=settings.EMAIL_PORT,
+            username=settings.EMAIL_HOST_USER,
+            password=settings.EMAIL_HOST_PASSWORD,
+            use_tls=settings.EMAIL_USE_TLS,
+            use_ssl=settings.EMAIL_USE_SSL,
+            timeout=settings.EMAIL_TIMEOUT,
+        )
+
+    async def _open(self) -> AsyncSMTPConnection:
+        """
+        A new session, retried after each of `RECONNECT_DELAYS`.
+        """
+        delays = iter(RECONNECT_DELAYS)
+        while True:
+            connection = self._connection()
+            try:
+                # Closes itself if it fails.
+                await connection.open()
+                return connection
+            except (OSError, SMTPException):
+                if (delay := next(delays, None)) is None:
+                    raise
+            await asyncio.sleep(delay)
+
+    async def _worker(
+        self,
+        pending: Iterator[tuple[int, EmailMessage]],
+        results: list[Exception | None],
+    ) -> None:
+        connection: AsyncSMTPConnection | None = None
+        try:
+            # Workers share one iterator, so each message is taken exactly once.
+            for index, message in pending:
+                if connection is None:
+                    try:
+                        connection = await self._open()
+                    except Exception as e:
+                        # The server is down or refuses us, fail the batch.
+                        results[index] = e
+                        for rest, _ in pending:
+                            results[rest] = e
+                        return
+                try:
+                    await connection.send(message)
+                    results[index] = None
+                except Exception as e:
+                    results[index] = e
+                    # A rejected message leaves the session usable, anything else doesn't.
+                    if not isinstance(e, SMTPResponseException | SMTPRecipientsRefused):
+                        await connection.close()
+                        connection = None
+        finally:
+            if connection is not None:
+                await connection.close()
+
+    async def send_each(self, messages: Sequence[EmailMessage]) -> list[Exception | None]:
+        """
+        Send the messages and return, for each one, the error or `None` if it was sent.
+        """
+        results: list[Exception | None] = [None] * len(messages)
+        pending = iter(list(enumerate(messages)))
+        workers = min(self.connections, len(messages))
+        async with asyncio.TaskGroup() as group:
+            for _ in range(workers):
+                group.create_task(self._worker(pending, results))
+        return results
+
+    async def send_messages(self, messages: Sequence[EmailMessage]) -> int:
+        """
+        Like `BaseEmailBackend.send_messages()`: returns the number of messages sent.
+        """
+        results = await self.send_each(messages)
+        errors = [e for e in results if e is not None]
+        if errors and not self.fail_silently:
+            raise errors[0]
+        return len(results) - len(errors)
+
+
+async def asend_mail(
+    subject: str, message: str, recipient_list: list[str], from_email: str | None = None
+) -> int:
+    """
+    Async counterpart of `django.core.mail.send_mail()`.
+    """
+    email = EmailMessage(subject, message, from_email, recipient_list)
+    return await AsyncEmailBackend(connections=1).send_messages([email])
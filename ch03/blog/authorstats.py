@@ -0,0 +1,166 @@
+"""
+Per-author totals of the published posts, for the author pages.
+
+An `AuthorStats` row holds an author's number of published posts, the date of
+the latest and the number of active comments on them. The rows of the authors
+a change touches are recounted with two grouped queries: a post saved, for
+instance when its status flips or its author changes, or deleted, and comments
+edited or moderated. A comment added or deleted only moves its author's count
+by one, in place. An author page then reads the totals with the
+author, and pages through the posts by keyset: each page starts before the
+date and id of the last post of the previous one, on an index of the author's
+posts by date, whatever the page.
+"""
+
+from collections.abc import Iterable
+from datetime import UTC, datetime
+from typing import Any
+
+from django.contrib.auth.models import User
+from django.db.models import Count, F, Max, Q, QuerySet
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import AuthorStats, Comment, Post, saved
+from .signals import comments_moderated
+
+PER_PAGE = 3
+
+CURSOR_FORMAT = "%Y%m%d%H%M%S%f"
+
+POST_ATTR = "_author_stats_post"
+
+
+def refresh(author_ids: Iterable[int]) -> None:
+    """
+    Recount the published posts and their comments of the authors.
+    """
+    author_ids = set(author_ids)
+    if not author_ids:
+        return
+    posts = {
+        row["author_id"]: row
+        for row in Post.published.filter(author_id__in=author_ids)
+        .values("author_id")
+        .annotate(posts=Count("id"), last=Max("publish"))
+    }
+    comments = dict(
+        Comment.objects.filter(
+            active=True,
+            post__status=Post.Status.PUBLISHED,
+            post__author_id__in=author_ids,
+        )
+        .values("post__author_id")
+        .annotate(comments=Count("id"))
+        .values_list("post__author_id", "comments")
+    )
+    AuthorStats.objects.bulk_create(
+        [
+            AuthorStats(
+                author_id=author_id,
+                published_posts=posts.get(author_id, {}).get("posts", 0),
+                last_published=posts.get(author_id, {}).get("last"),
+                comments=comments.get(author_id, 0),
+            )
+            # Users deleted meanwhile have lost their row with them.
+            for author_id in User.objects.filter(id__in=author_ids).values_list("id", flat=True)
+        ],
+        update_conflicts=True,
+        unique_fields=["author"],
+        update_fields=["published_posts", "last_published", "comments"],
+    )
+
+
+def rebuild() -> None:
+    """
+    Recount every author, after writes that send no signals.
+    """
+    refresh(Post.objects.values_list("author_id", flat=True).distinct())
+
+
+def cursor(post: Post) -> str:
+    """
+    Where the page after the one ending with `post` starts.
+    """
+    return f"{post.publish.astimezone(UTC).strftime(CURSOR_FORMAT)}-{post.id}"
+
+
+def page(author: User, before: str | None = None) -> tuple[list[Post], str | None]:
+    """
+    The author's published posts before `cursor`, newest first, and the cursor
+    of the next page, if any. Raises `ValueError` for a malformed cursor.
+    """
+    posts: QuerySet[Post] = Post.published.filter(author=author)
+    if before:
+        publish, post_id = before.split("-")
+        start = datetime.strptime(publish, CURSOR_FORMAT).replace(tzinfo=UTC)
+        posts = posts.filter(Q(publish__lt=start) | Q(publish=start, id__lt=int(post_id)))
+    # One more tells whether there is a next page.
+    posts = posts.prefetch_related("tags").order_by("-publish", "-id")  # type: ignore[misc]
+    found = list(posts[: PER_PAGE + 1])
+    if len(found) > PER_PAGE:
+        return found[:PER_PAGE], cursor(found[PER_PAGE - 1])
+    return found, None
+
+
+def _post_author_ids(post_ids: Iterable[int]) -> set[int]:
+    return set(Post.objects.filter(id__in=set(post_ids)).values_list("author_id", flat=True))
+
+
+def _deleting_user(kwargs: dict[str, Any]) -> bool:
+    # The posts and comments of a deleted user go first, and their row with them.
+    origin = kwargs.get("origin")
+    return isinstance(origin, User) or (isinstance(origin, QuerySet) and origin.model is User)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def _post_changed(sender: type[Post], instance: Post, **kwargs: Any) -> None:
+    if _deleting_user(kwargs):
+        return
+    author_ids = [instance.author_id]
+    # The author the post was counted for, if it changes
+    if (row := saved(instance)) is not None:
+        author_ids.append(row["author_id"])
+    refresh(author_ids)
+
+
+def _count_comment(comment: Comment, delta: int) -> None:
+    if comment.active:
+        AuthorStats.objects.filter(
+            author__blog_posts=comment.post_id,
+            author__blog_posts__status=Post.Status.PUBLISHED,
+            comments__gte=-delta,
+        ).update(comments=F("comments") + delta)
+
+
+@receiver(pre_save, sender=Comment)
+def _comment_saving(sender: type[Comment], instance: Comment, **kwargs: Any) -> None:
+    # The post the comment was counted for, if it moves
+    if instance.pk is not None:
+        post_id = Comment.objects.filter(pk=instance.pk).values_list("post_id", flat=True).first()
+        setattr(instance, POST_ATTR, post_id)
+
+
+@receiver(post_save, sender=Comment)
+def _comment_saved(sender: type[Comment], instance: Comment, created: bool, **kwargs: Any) -> None:
+    if created:
+        _count_comment(instance, 1)
+        return
+    # Its post or whether it is active may have changed.
+    post_ids = [instance.post_id]
+    if (previous := getattr(instance, POST_ATTR, None)) is not None:
+        post_ids.append(previous)
+    refresh(_post_author_ids(post_ids))
+
+
+@receiver(post_delete, sender=Comment)
+def _comment_deleted(sender: type[Comment], instance: Comment, **kwargs: Any) -> None:
+    # Deleting a post deletes its comments first, its author is recounted once after.
+    if not isinstance(kwargs.get("origin"), Post) and not _deleting_user(kwargs):
+        _count_comment(instance, -1)
+
+
+@receiver(comments_moderated, sender=Comment)
+def _comments_moderated(sender: type[Comment], post_ids: set[int], **kwargs: Any) -> None:
+    refresh(_post_author_ids(post_ids))
@@ -0,0 +1,135 @@
+"""
+In-memory index of the tag names, for the tag autocomplete.
+
+The names are kept casefolded in a sorted list, so the tags starting with a
+prefix are a slice of it found by bisection, without a `LIKE` query. They are
+ranked by their number of published posts. The index is `versioned`: changes
+to the tags and their counts are applied to it once committed, by replacing
+its entries, and the other processes rebuild theirs.
+"""
+
+import heapq
+import sys
+from bisect import bisect_left, insort
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from taggit.models import Tag
+
+from .models import TagCount
+from .signals import tag_counts_changed
+from .versioned import Versioned
+
+VERSION_KEY = "blog:autocomplete:version"
+LIMIT = 10
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    name: str
+    slug: str
+    # Published posts with the tag
+    count: int
+
+
+@dataclass(frozen=True)
+class _Entries:
+    tags: dict[int, tuple[str, str]]
+    counts: dict[int, int]
+    # Casefolded name and id of every tag, sorted
+    names: list[tuple[str, int]]
+
+
+def _without(entries: _Entries, tag_id: int) -> _Entries:
+    tags, counts, names = dict(entries.tags), dict(entries.counts), list(entries.names)
+    if (tag := tags.pop(tag_id, None)) is not None:
+        del names[bisect_left(names, (tag[0].casefold(), tag_id))]
+        counts.pop(tag_id, None)
+    return _Entries(tags, counts, names)
+
+
+class _Index:
+    # `complete()` reads without the lock, so changes replace the entries as a
+    # whole instead of mutating those a reader may hold.
+
+    def __init__(self, tags: Iterable[tuple[int, str, str, int | None]]) -> None:
+        self.entries = _Entries({}, {}, [])
+        for tag_id, name, slug, count in tags:
+            self.entries.tags[tag_id] = (name, slug)
+            self.entries.counts[tag_id] = count or 0
+            self.entries.names.append((name.casefold(), tag_id))
+        self.entries.names.sort()
+
+    def remove(self, tag_id: int) -> None:
+        self.entries = _without(self.entries, tag_id)
+
+    def put(self, tag_id: int, name: str, slug: str) -> None:
+        # A renamed tag keeps its posts.
+        count = self.entries.counts.get(tag_id, 0)
+        entries = _without(self.entries, tag_id)
+        entries.tags[tag_id] = (name, slug)
+        entries.counts[tag_id] = count
+        insort(entries.names, (name.casefold(), tag_id))
+        self.entries = entries
+
+    def set_counts(self, counts: dict[int, int]) -> None:
+        entries = self.entries
+        self.entries = _Entries(entries.tags, {**entries.counts, **counts}, entries.names)
+
+    def complete(self, prefix: str, limit: int) -> list[Suggestion]:
+        entries = self.entries
+        tags, counts, names = entries.tags, entries.counts, entries.names
+        prefix = prefix.casefold()
+        start = bisect_left(names, (prefix,))
+        # Past every name with the prefix
+        stop = bisect_left(names, (prefix + chr(sys.maxunicode),), start)
+        best = heapq.nsmallest(
+            limit,
+            (names[i] for i in range(start, stop)),
+            key=lambda entry: (-counts[entry[1]], entry),
+        )
+        return [Suggestion(*tags[tag_id], counts[tag_id]) for _, tag_id in best]
+
+
+def _build() -> _Index:
+    return _Index(Tag.objects.values_list("id", "name", "slug", "published_count__published_posts"))
+
+
+_index = Versioned(VERSION_KEY, _build)
+
+
+def complete(prefix: str, limit: int = LIMIT) -> list[Suggestion]:
+    """
+    The tags whose name starts with `prefix`, ignoring case, those with the
+    most published posts first.
+    """
+    return _index.get().complete(prefix, limit)
+
+
+def invalidate() -> None:
+    """
+    Make every process rebuild its index.
+    """
+    _index.invalidate()
+
+
+@receiver(post_save, sender=Tag)
+def _tag_saved(sender: type[Tag], instance: Tag, **kwargs: Any) -> None:
+    tag_id, name, slug = instance.id, instance.name, instance.slug
+    # Others rebuild after the commit, or they would miss the change.
+    transaction.on_commit(lambda: _index.update(lambda index: index.put(tag_id, name, slug)))
+
+
+@receiver(post_delete, sender=Tag)
+def _tag_deleted(sender: type[Tag], instance: Tag, **kwargs: Any) -> None:
+    tag_id = instance.id
+    transaction.on_commit(lambda: _index.update(lambda index: index.remove(tag_id)))
+
+
+@receiver(tag_counts_changed, sender=TagCount)
+def _counts_changed(sender: type[TagCount], counts: dict[int, int], **kwargs: Any) -> None:
+    transaction.on_commit(lambda: _index.update(lambda index: index.set_counts(counts)))
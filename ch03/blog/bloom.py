@@ -0,0 +1,145 @@
+"""
+Bloom filters of the post URLs and tag slugs that exist, so requests for bogus
+ones get a 404 without a query.
+
+The filters are `versioned`: each process builds its own from the database
+and adds the posts and tags saved since. A filter can't forget: an unpublished
+post or a deleted tag stays in it and its lookup falls through to the
+database. Writes that send no signals, such as `import_blog`, must call
+`invalidate()`.
+"""
+
+import hashlib
+import math
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from taggit.models import Tag
+
+from .models import Post
+from .versioned import Versioned
+
+VERSION_KEY = "blog:bloom:version"
+ERROR_RATE = 0.01
+# Room for the posts and tags added before a rebuild resizes the filter
+HEADROOM = 2
+MIN_CAPACITY = 1000
+
+
+def enabled() -> bool:
+    enabled: bool = settings.BLOG_BLOOM_FILTER
+    return enabled
+
+
+class BloomFilter:
+    """
+    A set of strings that answers "maybe" or "definitely not", with false
+    positives at `error_rate` while holding at most `capacity` strings.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = ERROR_RATE) -> None:
+        self.capacity = capacity
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray(-(-self.size // 8))
+        self.count = 0
+
+    def _positions(self, item: str) -> Iterator[int]:
+        # Double hashing derives every position from one digest.
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(item))
+
+
+def post_key(year: int, month: int, day: int, slug: str) -> str:
+    return f"{year}-{month}-{day}:{slug}"
+
+
+def _post_key(post: Post) -> str:
+    # URLs have the date in the current time zone.
+    publish = timezone.localtime(post.publish)
+    return post_key(publish.year, publish.month, publish.day, post.slug)
+
+
+class _Filters:
+    def __init__(self, posts: Iterable[Post], tag_slugs: Iterable[str]) -> None:
+        posts, tag_slugs = list(posts), list(tag_slugs)
+        self.posts = BloomFilter(max(len(posts) * HEADROOM, MIN_CAPACITY))
+        self.tags = BloomFilter(max(len(tag_slugs) * HEADROOM, MIN_CAPACITY))
+        for post in posts:
+            self.posts.add(_post_key(post))
+        for slug in tag_slugs:
+            self.tags.add(slug)
+
+    def full(self) -> bool:
+        return self.posts.count > self.posts.capacity or self.tags.count > self.tags.capacity
+
+
+def _build() -> _Filters:
+    return _Filters(
+        Post.published.only("publish", "slug"), Tag.objects.values_list("slug", flat=True)
+    )
+
+
+_filters = Versioned(VERSION_KEY, _build, expired=_Filters.full)
+
+
+def may_have_post(year: int, month: int, day: int, slug: str) -> bool:
+    """
+    `False` if no published post has this URL, `True` if one may have.
+    """
+    return post_key(year, month, day, slug) in _filters.get().posts
+
+
+def may_have_tag(slug: str) -> bool:
+    """
+    `False` if no tag has this slug, `True` if one may have.
+    """
+    return slug in _filters.get().tags
+
+
+def invalidate() -> None:
+    """
+    Make every process rebuild its filters.
+    """
+    _filters.invalidate()
+
+
+def _added(post_keys: Iterable[str] = (), tag_slugs: Iterable[str] = ()) -> None:
+    def add(filters: _Filters) -> None:
+        for key in post_keys:
+            filters.posts.add(key)
+        for slug in tag_slugs:
+            filters.tags.add(slug)
+
+    _filters.update(add)
+
+
+@receiver(post_save, sender=Post)
+def _post_saved(sender: type[Post], instance: Post, **kwargs: Any) -> None:
+    if enabled() and instance.status == Post.Status.PUBLISHED:
+        key = _post_key(instance)
+        # Others rebuild after the commit, or they would miss the post.
+        transaction.on_commit(lambda: _added(post_keys=[key]))
+
+
+@receiver(post_save, sender=Tag)
+def _tag_saved(sender: type[Tag], instance: Tag, **kwargs: Any) -> None:
+    if enabled():
+        slug = instance.slug
+        transaction.on_commit(lambda: _added(tag_slugs=[slug]))
@@ -0,0 +1,113 @@
+"""
+Broadcast of cache invalidations to every worker process on the host.
+
+A process deleting keys from the two-tier cache records them in a change-log
+table. The deletes run once the change that made the keys stale committed, so
+the row is written after that commit, in a transaction of its own. A process
+that dies in between loses the row, and the other processes serve the stale
+keys from their L1 until its TTL expires. At the
+start of each request, at most every `POLL_INTERVAL` seconds, every process
+reads the rows added since it last looked and evicts their keys from its own
+L1. A row older than the L1 TTL can no longer evict anything, so rows are
+pruned once they are `RETENTION` old.
+"""
+
+import os
+import threading
+import time
+from datetime import timedelta
+from typing import Any
+
+from django.conf import settings
+from django.core.signals import request_started
+from django.db.models import Max
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import CacheInvalidation
+from .signals import cache_invalidated
+
+POLL_INTERVAL = 0.5
+PRUNE_INTERVAL = 60.0
+
+
+def enabled() -> bool:
+    enabled: bool = settings.BLOG_INVALIDATION_BUS
+    return enabled
+
+
+def _retention() -> timedelta:
+    return timedelta(seconds=2 * settings.BLOG_L1_CACHE["TTL"])
+
+
+class _Cursor:
+    """
+    How far this process has read the change log.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.pid = 0
+        self.last_id = 0
+        self.polled = 0.0
+        self.pruned = 0.0
+
+
+_cursor = _Cursor()
+
+
+def reset() -> None:
+    """
+    Start reading from the end of the change log on the next poll.
+    """
+    with _cursor.lock:
+        _cursor.pid = 0
+
+
+def poll(force: bool = False) -> int:
+    """
+    Evict the keys other processes invalidated since the last poll. Returns
+    the number of keys evicted.
+    """
+    now = time.monotonic()
+    with _cursor.lock:
+        if _cursor.pid != os.getpid():
+            # First poll of this process, whose L1 holds nothing older yet.
+            # Also reached in a forked worker, which starts with its parent's
+            # cursor.
+            last_id = CacheInvalidation.objects.aggregate(last_id=Max("id"))["last_id"]
+            _cursor.pid, _cursor.last_id, _cursor.polled = os.getpid(), last_id or 0, now
+            return 0
+        if not force and now - _cursor.polled < POLL_INTERVAL:
+            return 0
+        _cursor.polled = now
+        # SQLite assigns ids in commit order. Elsewhere a row committed after a
+        # newer one may be skipped, leaving its keys to expire from L1 instead.
+        rows = list(
+            CacheInvalidation.objects.filter(id__gt=_cursor.last_id).values_list("id", "keys")
+        )
+        if rows:
+            _cursor.last_id = rows[-1][0]
+        prune = now - _cursor.pruned >= PRUNE_INTERVAL
+        if prune:
+            _cursor.pruned = now
+
+    if prune:
+        CacheInvalidation.objects.filter(created__lt=timezone.now() - _retention()).delete()
+    keys = {key for _, row_keys in rows for key in row_keys}
+    if keys:
+        cache_invalidated.send(sender=CacheInvalidation, keys=keys)
+    return len(keys)
+
+
+@receiver(cache_invalidated)
+def _record(sender: Any, keys: set[str], **kwargs: Any) -> None:
+    # Invalidations read from the log are not recorded again.
+    if enabled() and sender is not CacheInvalidation:
+        CacheInvalidation.objects.create(keys=sorted(keys))
+
+
+@receiver(request_started)
+def _poll(**kwargs: Any) -> None:
+    if enabled():
+        poll()
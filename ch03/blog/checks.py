@@ -0,0 +1,50 @@
+"""
+System checks of the blog's settings.
+"""
+
+from collections.abc import Sequence
+from typing import Any
+
+from django.apps import AppConfig
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+from .ratelimit import Rate
+
+# Features whose worker processes keep in step through the default cache: the
+# rate-limit counters, and the versions of the per-process Bloom filters and
+# tag index. With a per-process cache the other processes never see a change.
+SHARED_CACHE_SETTINGS = ("BLOG_RATELIMITS", "BLOG_BLOOM_FILTER", "BLOG_TAG_INDEX")
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_cache(
+    app_configs: Sequence[AppConfig] | None, **kwargs: Any
+) -> list[checks.CheckMessage]:
+    if not isinstance(caches["default"], LocMemCache | DummyCache):
+        return []
+    return [
+        checks.Error(
+            f"{name} needs a default cache shared by the worker processes.",
+            hint=f"Set CACHES['default'] to Redis or Memcached, or turn {name} off.",
+            id="blog.E001",
+        )
+        for name in SHARED_CACHE_SETTINGS
+        if getattr(settings, name)
+    ]
+
+
+@checks.register()
+def check_rates(
+    app_configs: Sequence[AppConfig] | None, **kwargs: Any
+) -> list[checks.CheckMessage]:
+    errors: list[checks.CheckMessage] = []
+    for scope, rate in settings.BLOG_RATELIMITS.items():
+        try:
+            Rate.parse(rate)
+        except ValueError as e:
+            errors.append(checks.Error(f"BLOG_RATELIMITS[{scope!r}]: {e}", id="blog.E002"))
+    return errors
@@ -0,0 +1,170 @@
+"""
+Coalescing of identical concurrent requests.
+
+The first request for a key leads: it does the work and publishes a result.
+Requests for the same key arriving meanwhile follow: they wait for that result
+instead of doing the work again. `BLOG_COALESCE_REQUESTS` is "local" to
+coalesce within a process, or "shared" to also coalesce across processes
+through the cache. A follower that gets no result, because the leader failed
+or its result could not be shared, does the work itself.
+"""
+
+import asyncio
+import threading
+import time
+import uuid
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager, suppress
+from typing import Any
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+LOCAL = "local"
+SHARED = "shared"
+
+PREFIX = "blog:coalesce"
+# Followers stop waiting and do the work themselves after this long.
+WAIT_TIMEOUT = 5.0
+POLL_INTERVAL = 0.01
+
+
+def enabled() -> bool:
+    return settings.BLOG_COALESCE_REQUESTS in (LOCAL, SHARED)
+
+
+def _shared() -> bool:
+    return bool(settings.BLOG_COALESCE_REQUESTS == SHARED)
+
+
+class Flight:
+    def __init__(self, leader: bool, result: Any = None) -> None:
+        self.leader = leader
+        # The leader's result, if there is one to use instead of doing the work
+        self.result = result
+        self.published: Any = None
+
+    def publish(self, result: Any) -> None:
+        """
+        Hand `result` to the followers. Only the leader's result is kept.
+        """
+        if self.leader:
+            self.published = result
+
+
+class _LocalFlight:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+
+
+_flights: dict[str, _LocalFlight] = {}
+_flights_lock = threading.Lock()
+
+
+def _flight_key(key: str) -> str:
+    return f"{PREFIX}:{key}"
+
+
+def _result_key(key: str, token: str) -> str:
+    # Per flight, so a follower never picks up the result of an earlier one.
+    return f"{PREFIX}:{key}:{token}"
+
+
+def _join_shared(key: str) -> tuple[str, Any]:
+    """
+    Lead the cross-process flight for `key`, or wait for its leader. Returns
+    the flight token if leading, or else the leader's result.
+    """
+    token = uuid.uuid4().hex
+    if cache.add(_flight_key(key), token, int(WAIT_TIMEOUT) + 1):
+        return token, None
+    leader_token = cache.get(_flight_key(key))
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while leader_token is not None and time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        if (result := cache.get(_result_key(key, leader_token))) is not None:
+            return "", result
+        if cache.get(_flight_key(key)) != leader_token:
+            # The leader finished without a result to share.
+            break
+    return "", None
+
+
+def _land_shared(key: str, token: str, result: Any) -> None:
+    if result is not None:
+        cache.set(_result_key(key, token), result, int(WAIT_TIMEOUT) + 1)
+    cache.delete(_flight_key(key))
+
+
+@contextmanager
+def flight(key: str) -> Iterator[Flight]:
+    """
+    Lead or follow the flight for `key` in a thread of this process.
+    """
+    with _flights_lock:
+        local = _flights.get(key)
+        leader = local is None
+        if local is None:
+            local = _flights[key] = _LocalFlight()
+
+    if not leader:
+        local.done.wait(WAIT_TIMEOUT)
+        yield Flight(leader=False, result=local.result)
+        return
+
+    token = ""
+    current = Flight(leader=True)
+    try:
+        if _shared():
+            # Follows the leader of another process, if there is one.
+            token, current.result = _join_shared(key)
+        yield current
+    finally:
+        local.result = current.result if current.result is not None else current.published
+        if token:
+            _land_shared(key, token, current.published)
+        with _flights_lock:
+            del _flights[key]
+        local.done.set()
+
+
+class _AsyncFlight:
+    def __init__(self) -> None:
+        self.done = asyncio.Event()
+        self.result: Any = None
+
+
+# Keyed by event loop too: ASGI servers run one per process, tests one per test.
+_async_flights: dict[tuple[asyncio.AbstractEventLoop, str], _AsyncFlight] = {}
+
+
+@asynccontextmanager
+async def aflight(key: str) -> AsyncIterator[Flight]:
+    """
+    Lead or follow the flight for `key` in a coroutine of this process's event loop.
+    """
+    loop_key = (asyncio.get_running_loop(), key)
+    local = _async_flights.get(loop_key)
+    if local is not None:
+        with suppress(TimeoutError):
+            await asyncio.wait_for(local.done.wait(), WAIT_TIMEOUT)
+        yield Flight(leader=False, result=local.result)
+        return
+
+    local = _async_flights[loop_key] = _AsyncFlight()
+    token = ""
+    current = Flight(leader=True)
+    try:
+        if _shared():
+            # Polls without holding up the thread that runs the sync code.
+            join = sync_to_async(_join_shared, thread_sensitive=False)
+            token, current.result = await join(key)
+        yield current
+    finally:
+        local.result = current.result if current.result is not None else current.published
+        if token:
+            await sync_to_async(_land_shared)(key, token, current.published)
+        del _async_flights[loop_key]
+        local.done.set()
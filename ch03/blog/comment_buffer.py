@@ -0,0 +1,166 @@
+"""
+Write-behind ingestion of comments.
+
+With `BLOG_COMMENT_BUFFER` set to a file path, `post_comment` appends each valid
+comment to that file instead of inserting it, and `flush_comments` inserts the
+buffered comments in batches. A burst of comments then costs one transaction
+per batch instead of one per comment.
+
+Every buffered line carries an id and the submission time. Flushing skips ids
+that are already inserted, so a flush interrupted between its commit and the
+removal of the file is replayed without duplicates. Lines that don't parse
+are moved to a `.rejected` file next to the buffer and logged.
+"""
+
+import json
+import logging
+import os
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import batched
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Comment, Post
+from .signals import comments_moderated
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+
+def path() -> Path | None:
+    buffer = settings.BLOG_COMMENT_BUFFER
+    return Path(buffer) if buffer else None
+
+
+def enabled() -> bool:
+    return path() is not None
+
+
+@contextmanager
+def _locked(buffer: Path) -> Iterator[None]:
+    # Not at the top, the module is imported on every platform, buffering or not.
+    import fcntl
+
+    # Serializes appends with the flusher's rename across worker processes.
+    with open(buffer.with_suffix(".lock"), "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def append(post: Post, data: dict[str, Any]) -> None:
+    """
+    Durably record a validated comment for `post`.
+    """
+    buffer = path()
+    assert buffer is not None, "BLOG_COMMENT_BUFFER is not set"
+    record = {
+        "id": uuid.uuid4().hex,
+        "created": timezone.now().isoformat(),
+        "post_id": post.id,
+        "name": data["name"],
+        "email": data["email"],
+        "body": data["body"],
+    }
+    line = (json.dumps(record) + "\n").encode()
+    with _locked(buffer):
+        fd = os.open(buffer, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            os.write(fd, line)
+            # The comment is acknowledged to the reader, it must survive a crash.
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def _rotate(buffer: Path) -> Path | None:
+    """
+    Move the buffer aside so new comments go to a fresh file while it is flushed.
+    """
+    flushing = buffer.with_suffix(".flushing")
+    with _locked(buffer):
+        # A file left over by an interrupted flush is finished first.
+        if flushing.exists():
+            return flushing
+        if not buffer.exists():
+            return None
+        buffer.rename(flushing)
+    return flushing
+
+
+def _parse(line: str) -> Comment:
+    record = json.loads(line)
+    return Comment(
+        buffer_id=uuid.UUID(record["id"]),
+        created=datetime.fromisoformat(record["created"]),
+        post_id=int(record["post_id"]),
+        name=record["name"],
+        email=record["email"],
+        body=record["body"],
+    )
+
+
+def _read(flushing: Path, rejected: Path) -> list[Comment]:
+    """
+    The comments of a buffer file. Lines that don't parse, e.g. cut short by a
+    crash, are moved to `rejected` rather than failing every flush after.
+    """
+    comments = []
+    with open(flushing, encoding="utf-8", errors="replace") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                comments.append(_parse(line))
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                logger.warning("Rejected line %d of %s: %r", number, flushing, e)
+                with open(rejected, "a", encoding="utf-8") as out:
+                    out.write(line.rstrip("\n") + "\n")
+    return comments
+
+
+def flush(batch_size: int = BATCH_SIZE) -> int:
+    """
+    Insert buffered comments in batches and return how many were inserted.
+    Comments on posts that were unpublished or deleted since are dropped.
+    """
+    buffer = path()
+    if buffer is None:
+        return 0
+
+    inserted = 0
+    while (flushing := _rotate(buffer)) is not None:
+        buffered = _read(flushing, buffer.with_suffix(".rejected"))
+        post_ids = set(
+            Post.published.filter(id__in={c.post_id for c in buffered}).values_list("id", flat=True)
+        )
+        # The whole file is one transaction. If the process dies after it commits
+        # but before the file is removed, the replay finds every id inserted.
+        with transaction.atomic():
+            inserted_ids = {
+                buffer_id
+                for chunk in batched([c.buffer_id for c in buffered], batch_size, strict=False)
+                for buffer_id in Comment.objects.filter(buffer_id__in=chunk).values_list(
+                    "buffer_id", flat=True
+                )
+            }
+            comments = [
+                c for c in buffered if c.post_id in post_ids and c.buffer_id not in inserted_ids
+            ]
+            if comments:
+                Comment.objects.bulk_create(comments, batch_size=batch_size)
+                # `bulk_create()` sends no `post_save`.
+                comments_moderated.send(sender=Comment, post_ids={c.post_id for c in comments})
+        flushing.unlink()
+        inserted += len(comments)
+    return inserted
@@ -0,0 +1,239 @@
+"""
+Cached lookups of posts and tags by the slugs and ids in their URLs.
+
+With `BLOG_LOOKUP_CACHE` on, a slug maps to an id, and the id to the object,
+both in the two-tier cache. Saving or deleting an object only has to evict its
+id: a slug mapping left pointing at an object whose slug or date changed is
+caught when the object is checked against the URL.
+
+With `BLOG_NEGATIVE_LOOKUP_CACHE` on, a lookup that found nothing is
+remembered for `MISSING_TIMEOUT` seconds, so repeated requests for an
+unpublished or deleted post get their 404 without a query. Publishing a post
+or creating a tag forgets the misses under its URL once committed.
+
+Every key has a generation, which `invalidate()` moves on to drop them all
+after writes that send no signals.
+"""
+
+import uuid
+from typing import Any
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache as shared_cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.http import Http404
+from django.utils import timezone
+from taggit.models import Tag
+
+from . import bloom
+from .models import Post
+from .tiered import cache
+
+PREFIX = "blog:lookup"
+GENERATION_KEY = f"{PREFIX}:generation"
+TIMEOUT = 60 * 60
+MISSING_TIMEOUT = 60
+
+POST_NOT_FOUND = "No Post matches the given query."
+TAG_NOT_FOUND = "No Tag matches the given query."
+
+
+def enabled() -> bool:
+    enabled: bool = settings.BLOG_LOOKUP_CACHE
+    return enabled
+
+
+def negative_enabled() -> bool:
+    enabled: bool = settings.BLOG_NEGATIVE_LOOKUP_CACHE
+    return enabled
+
+
+def _in_thread() -> bool:
+    # Whether the async lookups run the sync ones, which may skip the query
+    return enabled() or negative_enabled() or bloom.enabled()
+
+
+def _generation() -> str:
+    # Usually from L1
+    generation: str | None = cache.get(GENERATION_KEY)
+    if generation is None:
+        shared_cache.add(GENERATION_KEY, uuid.uuid4().hex, timeout=None)
+        generation = cache.get(GENERATION_KEY)
+    return generation or ""
+
+
+def invalidate() -> None:
+    """
+    Drop every cached lookup and miss, after writes that send no signals.
+    """
+    cache.delete(GENERATION_KEY)
+
+
+def post_key(post_id: int) -> str:
+    return f"{PREFIX}:{_generation()}:post:{post_id}"
+
+
+def tag_key(tag_id: int) -> str:
+    return f"{PREFIX}:{_generation()}:tag:{tag_id}"
+
+
+def _post_slug_key(year: int, month: int, day: int, slug: str) -> str:
+    return f"{PREFIX}:{_generation()}:post-slug:{year}-{month}-{day}:{slug}"
+
+
+def _tag_slug_key(slug: str) -> str:
+    return f"{PREFIX}:{_generation()}:tag-slug:{slug}"
+
+
+def _missing_key(key: str) -> str:
+    return f"{key}:missing"
+
+
+def _known_missing(key: str) -> bool:
+    # Misses are kept in the shared tier only: bogus URLs requested by the
+    # thousand would otherwise evict the hot entries of L1.
+    return negative_enabled() and shared_cache.get(_missing_key(key)) is not None
+
+
+def _not_found(key: str, message: str) -> Http404:
+    if negative_enabled():
+        shared_cache.set(_missing_key(key), True, MISSING_TIMEOUT)
+    return Http404(message)
+
+
+def _matches(post: Post, year: int, month: int, day: int, slug: str) -> bool:
+    # Date lookups compare in the current time zone.
+    publish = timezone.localtime(post.publish)
+    return (
+        post.status == Post.Status.PUBLISHED
+        and post.slug == slug
+        and (publish.year, publish.month, publish.day) == (year, month, day)
+    )
+
+
+def published_post(year: int, month: int, day: int, slug: str) -> Post:
+    """
+    The published post at this URL, with its author. Raises `Http404`.
+    """
+    slug_key = _post_slug_key(year, month, day, slug)
+    if enabled() and (post_id := cache.get(slug_key)) is not None:
+        post: Post | None = cache.get(post_key(post_id))
+        if post is not None and _matches(post, year, month, day, slug):
+            return post
+
+    if bloom.enabled() and not bloom.may_have_post(year, month, day, slug):
+        raise Http404(POST_NOT_FOUND)
+    if _known_missing(slug_key):
+        raise Http404(POST_NOT_FOUND)
+    try:
+        post = Post.published.select_related("author").get(
+            slug=slug, publish__year=year, publish__month=month, publish__day=day
+        )
+    except Post.DoesNotExist:
+        raise _not_found(slug_key, POST_NOT_FOUND) from None
+    if enabled():
+        cache.set(post_key(post.id), post, TIMEOUT)
+        cache.set(slug_key, post.id, TIMEOUT)
+    return post
+
+
+async def apublished_post(year: int, month: int, day: int, slug: str) -> Post:
+    if _in_thread():
+        return await sync_to_async(published_post)(year, month, day, slug)
+    # No thread hop for the query when the caches are off
+    try:
+        return await Post.published.select_related("author").aget(
+            slug=slug, publish__year=year, publish__month=month, publish__day=day
+        )
+    except Post.DoesNotExist:
+        raise Http404(POST_NOT_FOUND) from None
+
+
+def published_post_by_id(post_id: int) -> Post:
+    """
+    The published post with this id, as the share and comment views take it.
+    Raises `Http404`.
+    """
+    key = post_key(post_id)
+    if enabled():
+        post: Post | None = cache.get(key)
+        if post is not None and post.status == Post.Status.PUBLISHED:
+            return post
+
+    if _known_missing(key):
+        raise Http404(POST_NOT_FOUND)
+    try:
+        post = Post.published.select_related("author").get(id=post_id)
+    except Post.DoesNotExist:
+        raise _not_found(key, POST_NOT_FOUND) from None
+    if enabled():
+        cache.set(key, post, TIMEOUT)
+    return post
+
+
+def tag(slug: str) -> Tag:
+    """
+    The tag with this slug. Raises `Http404`.
+    """
+    slug_key = _tag_slug_key(slug)
+    if enabled() and (tag_id := cache.get(slug_key)) is not None:
+        found: Tag | None = cache.get(tag_key(tag_id))
+        if found is not None and found.slug == slug:
+            return found
+
+    if bloom.enabled() and not bloom.may_have_tag(slug):
+        raise Http404(TAG_NOT_FOUND)
+    if _known_missing(slug_key):
+        raise Http404(TAG_NOT_FOUND)
+    try:
+        found = Tag.objects.get(slug=slug)
+    except Tag.DoesNotExist:
+        raise _not_found(slug_key, TAG_NOT_FOUND) from None
+    if enabled():
+        cache.set(tag_key(found.id), found, TIMEOUT)
+        cache.set(slug_key, found.id, TIMEOUT)
+    return found
+
+
+async def atag(slug: str) -> Tag:
+    if _in_thread():
+        return await sync_to_async(tag)(slug)
+    try:
+        return await Tag.objects.aget(slug=slug)
+    except Tag.DoesNotExist:
+        raise Http404(TAG_NOT_FOUND) from None
+
+
+def _found(*keys: str) -> None:
+    shared_cache.delete_many([_missing_key(key) for key in keys])
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def _post_changed(sender: type[Post], instance: Post, **kwargs: Any) -> None:
+    if enabled():
+        key = post_key(instance.id)
+        # Not before the commit, or a request meanwhile could cache the old row again.
+        transaction.on_commit(lambda: cache.delete(key))
+    if negative_enabled() and instance.status == Post.Status.PUBLISHED:
+        publish = timezone.localtime(instance.publish)
+        keys = (
+            post_key(instance.id),
+            _post_slug_key(publish.year, publish.month, publish.day, instance.slug),
+        )
+        # Not before the commit, or a request meanwhile could remember the miss again.
+        transaction.on_commit(lambda: _found(*keys))
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def _tag_changed(sender: type[Tag], instance: Tag, **kwargs: Any) -> None:
+    if enabled():
+        key = tag_key(instance.id)
+        transaction.on_commit(lambda: cache.delete(key))
+    if negative_enabled():
+        slug_key = _tag_slug_key(instance.slug)
+        transaction.on_commit(lambda: _found(slug_key))
@@ -0,0 +1,37 @@
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from django.db import connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.backends.signals import connection_created
+
+
+@contextmanager
+def query_latency(milliseconds: float) -> Iterator[None]:
+    """
+    Delay every query on every connection, including those opened meanwhile by
+    other threads, as if the database were across a network.
+    """
+    seconds = milliseconds / 1000
+
+    def delay(execute: Callable[..., Any], sql: str, params: Any, many: bool, context: Any) -> Any:
+        time.sleep(seconds)
+        return execute(sql, params, many, context)
+
+    def install(connection: BaseDatabaseWrapper, **kwargs: Any) -> None:
+        # Wrappers survive reconnects of the same thread's connection.
+        if seconds and delay not in connection.execute_wrappers:
+            connection.execute_wrappers.append(delay)
+
+    for connection in connections.all():
+        install(connection)
+    connection_created.connect(install, weak=False)
+    try:
+        yield
+    finally:
+        connection_created.disconnect(install)
+        for connection in connections.all(initialized_only=True):
+            if delay in connection.execute_wrappers:
+                connection.execute_wrappers.remove(delay)
@@ -0,0 +1,138 @@
+import multiprocessing
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from django.core.cache.backends.base import BaseCache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import CommandError, CommandParser
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.test.utils import override_settings
+
+from ...models import Post
+from ...shmcache import SharedMemoryCache
+
+SHM = Path("/dev/shm")
+
+
+def _worker(cache: BaseCache, keys: list[str], value: Any, misses: Any) -> None:
+    """
+    Get every key in a random order, setting it on a miss, as a worker
+    process serving pages would.
+    """
+    keys = random.sample(keys, len(keys))
+    missed = 0
+    for key in keys:
+        if cache.get(key) is None:
+            missed += 1
+            cache.set(key, value)
+    with misses.get_lock():
+        misses.value += missed
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the local-memory, file and shared-memory cache backends on blog\n"
+        "values: the posts of a sidebar list and the HTML of a post page.\n"
+        "Reports the time per get and set in one process, then the misses of\n"
+        "several worker processes getting the same keys, each setting the keys it\n"
+        "missed.\n\n"
+        "Usage:\n"
+        "  python manage.py bench_cache [--operations N] [--workers N] [--keys N]\n\n"
+        "Options:\n"
+        "  --operations N    Gets and sets per backend and value (default: 10000)\n"
+        "  --workers N       Worker processes (default: 4)\n"
+        "  --keys N          Keys each worker gets (default: 500)\n\n"
+        "Example:\n"
+        "  python manage.py bench_cache --workers 8"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--operations",
+            type=int,
+            default=10000,
+            help="Gets and sets per backend and value (default: 10000)",
+        )
+        parser.add_argument("--workers", type=int, default=4, help="Worker processes (default: 4)")
+        parser.add_argument(
+            "--keys", type=int, default=500, help="Keys each worker gets (default: 500)"
+        )
+
+    @staticmethod
+    def _values() -> dict[str, Any]:
+        post = Post.published.first()
+        if post is None:
+            raise CommandError("No published posts, run seed_posts first.")
+        with override_settings(ALLOWED_HOSTS=["testserver"]):
+            html = Client().get(post.get_absolute_url()).content.decode()
+        return {"sidebar": list(Post.published.all()[:5]), "post html": html}
+
+    @staticmethod
+    def _backends(directory: Path, shm_directory: Path, entries: int) -> dict[str, BaseCache]:
+        params = {"OPTIONS": {"MAX_ENTRIES": entries}}
+        return {
+            "locmem": LocMemCache(f"bench-{directory.name}", params),
+            "file": FileBasedCache(str(directory / "file"), params),
+            "shm": SharedMemoryCache(str(shm_directory / "shm"), params),
+        }
+
+    @staticmethod
+    def _time(operation: Any, operations: int) -> float:
+        """
+        Median microseconds per call of `operation(i)`.
+        """
+        timings = []
+        for i in range(operations):
+            start = time.perf_counter()
+            operation(i)
+            timings.append(time.perf_counter() - start)
+        return statistics.median(timings) * 1_000_000
+
+    def _measure(
+        self, cache: BaseCache, value: Any, operations: int, workers: int, keys: int
+    ) -> tuple[float, float, int]:
+        cache.clear()
+        set_us = self._time(lambda i: cache.set(f"bench:{i % keys}", value), operations)
+        get_us = self._time(lambda i: cache.get(f"bench:{i % keys}"), operations)
+        return get_us, set_us, self._misses(cache, value, workers, keys)
+
+    def _misses(self, cache: BaseCache, value: Any, workers: int, keys: int) -> int:
+        cache.clear()
+        context = multiprocessing.get_context("fork")
+        misses = context.Value("i", 0)
+        names = [f"page:{i}" for i in range(keys)]
+        processes = [
+            context.Process(target=_worker, args=(cache, names, value, misses))
+            for _ in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        missed: int = misses.value
+        return missed
+
+    def handle(self, *args: Any, **kwargs: Any) -> None:
+        operations, workers, keys = kwargs["operations"], kwargs["workers"], kwargs["keys"]
+        values = self._values()
+
+        self.stdout.write(f"{operations} gets and sets, then {workers} workers getting {keys} keys")
+        self.stdout.write(f"{'backend':<10}{'value':<12}{'get µs':>10}{'set µs':>10}{'misses':>10}")
+        # The file cache on a disk, as it would be deployed, the shared memory in RAM
+        with (
+            tempfile.TemporaryDirectory() as directory,
+            tempfile.TemporaryDirectory(dir=SHM if SHM.is_dir() else None) as shm_directory,
+        ):
+            backends = self._backends(Path(directory), Path(shm_directory), keys * 2)
+            for name, cache in backends.items():
+                for label, value in values.items():
+                    get_us, set_us, misses = self._measure(cache, value, operations, workers, keys)
+                    self.stdout.write(
+                        f"{name:<10}{label:<12}{get_us:>10.1f}{set_us:>10.1f}{misses:>10}"
+                    )
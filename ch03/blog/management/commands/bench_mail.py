@@ -0,0 +1,77 @@
+import asyncio
+import time
+from collections.abc import Callable
+from typing import Any
+
+from django.core.mail import EmailMessage, get_connection, send_mail
+from django.core.management import CommandError, CommandParser
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from ...asyncmail import AsyncEmailBackend
+from ...smtpsink import SMTPSink, smtp_settings
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare mail delivery throughput against a local SMTP sink.\n\n"
+        "Usage:\n"
+        "  python manage.py bench_mail [--count N] [--connections N]\n\n"
+        "Options:\n"
+        "  --count N          Messages sent by each strategy (default: 500)\n"
+        "  --connections N    Concurrent connections of the async backend (default: 4)\n\n"
+        "Example:\n"
+        "  python manage.py bench_mail --count 2000 --connections 8"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--count", type=int, default=500, help="Messages per strategy (default: 500)"
+        )
+        parser.add_argument(
+            "--connections",
+            type=int,
+            default=4,
+            help="Concurrent connections of the async backend (default: 4)",
+        )
+
+    def handle(self, *args: Any, **kwargs: Any) -> None:
+        count = kwargs["count"]
+        connections = kwargs["connections"]
+
+        def messages() -> list[EmailMessage]:
+            return [
+                EmailMessage(f"Message {i}", "Read this post", to=[f"reader{i}@example.com"])
+                for i in range(count)
+            ]
+
+        def send_mail_per_message() -> None:
+            # What `post_share` used to do: one SMTP session per email.
+            for message in messages():
+                send_mail(message.subject, message.body, None, message.to)
+
+        def one_connection() -> None:
+            # The `send_queued_mail` worker: one session per batch.
+            get_connection().send_messages(messages())
+
+        def async_backend() -> None:
+            asyncio.run(AsyncEmailBackend(connections).send_messages(messages()))
+
+        strategies: list[tuple[str, Callable[[], None]]] = [
+            ("send_mail per message", send_mail_per_message),
+            ("one connection per batch", one_connection),
+            (f"asyncio, {connections} connections", async_backend),
+        ]
+
+        with SMTPSink() as sink, override_settings(**smtp_settings(sink.host, sink.port)):
+            self.stdout.write(f"{'strategy':<32}{'msgs/s':>10}{'sessions':>10}")
+            for name, strategy in strategies:
+                received, sessions = len(sink.messages), sink.sessions
+                start = time.perf_counter()
+                strategy()
+                elapsed = time.perf_counter() - start
+                if len(sink.messages) - received != count:
+                    raise CommandError(f"{name}: the sink didn't receive every message")
+                self.stdout.write(
+                    f"{name:<32}{count / elapsed:>10,.0f}{sink.sessions - sessions:>10}"
+                )
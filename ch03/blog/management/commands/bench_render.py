@@ -0,0 +1,97 @@
+import statistics
+import time
+import tracemalloc
+from typing import Any
+
+from django.core.management import CommandError, CommandParser
+from django.core.management.base import BaseCommand
+from django.http import HttpResponseBase
+from django.test import Client
+from django.test.utils import override_settings
+
+from ._latency import query_latency
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare buffered and streaming rendering of the post list: time to first\n"
+        "byte, time to last byte and peak memory per response.\n\n"
+        "Usage:\n"
+        "  python manage.py bench_render [--requests N] [--db-latency MS] [PATH]\n\n"
+        "Options:\n"
+        "  --requests N       Requests per mode (default: 100)\n"
+        "  --db-latency MS    Delay added to every query, to simulate a database\n"
+        "                     over the network (default: 0)\n\n"
+        "Example:\n"
+        "  python manage.py bench_render --db-latency 5 /blog/?page=2"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("path", nargs="?", default="/blog/", help="Default: /blog/")
+        parser.add_argument(
+            "--requests", type=int, default=100, help="Requests per mode (default: 100)"
+        )
+        parser.add_argument(
+            "--db-latency",
+            type=float,
+            default=0,
+            help="Milliseconds added to every query (default: 0)",
+        )
+
+    @staticmethod
+    def _chunks(response: HttpResponseBase) -> Any:
+        if response.streaming:
+            return response.streaming_content  # type: ignore[attr-defined]
+        return [response.content]  # type: ignore[attr-defined]
+
+    def _fetch(self, client: Client, path: str) -> tuple[float, float]:
+        """
+        Returns the seconds to the first and to the last byte of the body.
+        """
+        start = time.perf_counter()
+        response = client.get(path)
+        if response.status_code != 200:
+            raise CommandError(f"GET {path} returned {response.status_code}")
+        first = None
+        for _ in self._chunks(response):
+            # Chunks are dropped as they come, as a server writing to a socket would.
+            first = first or time.perf_counter()
+        last = time.perf_counter()
+        response.close()
+        return (first or last) - start, last - start
+
+    def _peak_memory(self, client: Client, path: str) -> int:
+        tracemalloc.start()
+        try:
+            response = client.get(path)
+            for _ in self._chunks(response):
+                pass
+            response.close()
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def handle(self, *args: Any, **kwargs: Any) -> None:
+        path, requests = kwargs["path"], kwargs["requests"]
+        client = Client()
+
+        self.stdout.write(f"{requests} requests to {path}")
+        if kwargs["db_latency"]:
+            self.stdout.write(f"{kwargs['db_latency']} ms added to every query")
+        self.stdout.write(f"{'mode':<12}{'TTFB p50 ms':>14}{'total p50 ms':>14}{'peak KiB':>10}")
+        with query_latency(kwargs["db_latency"]):
+            for mode in ("buffered", "streaming"):
+                with override_settings(
+                    BLOG_STREAMING_RESPONSES=mode == "streaming", ALLOWED_HOSTS=["testserver"]
+                ):
+                    # Warm up the template loaders and the connection.
+                    self._fetch(client, path)
+                    first, last = zip(
+                        *(self._fetch(client, path) for _ in range(requests)), strict=True
+                    )
+                    peak = self._peak_memory(client, path)
+
+                self.stdout.write(
+                    f"{mode:<12}{statistics.median(first) * 1000:>14.1f}"
+                    f"{statistics.median(last) * 1000:>14.1f}{peak / 1024:>10.0f}"
+                )
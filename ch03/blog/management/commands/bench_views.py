@@ -0,0 +1,107 @@
+import asyncio
+import statistics
+import time
+from types import ModuleType
+from typing import Any
+
+from django.core.management import CommandError, CommandParser
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient
+from django.test.utils import override_settings
+from django.urls import include, path
+from taggit.models import Tag
+
+from ...models import Post
+from ...urls import post_patterns
+from ._latency import query_latency
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the sync and native async blog read views under concurrent load,\n"
+        "driving the ASGI request handler in-process against the configured database.\n\n"
+        "Usage:\n"
+        "  python manage.py bench_views [--requests N] [--concurrency N] [--db-latency MS]\n"
+        "                               [PATH ...]\n\n"
+        "Options:\n"
+        "  --requests N       Requests per mode (default: 300)\n"
+        "  --concurrency N    Requests in flight at once (default: 20)\n"
+        "  --db-latency MS    Delay added to every query, to simulate a database\n"
+        "                     over the network (default: 0)\n\n"
+        "Example:\n"
+        "  python manage.py bench_views --concurrency 50 /blog/\n"
+        "  python manage.py bench_views --db-latency 2"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "paths",
+            nargs="*",
+            help="Paths to request (default: the post list, a tag page and the latest post)",
+        )
+        parser.add_argument(
+            "--requests", type=int, default=300, help="Requests per mode (default: 300)"
+        )
+        parser.add_argument(
+            "--concurrency", type=int, default=20, help="Requests in flight at once (default: 20)"
+        )
+        parser.add_argument(
+            "--db-latency",
+            type=float,
+            default=0,
+            help="Milliseconds added to every query (default: 0)",
+        )
+
+    @staticmethod
+    def _default_paths() -> list[str]:
+        paths = ["/blog/"]
+        if tag := Tag.objects.first():
+            paths.append(f"/blog/tag/{tag.slug}/")
+        if post := Post.published.first():
+            paths.append(post.get_absolute_url())
+        return paths
+
+    @staticmethod
+    async def _load(paths: list[str], requests: int, concurrency: int) -> list[float]:
+        client = AsyncClient()
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies: list[float] = []
+
+        async def fetch(url: str) -> None:
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(url)
+                latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                raise CommandError(f"GET {url} returned {response.status_code}")
+
+        await asyncio.gather(*(fetch(paths[i % len(paths)]) for i in range(requests)))
+        return latencies
+
+    def handle(self, *args: Any, **kwargs: Any) -> None:
+        paths = kwargs["paths"] or self._default_paths()
+        requests, concurrency = kwargs["requests"], kwargs["concurrency"]
+
+        self.stdout.write(f"{requests} requests to {', '.join(paths)}, {concurrency} in flight")
+        if kwargs["db_latency"]:
+            self.stdout.write(f"{kwargs['db_latency']} ms added to every query")
+        with query_latency(kwargs["db_latency"]):
+            self._compare(paths, requests, concurrency)
+
+    def _compare(self, paths: list[str], requests: int, concurrency: int) -> None:
+        self.stdout.write(f"{'views':<8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+        for mode in ("sync", "async"):
+            urlconf = ModuleType(f"bench_{mode}_urls")
+            urlconf.urlpatterns = [  # type: ignore[attr-defined]
+                path("blog/", include((post_patterns(mode == "async"), "blog")))
+            ]
+            with override_settings(ROOT_URLCONF=urlconf, ALLOWED_HOSTS=["testserver"]):
+                start = time.perf_counter()
+                latencies = asyncio.run(self._load(paths, requests, concurrency))
+                elapsed = time.perf_counter() - start
+
+            percentiles = statistics.quantiles(latencies, n=100)
+            self.stdout.write(
+                f"{mode:<8}{requests / elapsed:>10,.0f}"
+                f"{percentiles[49] * 1000:>10.1f}{percentiles[98] * 1000:>10.1f}"
+            )
@@ -0,0 +1,28 @@
+from typing import Any
+
+from django.core.management import CommandError, CommandParser
+from django.core.management.base import BaseCommand
+
+from ... import snapshot
+
+
+class Command(BaseCommand):
+    help = (
+        "Export users, posts, comments and tags as a JSON Lines snapshot.\n\n"
+        "Usage:\n"
+        "  python manage.py export_blog FILE\n\n"
+        "Example:\n"
+        "  python manage.py export_blog blog/fixtures/blog.jsonl"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("file", help="Snapshot file to write")
+
+    def handle(self, *args: Any, **kwargs: Any) -> None:
+        try:
+            with open(kwargs["file"], "w", encoding="utf-8") as f:
+                stats = snapshot.export(f)
+        except OSError as e:
+            raise CommandError(f"Cannot write {kwargs['file']}: {e}") from e
+
+        self.stdout.write(self.style.SUCCESS(f"Exported {stats}"))
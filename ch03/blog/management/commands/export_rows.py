@@ -0,0 +1,48 @@
+from typing import Any
+
+from django.core.management import CommandError, CommandParser
+from django.core.management.base import BaseCommand
+
+from ... import exports
+from ...models import Comment, Post
+
+MODELS = {"post": Post, "comment": Comment}
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream posts or comments as CSV or JSON Lines using constant memory.\n\n"
+        "Usage:\n"
+        "  python manage.py export_rows {post,comment} [--format FORMAT] [--output FILE]\n\n"
+        "Options:\n"
+        "  --format FORMAT    csv or jsonl (default: csv)\n"
+        "  --output FILE      Write to FILE instead of stdout\n\n"
+        "Example:\n"
+        "  python manage.py export_rows comment --format jsonl --output comments.jsonl"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("model", choices=list(MODELS), help="Model to export")
+        parser.add_argument(
+            "--format",
+            choices=exports.FORMATS,
+            default="csv",
+            help="Output format (default: csv)",
+        )
+        parser.add_argument("--output", help="Output file (default: stdout)")
+
+    def handle(self, *args: Any, **kwargs: Any) -> None:
+        queryset = MODELS[kwargs["model"]]._default_manager.all()
+        chunks = exports.stream(queryset, kwargs["format"])
+
+        if kwargs["output"] is None:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
+            return
+
+        try:
+            with open(kwargs["output"], "w", newline="", encoding="utf-8") as f:
+                f.writelines(chunks)
+        except OSError as e:
+            raise CommandError(f"Cannot write {kwargs['output']}: {e}") from e
+        self.stdout.write(self.style.SUCCESS(f"Exported {queryset.model.__name__} rows."))
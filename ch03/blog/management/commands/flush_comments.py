@@ -0,0 +1,49 @@
+import time
+from typing import Any
+
+from django.core.management import CommandParser
+from django.core.management.base import BaseCommand
+
+from ... import comment_buffer
+
+
+class Command(BaseCommand):
+    help = (
+        "Insert comments buffered by post_comment when BLOG_COMMENT_BUFFER is set.\n\n"
+        "Usage:\n"
+        "  python manage.py flush_comments [--batch-size N] [--loop]\n\n"
+        "Options:\n"
+        f"  --batch-size N    Comments per INSERT (default: {comment_buffer.BATCH_SIZE})\n"
+        "  --loop            Keep flushing instead of exiting when the buffer is empty\n"
+        "  --interval S      Seconds to sleep between flushes with --loop (default: 1)\n\n"
+        "Example:\n"
+        "  python manage.py flush_comments --loop"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=comment_buffer.BATCH_SIZE,
+            help=f"Comments per INSERT (default: {comment_buffer.BATCH_SIZE})",
+        )
+        parser.add_argument("--loop", action="store_true", help="Keep flushing the buffer")
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1,
+            help="Seconds to sleep between flushes with --loop (default: 1)",
+        )
+
+    def handle(self, *args: Any, **kwargs: Any) -> None:
+        if not comment_buffer.enabled():
+            self.stdout.write(self.style.NOTICE("BLOG_COMMENT_BUFFER is not set"))
+            return
+
+        while True:
+            inserted = comment_buffer.flush(kwargs["batch_size"])
+            if inserted:
+                self.stdout.write(f"Inserted {inserted} comments")
+            if not kwargs["loop"]:
+                break
+            time.sleep(kwargs["interval"])
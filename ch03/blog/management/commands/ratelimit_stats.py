@@ -0,0 +1,14 @@
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ...ratelimit import limited_count
+
+
+class Command(BaseCommand):
+    help = "Show how many requests each rate-limited view has rejected."
+
+    def handle(self, *args: Any, **kwargs: Any) -> None:
+        for scope, rate in settings.BLOG_RATELIMITS.items():
+            self.stdout.write(f"{scope} ({rate}): {limited_count(scope)} limited")
@@ -0,0 +1,68 @@
+import time
+from typing import Any
+
+from django.core.management import CommandParser
+from django.core.management.base import BaseCommand
+
+from ... import outbox
+
+
+class Command(BaseCommand):
+    help = (
+        "Deliver emails queued in the outbox, retrying failures with backoff.\n\n"
+        "Usage:\n"
+        "  python manage.py send_queued_mail [--batch-size N] [--max-attempts N] [--loop]\n\n"
+        "Options:\n"
+        "  --batch-size N      Emails sent per SMTP connection (default: 100)\n"
+        f"  --max-attempts N    Attempts before an email is marked failed (default: "
+        f"{outbox.MAX_ATTEMPTS})\n"
+        "  --connections N     Send over N concurrent asyncio SMTP connections instead of\n"
+        "                      the configured email backend (default: 0, disabled)\n"
+        "  --loop              Keep polling the outbox instead of exiting when it is drained\n"
+        "  --interval S        Seconds to sleep between polls with --loop (default: 5)\n\n"
+        "Example:\n"
+        "  python manage.py send_queued_mail --loop"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Emails sent per SMTP connection (default: 100)",
+        )
+        parser.add_argument(
+            "--max-attempts",
+            type=int,
+            default=outbox.MAX_ATTEMPTS,
+            help=f"Attempts before an email is marked failed (default: {outbox.MAX_ATTEMPTS})",
+        )
+        parser.add_argument(
+            "--connections",
+            type=int,
+            default=0,
+            help="Concurrent asyncio SMTP connections, 0 uses the email backend (default: 0)",
+        )
+        parser.add_argument("--loop", action="store_true", help="Keep polling the outbox")
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="Seconds to sleep between polls with --loop (default: 5)",
+        )
+
+    def handle(self, *args: Any, **kwargs: Any) -> None:
+        while True:
+            result = outbox.deliver(
+                kwargs["batch_size"], kwargs["max_attempts"], kwargs["connections"]
+            )
+            if result.sent or result.retried or result.failed:
+                self.stdout.write(
+                    f"Sent {result.sent}, retrying {result.retried}, failed {result.failed}"
+                )
+            # A full batch means more emails are probably due, poll again right away.
+            if result.sent + result.retried + result.failed == kwargs["batch_size"]:
+                continue
+            if not kwargs["loop"]:
+                break
+            time.sleep(kwargs["interval"])
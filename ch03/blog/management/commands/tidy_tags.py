@@ -0,0 +1,78 @@
+from typing import Any
+
+from django.core.management import CommandError, CommandParser
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from taggit.models import Tag
+
+from ... import tidytags
+
+
+class Command(BaseCommand):
+    help = (
+        "Merge duplicate tags and delete unused ones, rewriting the tagged items\n"
+        "with set-based statements.\n\n"
+        "Usage:\n"
+        "  python manage.py tidy_tags [--normalize] [--merge SOURCE TARGET]... [--prune]\n"
+        "                             [--dry-run]\n\n"
+        "Options:\n"
+        "  --normalize               Merge tags whose names only differ in case or\n"
+        "                            surrounding spaces into the most used one\n"
+        "  --merge SOURCE TARGET     Merge the tag with slug SOURCE into TARGET\n"
+        "  --prune                   Delete the tags of no post\n"
+        "  --dry-run                 Report the changes without saving them\n\n"
+        "Example:\n"
+        "  python manage.py tidy_tags --normalize --merge py python --prune"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--normalize",
+            action="store_true",
+            help="Merge tags whose names only differ in case or surrounding spaces",
+        )
+        parser.add_argument(
+            "--merge",
+            nargs=2,
+            action="append",
+            default=[],
+            metavar=("SOURCE", "TARGET"),
+            help="Merge the tag with slug SOURCE into TARGET",
+        )
+        parser.add_argument("--prune", action="store_true", help="Delete the tags of no post")
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Report the changes without saving them"
+        )
+
+    @staticmethod
+    def _tag(slug: str) -> Tag:
+        try:
+            return Tag.objects.get(slug=slug)
+        except Tag.DoesNotExist:
+            raise CommandError(f"No tag with slug {slug!r}.") from None
+
+    def _merge(self, target: Tag, sources: list[Tag]) -> None:
+        moved = tidytags.merge(target, sources)
+        names = ", ".join(tag.name for tag in sources)
+        self.stdout.write(f"Merged {names} into {target.name} ({moved} tagged items moved)")
+
+    def handle(self, *args: Any, **kwargs: Any) -> None:
+        if not (kwargs["normalize"] or kwargs["merge"] or kwargs["prune"]):
+            raise CommandError("Nothing to do, pass --normalize, --merge or --prune.")
+
+        with transaction.atomic():
+            if kwargs["normalize"]:
+                for target, *sources in tidytags.duplicates():
+                    self._merge(target, sources)
+            for source, target in kwargs["merge"]:
+                # Checked here, a normalization may have merged one of them already
+                self._merge(self._tag(target), [self._tag(source)])
+            if kwargs["prune"]:
+                for name in tidytags.prune():
+                    self.stdout.write(f"Deleted {name}")
+            if kwargs["dry_run"]:
+                # Nor do the caches see anything, their updates wait for a commit.
+                transaction.set_rollback(True)
+
+        message = "Dry run, nothing saved" if kwargs["dry_run"] else "Tags tidied"
+        self.stdout.write(self.style.SUCCESS(message))
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-19 08:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0005_outgoingemail"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CacheInvalidation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("keys", models.JSONField()),
+                ("created", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "ordering": ["id"],
+                "indexes": [
+                    models.Index(fields=["created"], name="blog_cachei_created_8c8a28_idx")
+                ],
+            },
+        ),
+    ]
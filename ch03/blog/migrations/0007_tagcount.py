@@ -0,0 +1,53 @@
+# Generated by Django 5.2.8 on 2026-10-19 09:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def count_tags(apps, schema_editor):
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    Post = apps.get_model("blog", "Post")
+    TagCount = apps.get_model("blog", "TagCount")
+    TaggedItem = apps.get_model("taggit", "TaggedItem")
+    content_type = ContentType.objects.filter(app_label="blog", model="post").first()
+    if content_type is None:
+        return
+    counts = (
+        TaggedItem.objects.filter(
+            content_type=content_type,
+            object_id__in=Post.objects.filter(status="PB").values("id"),
+        )
+        .values("tag_id")
+        .annotate(count=models.Count("id"))
+    )
+    TagCount.objects.bulk_create(
+        TagCount(tag_id=c["tag_id"], published_posts=c["count"]) for c in counts
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0006_cacheinvalidation"),
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("taggit", "0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TagCount",
+            fields=[
+                (
+                    "tag",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="published_count",
+                        serialize=False,
+                        to="taggit.tag",
+                    ),
+                ),
+                ("published_posts", models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(count_tags, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.8 on 2026-10-19 09:12
+
+from collections import Counter
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def count_months(apps, schema_editor):
+    ArchiveMonth = apps.get_model("blog", "ArchiveMonth")
+    Post = apps.get_model("blog", "Post")
+    counts = Counter(
+        (local.year, local.month)
+        for local in map(
+            timezone.localtime,
+            Post.objects.filter(status="PB").values_list("publish", flat=True).iterator(),
+        )
+    )
+    ArchiveMonth.objects.bulk_create(
+        ArchiveMonth(year=year, month=month, posts=posts) for (year, month), posts in counts.items()
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0007_tagcount"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchiveMonth",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("year", models.PositiveSmallIntegerField()),
+                ("month", models.PositiveSmallIntegerField()),
+                ("posts", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "ordering": ["-year", "-month"],
+                "constraints": [
+                    models.UniqueConstraint(fields=("year", "month"), name="unique_archive_month")
+                ],
+            },
+        ),
+        migrations.RunPython(count_months, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.8 on 2026-10-19 09:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def count_authors(apps, schema_editor):
+    AuthorStats = apps.get_model("blog", "AuthorStats")
+    Comment = apps.get_model("blog", "Comment")
+    Post = apps.get_model("blog", "Post")
+    comments = dict(
+        Comment.objects.filter(active=True, post__status="PB")
+        .values("post__author_id")
+        .annotate(comments=models.Count("id"))
+        .values_list("post__author_id", "comments")
+    )
+    AuthorStats.objects.bulk_create(
+        AuthorStats(
+            author_id=row["author_id"],
+            published_posts=row["posts"],
+            last_published=row["last"],
+            comments=comments.get(row["author_id"], 0),
+        )
+        for row in Post.objects.filter(status="PB")
+        .values("author_id")
+        .annotate(posts=models.Count("id"), last=models.Max("publish"))
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("blog", "0008_archivemonth"),
+        ("taggit", "0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AuthorStats",
+            fields=[
+                (
+                    "author",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="blog_stats",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("published_posts", models.PositiveIntegerField(default=0)),
+                ("last_published", models.DateTimeField(blank=True, null=True)),
+                ("comments", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name_plural": "author stats",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["author", "status", "-publish", "-id"], name="blog_post_author__ebf510_idx"
+            ),
+        ),
+        migrations.RunPython(count_authors, migrations.RunPython.noop),
+    ]
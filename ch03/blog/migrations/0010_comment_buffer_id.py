@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-19 09:35
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0009_authorstats"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="comment",
+            name="buffer_id",
+            field=models.UUIDField(editable=False, null=True, unique=True),
+        ),
+        migrations.AlterField(
+            model_name="comment",
+            name="created",
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
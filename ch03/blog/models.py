@@ -1,11 +1,15 @@
-from typing import Any
+import datetime
+from typing import Any, TypedDict
 
 from django.conf import settings
 from django.db import models
+from django.db.models.signals import pre_save
+from django.dispatch import receiver
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.text import slugify
 from taggit.managers import TaggableManager
+from taggit.models import Tag
 
 
 class PublishedManager(models.Manager["Post"]):
@@ -39,6 +43,8 @@ class Post(models.Model):
         ordering = ["-publish"]
         indexes = [
             models.Index(fields=["-publish"]),
+            # The pages of an author, see `blog.authorstats`
+            models.Index(fields=["author", "status", "-publish", "-id"]),
         ]
 
     def __str__(self) -> str:
@@ -61,9 +67,12 @@ class Comment(models.Model):
     name = models.CharField(max_length=80)
     email = models.EmailField()
     body = models.TextField()
-    created = models.DateTimeField(auto_now_add=True)
+    # Not `auto_now_add`, buffered comments keep the time they were submitted.
+    created = models.DateTimeField(default=timezone.now, editable=False)
     updated = models.DateTimeField(auto_now=True)
     active = models.BooleanField(default=True)
+    # Set by `comment_buffer.flush()` so a replayed buffer inserts nothing twice.
+    buffer_id = models.UUIDField(null=True, unique=True, editable=False)
 
     class Meta:
         ordering = ["created"]
@@ -73,3 +82,137 @@ class Comment(models.Model):
 
     def __str__(self) -> str:
         return f"Comment by {self.name} on {self.post}"
+
+
+class OutgoingEmail(models.Model):
+    class Status(models.TextChoices):
+        PENDING = "PD", "Pending"
+        SENT = "ST", "Sent"
+        FAILED = "FL", "Failed"
+
+    subject = models.TextField()
+    body = models.TextField()
+    to = models.EmailField()
+    status = models.CharField(max_length=2, choices=Status, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    sent = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["created"]
+        indexes = [
+            models.Index(fields=["status", "next_attempt"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"Email to {self.to}: {self.subject}"
+
+
+class CacheInvalidation(models.Model):
+    """
+    Cache keys deleted by one worker process, for the others to evict too.
+    """
+
+    keys = models.JSONField()
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["created"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"Invalidation of {len(self.keys)} keys"
+
+
+class TagCount(models.Model):
+    """
+    The number of published posts of a tag, kept up to date by `blog.tagcounts`.
+    """
+
+    tag = models.OneToOneField(
+        Tag, on_delete=models.CASCADE, primary_key=True, related_name="published_count"
+    )
+    published_posts = models.PositiveIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f"{self.tag}: {self.published_posts} posts"
+
+
+class ArchiveMonth(models.Model):
+    """
+    The number of published posts of a month, kept up to date by `blog.archive`.
+    """
+
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    posts = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["-year", "-month"]
+        constraints = [
+            models.UniqueConstraint(fields=["year", "month"], name="unique_archive_month"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.year}-{self.month:02}: {self.posts} posts"
+
+    def get_absolute_url(self) -> str:
+        return reverse("blog:post_archive_month", args=[self.year, self.month])
+
+    @property
+    def date(self) -> datetime.date:
+        return datetime.date(self.year, self.month, 1)
+
+
+class AuthorStats(models.Model):
+    """
+    Totals of an author's published posts, kept up to date by `blog.authorstats`.
+    """
+
+    author = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="blog_stats",
+    )
+    published_posts = models.PositiveIntegerField(default=0)
+    last_published = models.DateTimeField(null=True, blank=True)
+    # Active comments of the published posts
+    comments = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "author stats"
+
+    def __str__(self) -> str:
+        return f"{self.author}: {self.published_posts} posts, {self.comments} comments"
+
+
+class SavedPost(TypedDict):
+    status: str
+    publish: datetime.datetime
+    author_id: int
+
+
+SAVED_ATTR = "_saved_post"
+
+
+def saved(post: Post) -> SavedPost | None:
+    """
+    The columns the derived data depends on, as stored before the current save
+    of `post`, or `None` if it wasn't stored yet.
+    """
+    row: SavedPost | None = getattr(post, SAVED_ATTR, None)
+    return row
+
+
+@receiver(pre_save, sender=Post)
+def _post_saving(sender: type[Post], instance: Post, **kwargs: Any) -> None:
+    # Read once for every receiver of `post_save` comparing against it
+    row = None
+    if instance.pk is not None:
+        row = Post.objects.filter(pk=instance.pk).values("status", "publish", "author_id").first()
+    setattr(instance, SAVED_ATTR, row)
@@ -0,0 +1,40 @@
+from django.db.models import QuerySet
+
+from .models import Comment
+from .signals import comments_moderated
+
+
+def _affected_post_ids(queryset: QuerySet[Comment]) -> set[int]:
+    return set(queryset.order_by().values_list("post_id", flat=True).distinct())
+
+
+def set_active(queryset: QuerySet[Comment], active: bool) -> int:
+    """
+    Activate or deactivate comments with a single UPDATE.
+    """
+    # Skip rows that are already in the requested state, so the count is accurate
+    # and the affected posts are only those that actually changed.
+    queryset = queryset.exclude(active=active)
+    post_ids = _affected_post_ids(queryset)
+    if not post_ids:
+        return 0
+    updated = queryset.update(active=active)
+    comments_moderated.send(sender=Comment, post_ids=post_ids)
+    return updated
+
+
+def delete(queryset: QuerySet[Comment]) -> int:
+    """
+    Delete comments with a single DELETE.
+    """
+    post_ids = _affected_post_ids(queryset)
+    if not post_ids:
+        return 0
+    # Materialized, as some databases reject a DELETE filtered on a subquery of
+    # its own table.
+    pks = list(queryset.values_list("pk", flat=True))
+    # Not `delete()`: with `post_delete` receivers, it would fetch every row and
+    # send a signal per comment. Nothing references comments, so nothing cascades.
+    deleted = Comment.objects.filter(pk__in=pks)._raw_delete(using=queryset.db)
+    comments_moderated.send(sender=Comment, post_ids=post_ids)
+    return deleted
@@ -0,0 +1,124 @@
+import asyncio
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .asyncmail import AsyncEmailBackend
+from .models import OutgoingEmail
+
+# Delay before the first retry; doubled after every failed attempt.
+RETRY_BACKOFF = timedelta(seconds=30)
+MAX_RETRY_DELAY = timedelta(hours=1)
+MAX_ATTEMPTS = 5
+# How long a worker owns the emails it claimed before others may pick them up.
+CLAIM_LEASE = timedelta(minutes=5)
+
+
+@dataclass
+class DeliveryResult:
+    sent: int = 0
+    retried: int = 0
+    failed: int = 0
+
+
+def enqueue(subject: str, body: str, to: str) -> OutgoingEmail:
+    return OutgoingEmail.objects.create(subject=subject, body=body, to=to)
+
+
+def _record_failure(email: OutgoingEmail, error: Exception, max_attempts: int) -> bool:
+    """
+    Schedule the next attempt with exponential backoff, or give up.
+    Returns `True` if the email will be retried.
+    """
+    email.attempts += 1
+    email.last_error = f"{type(error).__name__}: {error}"
+    if email.attempts >= max_attempts:
+        email.status = OutgoingEmail.Status.FAILED
+    else:
+        delay = min(RETRY_BACKOFF * 2 ** (email.attempts - 1), MAX_RETRY_DELAY)
+        email.next_attempt = timezone.now() + delay
+    email.save(update_fields=["attempts", "last_error", "status", "next_attempt"])
+    return email.status == OutgoingEmail.Status.PENDING
+
+
+def _claim(batch_size: int) -> list[OutgoingEmail]:
+    """
+    Lease a batch of due emails so concurrent workers skip them.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        # `skip_locked` avoids waiting on rows another worker is claiming,
+        # on databases that support it.
+        due = list(
+            OutgoingEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutgoingEmail.Status.PENDING, next_attempt__lte=now)
+            .order_by("next_attempt")[:batch_size]
+        )
+        # If the worker dies mid-batch, the emails become due again once the lease expires.
+        OutgoingEmail.objects.filter(pk__in=[e.pk for e in due]).update(
+            next_attempt=now + CLAIM_LEASE
+        )
+    return due
+
+
+def _send(messages: list[EmailMessage]) -> list[Exception | None]:
+    """
+    Send the messages over one connection of the configured email backend and
+    return, for each one, the error or `None` if it was sent.
+    """
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:
+        # The mail server is unreachable, the whole batch is retried later.
+        return [e] * len(messages)
+
+    results: list[Exception | None] = []
+    try:
+        for message in messages:
+            message.connection = connection
+            try:
+                message.send()
+            except Exception as e:
+                results.append(e)
+            else:
+                results.append(None)
+    finally:
+        connection.close()
+    return results
+
+
+def deliver(
+    batch_size: int = 100, max_attempts: int = MAX_ATTEMPTS, connections: int = 0
+) -> DeliveryResult:
+    """
+    Send one batch of due emails. With `connections`, the batch goes out over
+    that many concurrent asyncio SMTP sessions instead of the email backend.
+    The claim is committed first, so no transaction is held open during SMTP.
+    """
+    result = DeliveryResult()
+    due = _claim(batch_size)
+    if not due:
+        return result
+
+    messages = [EmailMessage(subject=e.subject, body=e.body, to=[e.to]) for e in due]
+    if connections:
+        errors = asyncio.run(AsyncEmailBackend(connections).send_each(messages))
+    else:
+        errors = _send(messages)
+
+    for email, error in zip(due, errors, strict=True):
+        if error is None:
+            email.attempts += 1
+            email.status = OutgoingEmail.Status.SENT
+            email.sent = timezone.now()
+            email.save(update_fields=["attempts", "status", "sent"])
+            result.sent += 1
+        elif _record_failure(email, error, max_attempts):
+            result.retried += 1
+        else:
+            result.failed += 1
+    return result
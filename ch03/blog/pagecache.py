@@ -0,0 +1,371 @@
+"""
+Full-page cache for anonymous readers.
+
+Views declare the groups of data a page depends on with `depends_on()`: the
+sidebar, the post list, a post, a tag's posts or the tag names. A cached page
+records the generation of each of its groups and is served only while none of
+them was bumped since. Receivers bump the groups a change affects once the
+transaction commits, so a comment purges its post's page but not the others,
+unless it also reorders the sidebar's most commented posts, a group of its own.
+"""
+
+import hashlib
+import re
+import time
+from collections.abc import Callable, Iterable
+from functools import wraps
+from typing import Any
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Model
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.http import HttpRequest, HttpResponse, HttpResponseBase
+from django.middleware.csrf import get_token
+from django.utils.http import urlencode
+from taggit.models import Tag, TaggedItem
+
+from . import coalesce, swr
+from .models import Comment, Post
+from .signals import comments_moderated
+from .templatetags.blog_tags import sidebar_queries
+
+PREFIX = "blog:page"
+
+# Groups of data pages depend on
+SIDEBAR = "sidebar"
+MOST_COMMENTED = "sidebar:most_commented"
+LIST = "list"
+TAGS = "tags"
+
+
+def post_group(post_id: int) -> str:
+    return f"post:{post_id}"
+
+
+def tag_group(tag_id: int) -> str:
+    return f"tag:{tag_id}"
+
+
+# Each reader gets their own CSRF token in place of this one on a hit.
+CSRF_PLACEHOLDER = "__blog_page_cache_csrf_token__"
+CSRF_INPUT = re.compile(r'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+
+GROUPS_ATTR = "_page_cache_groups"
+
+ViewFunc = Callable[..., Any]
+# The sidebar's groups, which are bumped only when their content changed
+SIDEBAR_GROUPS = (SIDEBAR, MOST_COMMENTED)
+
+
+def enabled() -> bool:
+    enabled: bool = settings.BLOG_PAGE_CACHE
+    return enabled
+
+
+def depends_on(request: HttpRequest, *groups: str) -> None:
+    """
+    Declare groups the page rendered for `request` depends on. Pages that
+    declare none are not cached, since nothing would purge them.
+    """
+    if not hasattr(request, GROUPS_ATTR):
+        setattr(request, GROUPS_ATTR, set())
+    getattr(request, GROUPS_ATTR).update(groups)
+
+
+def _group_key(group: str) -> str:
+    return f"{PREFIX}:group:{group}"
+
+
+def _generations(groups: Iterable[str]) -> dict[str, float]:
+    keys = {_group_key(g): g for g in groups}
+    found = cache.get_many(keys)
+    return {keys[k]: v for k, v in found.items()}
+
+
+def _ensure_generations(groups: set[str], started: float) -> dict[str, float]:
+    generations = _generations(groups)
+    for group in groups - generations.keys():
+        # Never bumped or evicted: pages recorded with an older value are stale.
+        cache.add(_group_key(group), started, timeout=None)
+        if group in SIDEBAR_GROUPS:
+            cache.add(_fingerprint_key(group), _sidebar_fingerprint(group), timeout=None)
+    return _generations(groups)
+
+
+def bump(*groups: str) -> None:
+    """
+    Purge every cached page depending on any of `groups`.
+    """
+    now = time.time()
+    cache.set_many({_group_key(g): now for g in groups}, timeout=None)
+
+
+def invalidate() -> None:
+    """
+    Purge every cached page, after writes that send no signals.
+    """
+    swr.invalidate(*SIDEBAR_GROUPS, LIST)
+    bump(*SIDEBAR_GROUPS, LIST, TAGS)
+    cache.delete_many([_fingerprint_key(g) for g in SIDEBAR_GROUPS])
+
+
+def _page_key(request: HttpRequest, params: tuple[str, ...]) -> str:
+    # Only the parameters the view reads, so e.g. tracking parameters share an entry.
+    query = urlencode(sorted((p, request.GET[p]) for p in params if p in request.GET))
+    url = f"{request.get_host()}{request.path}?{query}"
+    return f"{PREFIX}:{hashlib.md5(url.encode(), usedforsecurity=False).hexdigest()}"
+
+
+def _anonymous(request: HttpRequest) -> bool:
+    # A session cookie may mean a signed-in reader, or messages to show.
+    return request.method in ("GET", "HEAD") and settings.SESSION_COOKIE_NAME not in request.COOKIES
+
+
+def _freeze(request: HttpRequest, response: HttpResponseBase) -> dict[str, Any] | None:
+    """
+    The response in a form any anonymous reader can be served from, or `None`
+    if it is specific to this request.
+    """
+    session = getattr(request, "session", None)
+    if (
+        response.status_code != 200
+        or not isinstance(response, HttpResponse)
+        or response.cookies
+        or response.has_header("Cache-Control")
+        or (session is not None and session.accessed)
+    ):
+        return None
+    content = CSRF_INPUT.sub(rf"\g<1>{CSRF_PLACEHOLDER}\g<2>", response.content.decode())
+    return {"content": content, "content_type": response["Content-Type"]}
+
+
+def _thaw(request: HttpRequest, frozen: dict[str, Any], source: str) -> HttpResponse:
+    content: str = frozen["content"]
+    if CSRF_PLACEHOLDER in content:
+        content = content.replace(CSRF_PLACEHOLDER, get_token(request))
+    response = HttpResponse(content, content_type=frozen["content_type"])
+    response["X-Page-Cache"] = source
+    return response
+
+
+def _lookup(request: HttpRequest, key: str) -> HttpResponse | None:
+    entry: dict[str, Any] | None = cache.get(key)
+    if entry is None or _generations(entry["generations"]) != entry["generations"]:
+        return None
+    return _thaw(request, entry, "hit")
+
+
+def _store(request: HttpRequest, key: str, frozen: dict[str, Any] | None, started: float) -> None:
+    groups: set[str] = getattr(request, GROUPS_ATTR, set())
+    if not groups or frozen is None:
+        return
+    generations = _ensure_generations(groups, started)
+    if any(g > started for g in generations.values()):
+        # Purged while rendering, the page may already be stale.
+        return
+    cache.set(key, {**frozen, "generations": generations}, settings.BLOG_PAGE_CACHE_TIMEOUT)
+
+
+def _render(
+    request: HttpRequest, key: str, view: ViewFunc, *args: Any, **kwargs: Any
+) -> tuple[HttpResponseBase, dict[str, Any] | None]:
+    started = time.time()
+    response: HttpResponseBase = view(request, *args, **kwargs)
+    frozen = _freeze(request, response)
+    if enabled():
+        _store(request, key, frozen, started)
+        response["X-Page-Cache"] = "miss"
+    return response, frozen
+
+
+async def _arender(
+    request: HttpRequest, key: str, view: ViewFunc, *args: Any, **kwargs: Any
+) -> tuple[HttpResponseBase, dict[str, Any] | None]:
+    started = time.time()
+    response: HttpResponseBase = await view(request, *args, **kwargs)
+    frozen = await sync_to_async(_freeze)(request, response)
+    if enabled():
+        await sync_to_async(_store)(request, key, frozen, started)
+        response["X-Page-Cache"] = "miss"
+    return response, frozen
+
+
+def cache_page(params: tuple[str, ...] = ()) -> Callable[[ViewFunc], ViewFunc]:
+    """
+    Serve the view from the page cache to anonymous readers. `params` are the
+    query parameters the view reads, the others don't vary the page. On a miss,
+    identical concurrent requests wait for one of them to render the page,
+    with `BLOG_COALESCE_REQUESTS` set.
+    """
+
+    def decorator(view: ViewFunc) -> ViewFunc:
+        if iscoroutinefunction(view):
+
+            @wraps(view)
+            async def async_wrapper(
+                request: HttpRequest, *args: Any, **kwargs: Any
+            ) -> HttpResponseBase:
+                if not _anonymous(request) or not (enabled() or coalesce.enabled()):
+                    return await view(request, *args, **kwargs)  # type: ignore[no-any-return]
+                key = _page_key(request, params)
+                if enabled() and (hit := await sync_to_async(_lookup)(request, key)):
+                    return hit
+                if not coalesce.enabled():
+                    return (await _arender(request, key, view, *args, **kwargs))[0]
+
+                async with coalesce.aflight(key) as flight:
+                    if flight.result is not None:
+                        return _thaw(request, flight.result, "coalesced")
+                    response, frozen = await _arender(request, key, view, *args, **kwargs)
+                    flight.publish(frozen)
+                    return response
+
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponseBase:
+            if not _anonymous(request) or not (enabled() or coalesce.enabled()):
+                return view(request, *args, **kwargs)  # type: ignore[no-any-return]
+            key = _page_key(request, params)
+            if enabled() and (hit := _lookup(request, key)):
+                return hit
+            if not coalesce.enabled():
+                return _render(request, key, view, *args, **kwargs)[0]
+
+            with coalesce.flight(key) as flight:
+                if flight.result is not None:
+                    return _thaw(request, flight.result, "coalesced")
+                response, frozen = _render(request, key, view, *args, **kwargs)
+                flight.publish(frozen)
+                return response
+
+        return wrapper
+
+    return decorator
+
+
+def _fingerprint_key(group: str) -> str:
+    # Fingerprint of the group's content when it was last bumped
+    return f"{PREFIX}:fingerprint:{group}"
+
+
+def _sidebar_fingerprint(group: str) -> str:
+    queries = {
+        key: query
+        for key, query in sidebar_queries(fresh=True).items()
+        if key.startswith("most_commented_posts:") == (group == MOST_COMMENTED)
+    }
+    results = {
+        key: [(p.id, p.title, p.get_absolute_url()) if isinstance(p, Post) else p for p in result]
+        if isinstance(result, list)
+        else result
+        for key, result in ((k, q()) for k, q in queries.items())
+    }
+    return hashlib.md5(repr(results).encode(), usedforsecurity=False).hexdigest()
+
+
+def _refresh_sidebar(*groups: str) -> None:
+    # Every page shows the sidebar, so purge them only if it actually changed.
+    for group in groups:
+        fingerprint = _sidebar_fingerprint(group)
+        if cache.get(_fingerprint_key(group)) != fingerprint:
+            cache.set(_fingerprint_key(group), fingerprint, timeout=None)
+            bump(group)
+
+
+def _purging() -> bool:
+    return enabled() or swr.enabled()
+
+
+def _purge(*groups: str, sidebar: tuple[str, ...] = ()) -> None:
+    """
+    Bump `groups` once the transaction commits, and the `sidebar` groups if
+    their content changed. The stale-while-revalidate values of the groups
+    are dropped too, else the pages rendered next would show them.
+    """
+    if not _purging():
+        return
+
+    def purge() -> None:
+        swr.invalidate(*groups, *sidebar)
+        if enabled():
+            bump(*groups)
+            _refresh_sidebar(*sidebar)
+
+    # Pages rendered before the commit still see the old data.
+    transaction.on_commit(purge)
+
+
+def purge_tag(tag_id: int) -> None:
+    """
+    Purge the pages listing the posts of a tag, after writes to its tagged
+    items that send no signals.
+    """
+    # Retagging may change the tag cloud of the sidebar.
+    _purge(tag_group(tag_id), LIST, sidebar=(SIDEBAR,))
+
+
+def _post_tag_ids(post: Post) -> list[int]:
+    return list(post.tags.values_list("id", flat=True))
+
+
+@receiver(post_save, sender=Post)
+def _post_saved(sender: type[Post], instance: Post, **kwargs: Any) -> None:
+    if _purging():
+        tags = map(tag_group, _post_tag_ids(instance))
+        _purge(post_group(instance.id), LIST, *tags, sidebar=SIDEBAR_GROUPS)
+
+
+@receiver(pre_delete, sender=Post)
+def _post_deleting(sender: type[Post], instance: Post, **kwargs: Any) -> None:
+    # Its tagged items are gone by `post_delete`.
+    if _purging():
+        setattr(instance, GROUPS_ATTR, [tag_group(t) for t in _post_tag_ids(instance)])
+
+
+@receiver(post_delete, sender=Post)
+def _post_deleted(sender: type[Post], instance: Post, **kwargs: Any) -> None:
+    tags = getattr(instance, GROUPS_ATTR, [])
+    _purge(post_group(instance.id), LIST, *tags, sidebar=SIDEBAR_GROUPS)
+
+
+@receiver(m2m_changed, sender=TaggedItem)
+def _post_tags_changed(
+    sender: type[TaggedItem],
+    instance: Model,
+    action: str,
+    pk_set: set[int] | None,
+    **kwargs: Any,
+) -> None:
+    if not _purging() or not isinstance(instance, Post):
+        return
+    # Retagging may change the tag cloud of the sidebar.
+    if action == "pre_clear":
+        setattr(instance, GROUPS_ATTR, [tag_group(t) for t in _post_tag_ids(instance)])
+    elif action == "post_clear":
+        _purge(
+            post_group(instance.id), LIST, *getattr(instance, GROUPS_ATTR, []), sidebar=(SIDEBAR,)
+        )
+    elif action in ("post_add", "post_remove"):
+        _purge(post_group(instance.id), LIST, *map(tag_group, pk_set or ()), sidebar=(SIDEBAR,))
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def _tag_changed(sender: type[Tag], instance: Tag, **kwargs: Any) -> None:
+    _purge(TAGS, tag_group(instance.id))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def _comment_changed(sender: type[Comment], instance: Comment, **kwargs: Any) -> None:
+    _purge(post_group(instance.post_id), sidebar=(MOST_COMMENTED,))
+
+
+@receiver(comments_moderated)
+def _comments_moderated(sender: type[Comment], post_ids: set[int], **kwargs: Any) -> None:
+    _purge(*map(post_group, post_ids), sidebar=(MOST_COMMENTED,))
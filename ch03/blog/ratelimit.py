@@ -0,0 +1,141 @@
+"""
+Sliding-window rate limiting for views, with a counter per client and fixed
+window in the default cache. The counters only change through `cache.incr`,
+which is atomic on the shared backends, so concurrent requests of one client
+can't get past the limit together. Worker processes only share the counters
+through a cache they share, so a per-process backend such as `LocMemCache`
+fails the system checks while limits are set.
+"""
+
+import logging
+import math
+import time
+from collections.abc import Callable
+from contextlib import suppress
+from dataclasses import dataclass
+from functools import wraps
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+@dataclass(frozen=True)
+class Rate:
+    """
+    At most `capacity` requests in any `period` seconds.
+    """
+
+    capacity: int
+    period: int
+
+    @classmethod
+    def parse(cls, rate: str) -> Rate:
+        """
+        Parse rates like "5/m": 5 requests per minute.
+        """
+        count, _, period = rate.partition("/")
+        if not count.isdigit() or int(count) < 1 or period[:1] not in PERIODS:
+            raise ValueError(f"Invalid rate {rate!r}, expected one like '5/m'.")
+        return cls(int(count), PERIODS[period[:1]])
+
+
+def _take(key: str, rate: Rate) -> float:
+    """
+    Count a request against the limit under `key`. Returns 0 if it is within
+    the rate, otherwise the number of seconds until it would be.
+
+    The requests of the last `period` seconds are estimated from the counts of
+    the current and the previous window, weighted by how much of the previous
+    window they still cover.
+    """
+    window, elapsed = divmod(time.time(), rate.period)
+    current = f"{key}:{int(window)}"
+    # Kept while it is the current or the previous window
+    cache.add(current, 0, 2 * rate.period)
+    try:
+        count: int = cache.incr(current)
+    except ValueError:
+        # Evicted between `add` and `incr`
+        cache.set(current, 1, 2 * rate.period)
+        count = 1
+    previous: int = cache.get(f"{key}:{int(window) - 1}", 0)
+    # Seconds left in the current window
+    left = rate.period - elapsed
+    if previous * left / rate.period + count <= rate.capacity:
+        return 0
+
+    # Rejected requests don't count against the client.
+    with suppress(ValueError):
+        cache.decr(current)
+    if count <= rate.capacity:
+        # Later in this window, once the previous one weighs less
+        return left - (rate.capacity - count) * rate.period / previous
+    # In the next window, once this one weighs less
+    return left + rate.period * (1 - (rate.capacity - 1) / (count - 1))
+
+
+def client_id(request: HttpRequest) -> str:
+    # Not `request.user`, which would cost a session and a user lookup.
+    client: str = request.META.get("REMOTE_ADDR", "")
+    return client
+
+
+def limited_key(scope: str) -> str:
+    return f"blog:ratelimit:limited:{scope}"
+
+
+def limited_count(scope: str) -> int:
+    """
+    Number of requests rejected for `scope` since the counter was last evicted.
+    """
+    count: int = cache.get(limited_key(scope), 0)
+    return count
+
+
+def _record_limited(scope: str, client: str) -> None:
+    key = limited_key(scope)
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between `add` and `incr`
+        cache.set(key, 1, timeout=None)
+    logger.warning("Rate limited %s for %s", scope, client)
+
+
+ViewFunc = Callable[..., HttpResponse]
+
+
+def ratelimit(scope: str, methods: tuple[str, ...] = ("POST",)) -> Callable[[ViewFunc], ViewFunc]:
+    """
+    Reject requests over the `BLOG_RATELIMITS[scope]` rate with 429 Too Many
+    Requests, before the view does any work.
+    """
+
+    def decorator(view: ViewFunc) -> ViewFunc:
+        @wraps(view)
+        def wrapper(request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+            rate = settings.BLOG_RATELIMITS.get(scope)
+            if rate is None or request.method not in methods:
+                return view(request, *args, **kwargs)
+
+            client = client_id(request)
+            wait = _take(f"blog:ratelimit:{scope}:{client}", Rate.parse(rate))
+            if wait:
+                _record_limited(scope, client)
+                return HttpResponse(
+                    "Too many requests, please try again later.",
+                    status=429,
+                    headers={"Retry-After": str(math.ceil(wait))},
+                )
+            return view(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
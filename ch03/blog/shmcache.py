@@ -0,0 +1,278 @@
+"""
+A cache backend in a memory-mapped file shared by every worker process on the
+host, where `LocMemCache` keeps one copy per process:
+
+    CACHES = {
+        "default": {
+            "BACKEND": "blog.shmcache.SharedMemoryCache",
+            "LOCATION": "/dev/shm/blog-cache",
+            "OPTIONS": {"MAX_ENTRIES": 4096, "MAX_VALUE_SIZE": 64 * 1024},
+        }
+    }
+
+The file is a hash table with open addressing in fixed sets: a key hashes to
+one set of `WAYS` slots and is looked up by scanning them. Each set has its own
+lock, a byte-range lock on the file taken with a thread lock, so only
+operations on the same set wait for each other. A full set evicts with the
+clock algorithm, which gives entries read since the hand last passed a second
+chance. Slots have a fixed size: values larger than `MAX_VALUE_SIZE` once
+pickled are not cached.
+"""
+
+import fcntl
+import hashlib
+import mmap
+import os
+import pickle
+import struct
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.exceptions import ImproperlyConfigured
+
+MAGIC = b"BLOGSHM1"
+WAYS = 16
+# Longer keys are stored as their digest. Django warns about them anyway.
+KEY_SIZE = 250
+
+# Magic, number of sets and slot size, followed by each set's clock hand
+HEADER = struct.Struct("<8sII")
+# In use, read since the clock hand passed, key length, value length, expiry
+# time (0 for never) and key hash, followed by the key and the value
+SLOT = struct.Struct("<BBHIdQ")
+REFERENCED = 1
+EXPIRES = struct.Struct("<d")
+EXPIRES_OFFSET = 8
+
+
+def _digest(key: str) -> tuple[bytes, int]:
+    encoded = key.encode()
+    if len(encoded) > KEY_SIZE:
+        encoded = hashlib.blake2b(encoded).hexdigest().encode()
+    return encoded, int.from_bytes(hashlib.blake2b(encoded, digest_size=8).digest(), "little")
+
+
+class _Table:
+    """
+    The mapped file, opened once per process.
+    """
+
+    def __init__(self, path: str, sets: int, max_value_size: int) -> None:
+        self.sets = sets
+        self.slot_size = SLOT.size + KEY_SIZE + max_value_size
+        # Slots start on a page boundary after the header and the hands.
+        self.start = -(-(HEADER.size + sets) // mmap.PAGESIZE) * mmap.PAGESIZE
+        size = self.start + sets * WAYS * self.slot_size
+        header = HEADER.pack(MAGIC, sets, self.slot_size)
+
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            # Byte 0 of the file is locked while creating it, byte 1 + n for set n.
+            fcntl.lockf(self.fd, fcntl.LOCK_EX, 1, 0)
+            if os.fstat(self.fd).st_size == 0:
+                os.ftruncate(self.fd, size)
+                os.pwrite(self.fd, header, 0)
+            fcntl.lockf(self.fd, fcntl.LOCK_UN, 1, 0)
+            if os.pread(self.fd, HEADER.size, 0) != header or os.fstat(self.fd).st_size != size:
+                raise ImproperlyConfigured(
+                    f"{path} holds a cache with other options, remove it to start afresh."
+                )
+            self.map = mmap.mmap(self.fd, size)
+        except BaseException:
+            os.close(self.fd)
+            raise
+        self.locks = [threading.Lock() for _ in range(sets)]
+
+    @contextmanager
+    def locked(self, key_hash: int, exclusive: bool) -> Iterator[int]:
+        """
+        Lock the set of the key, yielding its number.
+        """
+        n = key_hash % self.sets
+        # File locks are held by the process, the thread lock excludes its other threads.
+        with self.locks[n]:
+            fcntl.lockf(self.fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH, 1, 1 + n)
+            try:
+                yield n
+            finally:
+                fcntl.lockf(self.fd, fcntl.LOCK_UN, 1, 1 + n)
+
+    def _slots(self, n: int) -> range:
+        first = self.start + n * WAYS * self.slot_size
+        return range(first, first + WAYS * self.slot_size, self.slot_size)
+
+    def find(self, n: int, key: bytes, key_hash: int) -> int | None:
+        """
+        The offset of the key's slot in set `n`, expired or not.
+        """
+        for offset in self._slots(n):
+            used, _, key_length, _, _, slot_hash = SLOT.unpack_from(self.map, offset)
+            start = offset + SLOT.size
+            if used and slot_hash == key_hash and self.map[start : start + key_length] == key:
+                return offset
+        return None
+
+    def live(self, offset: int, now: float) -> bool:
+        expires = self.expiry(offset)
+        return not expires or expires > now
+
+    def read(self, offset: int) -> bytes:
+        self.map[offset + REFERENCED] = 1
+        start = offset + SLOT.size + KEY_SIZE
+        return self.map[start : start + SLOT.unpack_from(self.map, offset)[3]]
+
+    def _victim(self, n: int, now: float) -> int:
+        slots = self._slots(n)
+        for offset in slots:
+            if not self.map[offset] or not self.live(offset, now):
+                return offset
+        hand = HEADER.size + n
+        while True:
+            offset = slots[self.map[hand]]
+            self.map[hand] = (self.map[hand] + 1) % WAYS
+            if not self.map[offset + REFERENCED]:
+                return offset
+            self.map[offset + REFERENCED] = 0
+
+    def write(
+        self, n: int, offset: int | None, key: bytes, key_hash: int, value: bytes, expires: float
+    ) -> None:
+        """
+        Write the entry to the key's slot at `offset`, or to a free or evicted one.
+        """
+        if offset is None:
+            offset = self._victim(n, time.time())
+        start = offset + SLOT.size
+        self.map[start : start + len(key)] = key
+        self.map[start + KEY_SIZE : start + KEY_SIZE + len(value)] = value
+        # Entries never read are the first evicted.
+        SLOT.pack_into(self.map, offset, 1, 0, len(key), len(value), expires, key_hash)
+
+    def expiry(self, offset: int) -> float:
+        expires: float = EXPIRES.unpack_from(self.map, offset + EXPIRES_OFFSET)[0]
+        return expires
+
+    def set_expiry(self, offset: int, expires: float) -> None:
+        EXPIRES.pack_into(self.map, offset + EXPIRES_OFFSET, expires)
+
+    def remove(self, offset: int) -> None:
+        self.map[offset] = 0
+
+    def clear(self) -> None:
+        for n in range(self.sets):
+            with self.locked(n, exclusive=True):
+                for offset in self._slots(n):
+                    self.remove(offset)
+
+
+_tables: dict[tuple[int, str, int, int], _Table] = {}
+_tables_lock = threading.Lock()
+
+
+class SharedMemoryCache(BaseCache):
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, location: str, params: dict[str, Any]) -> None:
+        super().__init__(params)
+        self._location = location
+        max_value_size: int = params.get("OPTIONS", {}).get("MAX_VALUE_SIZE", 64 * 1024)
+        self._max_value_size = max_value_size
+        self._sets = -(-self._max_entries // WAYS)
+
+    @property
+    def _table(self) -> _Table:
+        # Django creates a backend per thread, they share the process's mapping.
+        # A forked process maps the file again.
+        key = (os.getpid(), self._location, self._sets, self._max_value_size)
+        with _tables_lock:
+            if key not in _tables:
+                _tables[key] = _Table(self._location, self._sets, self._max_value_size)
+            return _tables[key]
+
+    def _expiry(self, timeout: Any) -> float:
+        expires: float | None = self.get_backend_timeout(timeout)
+        return 0 if expires is None else expires
+
+    def _write(self, key: str, value: Any, timeout: Any, only_if_missing: bool) -> bool:
+        pickled = pickle.dumps(value, self.pickle_protocol)
+        encoded, key_hash = _digest(key)
+        table = self._table
+        with table.locked(key_hash, exclusive=True) as n:
+            offset = table.find(n, encoded, key_hash)
+            if only_if_missing and offset is not None and table.live(offset, time.time()):
+                return False
+            if len(pickled) > self._max_value_size:
+                # Not cached, without leaving an older value behind
+                if offset is not None:
+                    table.remove(offset)
+                return False
+            table.write(n, offset, encoded, key_hash, pickled, self._expiry(timeout))
+        return True
+
+    def add(
+        self, key: Any, value: Any, timeout: Any = DEFAULT_TIMEOUT, version: int | None = None
+    ) -> bool:
+        key = self.make_and_validate_key(key, version=version)
+        return self._write(key, value, timeout, only_if_missing=True)
+
+    def set(
+        self, key: Any, value: Any, timeout: Any = DEFAULT_TIMEOUT, version: int | None = None
+    ) -> None:
+        key = self.make_and_validate_key(key, version=version)
+        self._write(key, value, timeout, only_if_missing=False)
+
+    def get(self, key: Any, default: Any = None, version: int | None = None) -> Any:
+        key = self.make_and_validate_key(key, version=version)
+        encoded, key_hash = _digest(key)
+        table = self._table
+        with table.locked(key_hash, exclusive=False) as n:
+            offset = table.find(n, encoded, key_hash)
+            if offset is None or not table.live(offset, time.time()):
+                return default
+            pickled = table.read(offset)
+        return pickle.loads(pickled)
+
+    def _update(self, key: str, update: Callable[[_Table, int, int], None]) -> bool:
+        """
+        Call `update(table, n, offset)` on the key's entry if it is cached.
+        """
+        encoded, key_hash = _digest(key)
+        table = self._table
+        with table.locked(key_hash, exclusive=True) as n:
+            offset = table.find(n, encoded, key_hash)
+            if offset is None or not table.live(offset, time.time()):
+                return False
+            update(table, n, offset)
+        return True
+
+    def touch(self, key: Any, timeout: Any = DEFAULT_TIMEOUT, version: int | None = None) -> bool:
+        key = self.make_and_validate_key(key, version=version)
+        expires = self._expiry(timeout)
+        return self._update(key, lambda table, n, offset: table.set_expiry(offset, expires))
+
+    def delete(self, key: Any, version: int | None = None) -> bool:
+        key = self.make_and_validate_key(key, version=version)
+        return self._update(key, lambda table, n, offset: table.remove(offset))
+
+    def incr(self, key: Any, delta: int = 1, version: int | None = None) -> Any:
+        key = self.make_and_validate_key(key, version=version)
+        encoded, key_hash = _digest(key)
+        result = None
+
+        def increment(table: _Table, n: int, offset: int) -> None:
+            nonlocal result
+            result = pickle.loads(table.read(offset)) + delta
+            pickled = pickle.dumps(result, self.pickle_protocol)
+            table.write(n, offset, encoded, key_hash, pickled, table.expiry(offset))
+
+        # Unlike the default, atomic across processes
+        if not self._update(key, increment):
+            raise ValueError(f"Key '{key}' not found")
+        return result
+
+    def clear(self) -> None:
+        self._table.clear()
@@ -0,0 +1,16 @@
+from django.dispatch import Signal
+
+# Sent once per bulk moderation or buffered insert with the ids of every post whose
+# comments changed, so derived data can be refreshed with one grouped statement
+# instead of per row.
+# Arguments: post_ids (set[int])
+comments_moderated = Signal()
+
+# Sent when cache keys are deleted, so every in-process copy of them is evicted.
+# Arguments: keys (set[str])
+cache_invalidated = Signal()
+
+# Sent when the published post counts of tags were recounted, so what ranks tags
+# by them can follow.
+# Arguments: counts (dict[int, int], by tag id)
+tag_counts_changed = Signal()
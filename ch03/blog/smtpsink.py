@@ -0,0 +1,113 @@
+"""
+A local SMTP server for the mail tests and the `bench_mail` command.
+"""
+
+import asyncio
+import threading
+from types import TracebackType
+from typing import Any, Self
+
+
+class SMTPSink:
+    """
+    A local SMTP server that accepts and counts every message, for tests and
+    benchmarks. It runs its own event loop in a background thread. `replies`
+    overrides the reply to a verb, e.g. `{b"RCPT": b"550 No such user"}`, and
+    `greeting` the first line.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        replies: dict[bytes, bytes] | None = None,
+        greeting: bytes = b"220 sink ESMTP",
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.replies = replies or {}
+        self.greeting = greeting
+        self.commands: list[bytes] = []
+        self.messages: list[bytes] = []
+        self.recipients: list[list[str]] = []
+        self.sessions = 0
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._server: asyncio.Server | None = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.sessions += 1
+        writer.write(self.greeting + b"\r\n")
+        recipients: list[str] = []
+        while line := await reader.readline():
+            verb = line[:4].upper()
+            self.commands.append(verb)
+            if verb in self.replies and verb != b"QUIT":
+                writer.write(self.replies[verb] + b"\r\n")
+            elif verb == b"EHLO":
+                writer.write(b"250-sink\r\n250-PIPELINING\r\n250 8BITMIME\r\n")
+            elif verb == b"AUTH":
+                writer.write(b"235 Authenticated\r\n")
+            elif verb == b"RCPT":
+                recipients.append(line.decode().split(":", 1)[1].strip().strip("<>"))
+                writer.write(b"250 OK\r\n")
+            elif verb == b"DATA":
+                writer.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+                await writer.drain()
+                lines = []
+                while (data := await reader.readline()) not in (b".\r\n", b""):
+                    lines.append(data)
+                if recipients:
+                    self.messages.append(b"".join(lines))
+                    self.recipients.append(recipients)
+                    writer.write(b"250 OK\r\n")
+                else:
+                    writer.write(b"554 No valid recipients\r\n")
+                recipients = []
+            elif verb == b"QUIT":
+                writer.write(b"221 Bye\r\n")
+                break
+            elif verb == b"RSET":
+                recipients = []
+                writer.write(b"250 OK\r\n")
+            else:
+                writer.write(b"250 OK\r\n")
+            await writer.drain()
+        await writer.drain()
+        writer.close()
+
+    def __enter__(self) -> Self:
+        self._thread.start()
+        server = asyncio.run_coroutine_threadsafe(
+            asyncio.start_server(self._handle, self.host, self.port), self._loop
+        ).result()
+        self._server = server
+        self.port = server.sockets[0].getsockname()[1]
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if self._server is not None:
+            self._server.close()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+def smtp_settings(host: str, port: int) -> dict[str, Any]:
+    """
+    Settings overrides pointing Django's mail backends at a local server.
+    """
+    return {
+        "EMAIL_BACKEND": "django.core.mail.backends.smtp.EmailBackend",
+        "EMAIL_HOST": host,
+        "EMAIL_PORT": port,
+        "EMAIL_HOST_USER": "",
+        "EMAIL_HOST_PASSWORD": "",
+        "EMAIL_USE_TLS": False,
+        "EMAIL_USE_SSL": False,
+    }
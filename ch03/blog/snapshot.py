@@ -0,0 +1,159 @@
+"""
+A JSON Lines snapshot of the blog: one `{"model": ..., "fields": {...}}` record
+per line, in dependency order, with primary keys preserved.
+"""
+
+import json
+import time
+from collections.abc import Collection, Iterable
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import batched, groupby
+from typing import IO, Any
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import Model, QuerySet
+from taggit.models import Tag, TaggedItem
+
+from .exports import CHUNK_SIZE
+from .models import Comment, Post
+
+
+def snapshot_models() -> list[type[Model]]:
+    # Parents before children, so every foreign key points at a row already loaded.
+    return [get_user_model(), Tag, Post, TaggedItem, Comment]
+
+
+def _post_content_type() -> ContentType:
+    return ContentType.objects.get_for_model(Post)
+
+
+def _queryset(model: type[Model]) -> QuerySet[Any]:
+    if model is TaggedItem:
+        # Content type ids differ between databases, the importer fills them in.
+        return model._default_manager.filter(content_type=_post_content_type())
+    return model._default_manager.all()
+
+
+def _columns(model: type[Model]) -> list[str]:
+    columns = [f.attname for f in model._meta.concrete_fields]
+    if model is TaggedItem:
+        columns.remove("content_type_id")
+    return columns
+
+
+class SnapshotEncoder(DjangoJSONEncoder):
+    def default(self, o: Any) -> Any:
+        # `DjangoJSONEncoder` truncates datetimes to milliseconds.
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+@dataclass
+class Stats:
+    rows: dict[str, int] = field(default_factory=dict)
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def total(self) -> int:
+        return sum(self.rows.values())
+
+    @property
+    def rows_per_second(self) -> float:
+        elapsed = time.perf_counter() - self.started
+        return self.total / elapsed if elapsed > 0 else 0.0
+
+    def __str__(self) -> str:
+        counts = ", ".join(f"{label}: {n}" for label, n in self.rows.items())
+        return f"{self.total} rows ({counts}) at {self.rows_per_second:,.0f} rows/s"
+
+
+def export(out: IO[str]) -> Stats:
+    stats = Stats()
+    encoder = SnapshotEncoder()
+    for model in snapshot_models():
+        label = model._meta.label_lower
+        columns = _columns(model)
+        rows = _queryset(model).order_by("pk").values_list(*columns)
+        count = 0
+        for row in rows.iterator(chunk_size=CHUNK_SIZE):
+            record = {"model": label, "fields": dict(zip(columns, row, strict=True))}
+            out.write(encoder.encode(record) + "\n")
+            count += 1
+        stats.rows[label] = count
+    return stats
+
+
+def _insert(model: type[Model], records: list[dict[str, Any]], content_type_id: int) -> None:
+    columns = _columns(model)
+    if model is TaggedItem:
+        columns.append("content_type_id")
+    by_attname = {f.attname: f for f in model._meta.concrete_fields}
+    fields = [by_attname[c] for c in columns]
+
+    quote = connection.ops.quote_name
+    # A raw INSERT keeps `auto_now`/`auto_now_add` values and skips model
+    # instantiation, which `bulk_create()` would both do.
+    sql = "INSERT INTO {} ({}) VALUES ({})".format(
+        quote(model._meta.db_table),
+        ", ".join(quote(c) for c in columns),
+        ", ".join(["%s"] * len(columns)),
+    )
+
+    params = []
+    for record in records:
+        values = record["fields"]
+        if model is TaggedItem:
+            values["content_type_id"] = content_type_id
+        params.append(
+            [
+                f.get_db_prep_save(f.to_python(values[c]), connection)
+                for c, f in zip(columns, fields, strict=True)
+            ]
+        )
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, params)
+
+
+def _parse(number: int, line: str, labels: Collection[str]) -> dict[str, Any]:
+    try:
+        record: dict[str, Any] = json.loads(line)
+        if record["model"] not in labels or not isinstance(record["fields"], dict):
+            raise ValueError(f"not a record of {', '.join(sorted(labels))}")
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"line {number}: {e!r}") from e
+    return record
+
+
+def load(lines: Iterable[str], batch_size: int = CHUNK_SIZE) -> Stats:
+    """
+    Insert the records of a snapshot, `batch_size` rows per statement, in one
+    transaction: a snapshot conflicting with existing rows loads nothing. Raises
+    `ValueError` with the line number of a malformed record.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+    stats = Stats()
+    models = {m._meta.label_lower: m for m in snapshot_models()}
+    content_type_id = _post_content_type().id
+
+    numbered = ((n, line) for n, line in enumerate(lines, 1) if line.strip())
+    with transaction.atomic():
+        for lines_batch in batched(numbered, batch_size, strict=False):
+            batch = [_parse(n, line, models.keys()) for n, line in lines_batch]
+            for label, group in groupby(batch, key=lambda r: r["model"]):
+                records = list(group)
+                _insert(models[label], records, content_type_id)
+                stats.rows[label] = stats.rows.get(label, 0) + len(records)
+
+        # Explicit primary keys don't advance sequences on backends that have them.
+        sequence_sql = connection.ops.sequence_reset_sql(no_style(), list(models.values()))
+        with connection.cursor() as cursor:
+            for sql in sequence_sql:
+                cursor.execute(sql)
+    return stats
@@ -0,0 +1,139 @@
+"""
+Progressive rendering of Django templates.
+
+`render()` returns the page once all of it is rendered. `stream()` yields the
+root template, after resolving `{% extends %}`, node by node, descending into
+its blocks, and sends what it has before every tag or variable. The `<head>`
+goes out before the content block runs its queries, and the content goes out
+before the sidebar runs its queries.
+
+Django reads a synchronous iterator to its end before sending any of it under
+ASGI, so `content()` hands the chunks to ASGI servers as an asynchronous
+iterator, each produced in the thread the synchronous views run in.
+"""
+
+from collections.abc import AsyncIterator, Iterator
+from typing import Any
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpRequest, StreamingHttpResponse
+from django.template import Context, Template
+from django.template.base import Node, TextNode
+from django.template.context import make_context
+from django.template.loader import get_template
+from django.template.loader_tags import BLOCK_CONTEXT_KEY, BlockContext, BlockNode, ExtendsNode
+
+# Marks where the output rendered so far is sent before rendering continues.
+FLUSH = None
+
+
+def _extends(template: Template) -> ExtendsNode | None:
+    # `{% extends %}` has to be the first non-text node.
+    for node in template.nodelist:
+        if not isinstance(node, TextNode):
+            return node if isinstance(node, ExtendsNode) else None
+    return None
+
+
+def _render(node: Node, context: Context) -> Iterator[str | None]:
+    if not isinstance(node, TextNode):
+        # Anything but text may take a while, e.g. run a query.
+        yield FLUSH
+    yield str(node.render_annotated(context))
+
+
+def _block(node: BlockNode, context: Context) -> Iterator[str | None]:
+    # `BlockNode.render()`, yielding the nodes of the overriding block one by one.
+    block_context: BlockContext = context.render_context[BLOCK_CONTEXT_KEY]
+    with context.push():
+        push = block = block_context.pop(node.name)
+        if block is None:
+            block = node
+        block = BlockNode(block.name, block.nodelist)
+        block.context = context
+        context["block"] = block
+        for child in block.nodelist:
+            yield from _render(child, context)
+        if push is not None:
+            block_context.push(node.name, push)
+
+
+def _nodes(template: Template, context: Context) -> Iterator[str | None]:
+    extends = _extends(template)
+    if extends is not None:
+        # `ExtendsNode.render()`, yielding the root template instead of rendering it.
+        parent = extends.get_parent(context)
+        if BLOCK_CONTEXT_KEY not in context.render_context:
+            context.render_context[BLOCK_CONTEXT_KEY] = BlockContext()
+        block_context: BlockContext = context.render_context[BLOCK_CONTEXT_KEY]
+        block_context.add_blocks(extends.blocks)
+        if _extends(parent) is None:
+            blocks = parent.nodelist.get_nodes_by_type(BlockNode)
+            block_context.add_blocks({n.name: n for n in blocks if isinstance(n, BlockNode)})
+        with context.render_context.push_state(parent, isolated_context=False):
+            yield from _nodes(parent, context)
+        return
+
+    for node in template.nodelist:
+        if isinstance(node, BlockNode):
+            yield from _block(node, context)
+        else:
+            yield from _render(node, context)
+
+
+def _stream(template: Template, request: HttpRequest, context: dict[str, Any]) -> Iterator[str]:
+    ctx = make_context(context, request, autoescape=template.engine.autoescape)
+    # `Template.render()`, binding the context processors for the whole stream.
+    with ctx.render_context.push_state(template), ctx.bind_template(template):
+        ctx.template_name = template.name
+        buffer: list[str] = []
+        for output in _nodes(template, ctx):
+            if output is not FLUSH:
+                buffer.append(output)
+            elif (chunk := "".join(buffer)).strip():
+                yield chunk
+                buffer.clear()
+        if chunk := "".join(buffer):
+            yield chunk
+
+
+def _next(chunks: Iterator[str]) -> str | None:
+    return next(chunks, None)
+
+
+async def _aiter(chunks: Iterator[str]) -> AsyncIterator[str]:
+    # Thread-sensitive, so the chunks are produced with the connection of the view.
+    next_chunk = sync_to_async(_next, thread_sensitive=True)
+    while (chunk := await next_chunk(chunks)) is not None:
+        yield chunk
+
+
+def content(request: HttpRequest, chunks: Iterator[str]) -> Iterator[str] | AsyncIterator[str]:
+    """
+    `chunks` as the streaming content of a response to `request`, sent as they
+    are produced under WSGI and ASGI alike.
+    """
+    if isinstance(request, ASGIRequest):
+        return _aiter(chunks)
+    return chunks
+
+
+def stream(request: HttpRequest, template_name: str, context: dict[str, Any]) -> Iterator[str]:
+    """
+    Yield `template_name` rendered with `context` in chunks.
+    """
+    template = get_template(template_name).template  # type: ignore[attr-defined]
+    assert isinstance(template, Template), "Only Django templates can be streamed"
+    return _stream(template, request, context)
+
+
+def render_streaming(
+    request: HttpRequest, template_name: str, context: dict[str, Any]
+) -> StreamingHttpResponse:
+    """
+    Like `render()`, but the response is sent while the template renders.
+    An error past the first chunk can no longer turn into a 500 page, it
+    truncates the response instead.
+    """
+    return StreamingHttpResponse(content(request, stream(request, template_name, context)))
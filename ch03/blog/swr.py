@@ -0,0 +1,131 @@
+"""
+Stale-while-revalidate caching with single-flight recomputation.
+
+A value is fresh for `fresh_for` seconds, then stale for `stale_for` more. The
+first caller past the fresh period takes a lock in the cache and recomputes the
+value while every other caller keeps getting the stale one. Only a value that
+is missing altogether, or past its stale period, makes callers wait for it.
+
+Values of `cached()` functions belong to a group, named after the page cache
+group of the data they are computed from, whose values `invalidate()` drops
+when that data changes.
+"""
+
+import hashlib
+import time
+import uuid
+from collections.abc import Callable, Hashable
+from functools import wraps
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache as shared_cache
+
+from .tiered import cache
+
+PREFIX = "blog:swr"
+
+# How long a recomputation may hold its lock, e.g. if its worker dies
+LOCK_TIMEOUT = 30
+# How long callers wait for another worker to compute a missing value
+MISS_WAIT = 1.0
+POLL_INTERVAL = 0.01
+
+
+def enabled() -> bool:
+    enabled: bool = settings.BLOG_STALE_WHILE_REVALIDATE
+    return enabled
+
+
+def _compute(key: str, compute: Callable[[], Any], fresh_for: int, stale_for: int) -> Any:
+    value = compute()
+    cache.set(key, (value, time.time() + fresh_for), fresh_for + stale_for)
+    return value
+
+
+def get_or_compute(key: str, compute: Callable[[], Any], fresh_for: int, stale_for: int) -> Any:
+    """
+    The value cached under `key`, recomputed with `compute()` by a single
+    caller at a time once it is stale.
+    """
+    entry: tuple[Any, float] | None = cache.get(key)
+    if entry is not None:
+        value, fresh_until = entry
+        if time.time() < fresh_until:
+            return value
+
+    # Locks only make sense in the shared tier.
+    lock = f"{key}:lock"
+    if shared_cache.add(lock, 1, LOCK_TIMEOUT):
+        try:
+            return _compute(key, compute, fresh_for, stale_for)
+        finally:
+            shared_cache.delete(lock)
+
+    if entry is not None:
+        # Another worker is recomputing it.
+        return entry[0]
+
+    deadline = time.monotonic() + MISS_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        if (entry := cache.get(key)) is not None:
+            return entry[0]
+    # The worker holding the lock is too slow or gone.
+    return _compute(key, compute, fresh_for, stale_for)
+
+
+def _generation_key(group: str) -> str:
+    return f"{PREFIX}:generation:{group}"
+
+
+def _generation(group: str) -> str:
+    # From the shared tier, a stale one would serve values computed before a change.
+    generation: str | None = shared_cache.get(_generation_key(group))
+    if generation is None:
+        shared_cache.add(_generation_key(group), uuid.uuid4().hex, timeout=None)
+        generation = shared_cache.get(_generation_key(group))
+    return generation or ""
+
+
+def invalidate(*groups: str) -> None:
+    """
+    Make the `cached()` functions of `groups` recompute their values on the
+    next call, instead of serving them fresh or stale.
+    """
+    if enabled():
+        shared_cache.delete_many([_generation_key(g) for g in groups])
+
+
+Func = Callable[..., Any]
+
+
+def cached(
+    fresh_for: int, stale_for: int, group: str, key: Callable[..., Hashable] | None = None
+) -> Callable[[Func], Func]:
+    """
+    Cache the function's results per arguments with `get_or_compute()`, when
+    `BLOG_STALE_WHILE_REVALIDATE` is on, until `group` is invalidated. `key`
+    maps the arguments to something with a stable `repr()`, by default the
+    arguments themselves.
+    """
+
+    def decorator(func: Func) -> Func:
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not enabled():
+                return func(*args, **kwargs)
+            arguments = key(*args, **kwargs) if key else (args, sorted(kwargs.items()))
+            digest = hashlib.md5(repr(arguments).encode(), usedforsecurity=False).hexdigest()
+            return get_or_compute(
+                f"{PREFIX}:{name}:{_generation(group)}:{digest}",
+                lambda: func(*args, **kwargs),
+                fresh_for,
+                stale_for,
+            )
+
+        return wrapper
+
+    return decorator
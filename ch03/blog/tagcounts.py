@@ -0,0 +1,159 @@
+"""
+Published post counts per tag, for the tag cloud.
+
+The counts are `TagCount` rows, recounted with one grouped query for the tags
+a change affects: a post saved, for instance when its status flips, or
+deleted, and tags added to or removed from a post. The cloud built from them
+is kept in the two-tier cache until they or the tag names change, so the
+sidebar shows it without a query.
+"""
+
+import math
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Count, Model
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from taggit.models import Tag, TaggedItem
+
+from .models import Post, TagCount
+from .signals import tag_counts_changed
+from .tiered import cache
+
+CLOUD_KEY = "blog:tagcloud"
+CLOUD_TIMEOUT = 24 * 60 * 60
+# Number of font sizes of the cloud
+WEIGHTS = 5
+
+TAG_IDS_ATTR = "_tag_count_ids"
+
+
+@dataclass(frozen=True)
+class CloudTag:
+    name: str
+    slug: str
+    count: int
+    # From 1 for the least used tags to `WEIGHTS` for the most used
+    weight: int
+
+
+def refresh(tag_ids: Iterable[int]) -> None:
+    """
+    Recount the published posts of the tags.
+    """
+    # Tags deleted meanwhile have lost their count with them.
+    tag_ids = set(Tag.objects.filter(id__in=set(tag_ids)).values_list("id", flat=True))
+    if not tag_ids:
+        return
+    counts = dict(
+        TaggedItem.objects.filter(
+            tag_id__in=tag_ids,
+            content_type=ContentType.objects.get_for_model(Post),
+            object_id__in=Post.published.values("id"),
+        )
+        .values("tag_id")
+        .annotate(count=Count("id"))
+        .values_list("tag_id", "count")
+    )
+    counts = {tag_id: counts.get(tag_id, 0) for tag_id in tag_ids}
+    TagCount.objects.bulk_create(
+        [TagCount(tag_id=tag_id, published_posts=count) for tag_id, count in counts.items()],
+        update_conflicts=True,
+        unique_fields=["tag"],
+        update_fields=["published_posts"],
+    )
+    tag_counts_changed.send(sender=TagCount, counts=counts)
+    _forget_cloud()
+
+
+def rebuild() -> None:
+    """
+    Recount every tag, after writes that send no signals.
+    """
+    refresh(Tag.objects.values_list("id", flat=True))
+
+
+def _forget_cloud() -> None:
+    # Not before the commit, or a request meanwhile could cache the old cloud again.
+    transaction.on_commit(lambda: cache.delete(CLOUD_KEY))
+
+
+def _weight(count: int, fewest: int, most: int) -> int:
+    # Logarithmic, so a few very common tags don't shrink all others to the minimum
+    if most == fewest:
+        return 1
+    scale = (math.log(count) - math.log(fewest)) / (math.log(most) - math.log(fewest))
+    return 1 + round(scale * (WEIGHTS - 1))
+
+
+def cloud(fresh: bool = False) -> list[CloudTag]:
+    """
+    The tags of published posts by name, weighted by their number of posts.
+    With `fresh`, bypasses the cache.
+    """
+    found: list[CloudTag] | None = None if fresh else cache.get(CLOUD_KEY)
+    if found is None:
+        counts = list(
+            TagCount.objects.filter(published_posts__gt=0)
+            .select_related("tag")
+            .order_by("tag__name")
+        )
+        numbers = [c.published_posts for c in counts]
+        fewest, most = min(numbers, default=0), max(numbers, default=0)
+        found = [
+            CloudTag(c.tag.name, c.tag.slug, n, _weight(n, fewest, most))
+            for c in counts
+            if (n := c.published_posts)
+        ]
+        if not fresh:
+            cache.set(CLOUD_KEY, found, CLOUD_TIMEOUT)
+    return found
+
+
+def _post_tag_ids(post: Post) -> list[int]:
+    return list(post.tags.values_list("id", flat=True))
+
+
+@receiver(post_save, sender=Post)
+def _post_saved(sender: type[Post], instance: Post, **kwargs: Any) -> None:
+    refresh(_post_tag_ids(instance))
+
+
+@receiver(pre_delete, sender=Post)
+def _post_deleting(sender: type[Post], instance: Post, **kwargs: Any) -> None:
+    # Its tagged items are gone by `post_delete`.
+    setattr(instance, TAG_IDS_ATTR, _post_tag_ids(instance))
+
+
+@receiver(post_delete, sender=Post)
+def _post_deleted(sender: type[Post], instance: Post, **kwargs: Any) -> None:
+    refresh(getattr(instance, TAG_IDS_ATTR, []))
+
+
+@receiver(m2m_changed, sender=TaggedItem)
+def _post_tags_changed(
+    sender: type[TaggedItem],
+    instance: Model,
+    action: str,
+    pk_set: set[int] | None,
+    **kwargs: Any,
+) -> None:
+    if not isinstance(instance, Post):
+        return
+    if action == "pre_clear":
+        setattr(instance, TAG_IDS_ATTR, _post_tag_ids(instance))
+    elif action == "post_clear":
+        refresh(getattr(instance, TAG_IDS_ATTR, []))
+    elif action in ("post_add", "post_remove"):
+        refresh(pk_set or ())
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def _tag_changed(sender: type[Tag], **kwargs: Any) -> None:
+    # A renamed tag, or a deleted one and its count
+    _forget_cloud()
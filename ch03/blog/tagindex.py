@@ -0,0 +1,293 @@
+"""
+In-memory index of the published posts of each tag, for the tag pages.
+
+A tag's posts are a bitmap, a Python int whose bit n stands for the nth newest
+published post. The posts with all of several tags are then the AND of their
+bitmaps, the posts with any of them the OR, and a page of them is found by
+counting set bits, without a join. The related tags of a page, with their
+counts among its posts, are the set bits of its bitmap ANDed with every other
+tag's, and are kept with the index until it changes. The index is
+`versioned`, every change to the published posts or their tags makes the
+processes rebuild it once committed. Only publishing, unpublishing or moving a
+post shifts the positions of the index, the process that retags a post or
+renames a tag applies the change to its own in place.
+
+The bitmaps are not compressed: an int takes a bit for every published post
+up to the tag's oldest, at most an eighth of a byte per post and tag. In
+exchange AND, OR and counting bits run in C, faster than a compressed format
+kept in Python could be combined.
+"""
+
+import operator
+from collections import defaultdict
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from functools import reduce
+from typing import Any, overload
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Model
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from taggit.models import Tag, TaggedItem
+
+from .models import Post, saved
+from .versioned import Versioned
+
+VERSION_KEY = "blog:tagindex:version"
+
+# Separators of the tag slugs in a tag page URL
+MATCH_ALL = "+"
+MATCH_ANY = ","
+
+# Related tags shown on a tag page
+FACETS = 10
+# Bounds the facets kept per index, one entry per combination of tags requested
+MAX_FACET_ENTRIES = 1000
+
+
+def enabled() -> bool:
+    enabled: bool = settings.BLOG_TAG_INDEX
+    return enabled
+
+
+def parse(expression: str) -> tuple[list[str], bool]:
+    """
+    The slugs of a tag page URL, `a+b` for the posts with all of the tags or
+    `a,b` for the posts with any of them, and whether all must match.
+    """
+    if MATCH_ALL in expression:
+        return expression.split(MATCH_ALL), True
+    return expression.split(MATCH_ANY), False
+
+
+def _set_bits(bitmap: int, start: int, stop: int) -> Iterator[int]:
+    """
+    The positions of the set bits of `bitmap` from the `start`th to before the
+    `stop`th, counting from the lowest.
+    """
+    seen = 0
+    for i, byte in enumerate(bitmap.to_bytes(-(-bitmap.bit_length() // 8), "little")):
+        count = byte.bit_count()
+        if seen + count <= start:
+            # Skips whole bytes before the page
+            seen += count
+            continue
+        for bit in range(8):
+            if byte >> bit & 1:
+                if seen >= start:
+                    yield i * 8 + bit
+                seen += 1
+                if seen >= stop:
+                    return
+
+
+class PostIds(Sequence[int]):
+    """
+    The ids of the posts of a bitmap, newest first, sliced by `Paginator`.
+    """
+
+    def __init__(self, bitmap: int, ids: list[int]) -> None:
+        self.bitmap = bitmap
+        self.ids = ids
+        self._length = bitmap.bit_count()
+
+    def __len__(self) -> int:
+        return self._length
+
+    @overload
+    def __getitem__(self, index: int) -> int: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[int]: ...
+
+    def __getitem__(self, index: int | slice) -> int | list[int]:
+        if isinstance(index, slice):
+            start, stop, _ = index.indices(self._length)
+            return [self.ids[n] for n in _set_bits(self.bitmap, start, stop)]
+        if not 0 <= index < self._length:
+            raise IndexError(index)
+        return self.ids[next(_set_bits(self.bitmap, index, index + 1))]
+
+
+@dataclass(frozen=True)
+class Facet:
+    name: str
+    slug: str
+    # Posts of the page that also have this tag
+    count: int
+
+
+class _Index:
+    def __init__(
+        self,
+        ids: list[int],
+        tagged: Iterable[tuple[int, int]],
+        tags: Iterable[tuple[int, str, str]],
+    ) -> None:
+        self.ids = ids
+        self.tags = {tag_id: (name, slug) for tag_id, name, slug in tags}
+        self.facets: dict[tuple[frozenset[int], bool], list[Facet]] = {}
+        self.position = {post_id: n for n, post_id in enumerate(ids)}
+        bits: defaultdict[int, bytearray] = defaultdict(lambda: bytearray(-(-len(ids) // 8)))
+        for tag_id, post_id in tagged:
+            if (n := self.position.get(post_id)) is not None:
+                # Setting bits of an int one at a time would copy it every time.
+                bits[tag_id][n >> 3] |= 1 << (n & 7)
+        self.bitmaps = {tag_id: int.from_bytes(b, "little") for tag_id, b in bits.items()}
+
+
+def _build() -> _Index:
+    # The order of the post list, ties broken by id
+    ids = list(Post.published.order_by("-publish", "-id").values_list("id", flat=True))
+    tagged = TaggedItem.objects.filter(
+        content_type=ContentType.objects.get_for_model(Post)
+    ).values_list("tag_id", "object_id")
+    return _Index(ids, tagged, Tag.objects.values_list("id", "name", "slug"))
+
+
+_index = Versioned(VERSION_KEY, _build)
+
+
+def _bitmap(index: _Index, tag_ids: list[int], match_all: bool) -> int:
+    bitmaps = (index.bitmaps.get(tag_id, 0) for tag_id in tag_ids)
+    return reduce(operator.and_ if match_all else operator.or_, bitmaps)
+
+
+def select(tag_ids: list[int], match_all: bool) -> PostIds:
+    """
+    The ids of the published posts with all, or any, of the tags, newest first.
+    """
+    index = _index.get()
+    return PostIds(_bitmap(index, tag_ids, match_all), index.ids)
+
+
+def facets(tag_ids: list[int], match_all: bool) -> list[Facet]:
+    """
+    The other tags of the published posts with all, or any, of the tags, with
+    how many of those posts have each, the most common `FACETS` first.
+    """
+    index = _index.get()
+    key = (frozenset(tag_ids), match_all)
+    if (found := index.facets.get(key)) is None:
+        bitmap = _bitmap(index, tag_ids, match_all)
+        counts = [
+            (count, tag_id)
+            for tag_id, other in index.bitmaps.items()
+            if tag_id not in key[0] and (count := (bitmap & other).bit_count())
+        ]
+        counts.sort(key=lambda c: (-c[0], index.tags[c[1]][0]))
+        found = [Facet(*index.tags[tag_id], count) for count, tag_id in counts[:FACETS]]
+        if len(index.facets) >= MAX_FACET_ENTRIES:
+            index.facets.clear()
+        index.facets[key] = found
+    return found
+
+
+def invalidate() -> None:
+    """
+    Make every process rebuild its index.
+    """
+    _index.invalidate()
+
+
+def _changed() -> None:
+    if enabled():
+        # Others would rebuild without the change before the commit.
+        transaction.on_commit(invalidate)
+
+
+def _changed_in_place(update: Callable[[_Index], bool]) -> None:
+    # Readers may hold the dicts of the index, so `update()` replaces them
+    # instead of mutating them.
+    def apply(index: _Index) -> bool:
+        if not update(index):
+            return False
+        index.facets = {}
+        return True
+
+    if enabled():
+        transaction.on_commit(lambda: _index.update(apply))
+
+
+def _publish(post: Post) -> datetime | None:
+    if post.status != Post.Status.PUBLISHED:
+        return None
+    # A post saved with its date as a string still has it.
+    publish: datetime = Post._meta.get_field("publish").to_python(post.publish)
+    return publish
+
+
+@receiver(post_save, sender=Post)
+def _post_saved(sender: type[Post], instance: Post, **kwargs: Any) -> None:
+    # When the post was published, if it was
+    row = saved(instance)
+    publish = row["publish"] if row and row["status"] == Post.Status.PUBLISHED else None
+    # Other edits, and those of drafts, leave the index as it is.
+    if _publish(instance) != publish:
+        _changed()
+
+
+@receiver(post_delete, sender=Post)
+def _post_deleted(sender: type[Post], instance: Post, **kwargs: Any) -> None:
+    if instance.status == Post.Status.PUBLISHED:
+        _changed()
+
+
+@receiver(m2m_changed, sender=TaggedItem)
+def _post_tags_changed(
+    sender: type[TaggedItem],
+    instance: Model,
+    action: str,
+    pk_set: set[int] | None,
+    **kwargs: Any,
+) -> None:
+    if (
+        not isinstance(instance, Post)
+        or instance.status != Post.Status.PUBLISHED
+        or action not in ("post_add", "post_remove", "post_clear")
+    ):
+        return
+    post_id, tag_ids = instance.id, set(pk_set or ())
+
+    def update(index: _Index) -> bool:
+        if (n := index.position.get(post_id)) is None or not tag_ids <= index.tags.keys():
+            return False
+        bit = 1 << n
+        if action == "post_add":
+            changed = {tag_id: index.bitmaps.get(tag_id, 0) | bit for tag_id in tag_ids}
+        else:
+            cleared = tag_ids if action == "post_remove" else index.bitmaps.keys()
+            changed = {tag_id: index.bitmaps.get(tag_id, 0) & ~bit for tag_id in cleared}
+        index.bitmaps = {**index.bitmaps, **changed}
+        return True
+
+    _changed_in_place(update)
+
+
+@receiver(post_save, sender=Tag)
+def _tag_saved(sender: type[Tag], instance: Tag, **kwargs: Any) -> None:
+    # Facets show tag names.
+    tag_id, name, slug = instance.id, instance.name, instance.slug
+
+    def update(index: _Index) -> bool:
+        index.tags = {**index.tags, tag_id: (name, slug)}
+        return True
+
+    _changed_in_place(update)
+
+
+@receiver(post_delete, sender=Tag)
+def _tag_deleted(sender: type[Tag], instance: Tag, **kwargs: Any) -> None:
+    # Its tagged items go with it, without `m2m_changed`.
+    tag_id = instance.id
+
+    def update(index: _Index) -> bool:
+        index.tags = {t: tag for t, tag in index.tags.items() if t != tag_id}
+        index.bitmaps = {t: bitmap for t, bitmap in index.bitmaps.items() if t != tag_id}
+        return True
+
+    _changed_in_place(update)
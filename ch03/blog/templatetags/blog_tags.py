@@ -1,31 +1,121 @@
+from collections.abc import Callable
 from typing import Any
 
 import markdown
 from django import template
-from django.db.models import Count, QuerySet
+from django.db.models import Count
+from django.template import Context
 from django.utils.safestring import SafeString, mark_safe
 
-from ..models import Post
+from .. import archive, swr, tagcounts
+from ..models import ArchiveMonth, Post
 
 register = template.Library()
 
+# Context variable holding sidebar results fetched before rendering, see `sidebar_queries()`.
+SIDEBAR = "sidebar"
 
-@register.simple_tag
-def total_posts() -> int:
+
+def _total_posts() -> int:
     return Post.published.count()
 
 
-@register.inclusion_tag("blog/post/latest_posts.html")
-def show_latest_posts(count: int = 5) -> dict[str, Any]:
-    latest_posts = Post.published.order_by("-publish")[:count]
+def _latest_posts(count: int) -> list[Post]:
+    return list(Post.published.order_by("-publish")[:count])
+
+
+def _most_commented_posts(count: int) -> list[Post]:
+    return list(
+        Post.published.annotate(total_comments=Count("comments")).order_by("-total_comments")[
+            :count
+        ]
+    )
+
+
+# Every page renders the sidebar, so a slightly stale one is a good trade. The
+# groups are those of the page cache, which invalidates them on changes.
+_cached = swr.cached(fresh_for=60, stale_for=10 * 60, group="sidebar")
+_cached_total_posts = _cached(_total_posts)
+_cached_latest_posts = _cached(_latest_posts)
+_cached_most_commented_posts = swr.cached(
+    fresh_for=60, stale_for=10 * 60, group="sidebar:most_commented"
+)(_most_commented_posts)
+
+
+def sidebar_queries(
+    latest_count: int = 3, most_commented_count: int = 5, fresh: bool = False
+) -> dict[str, Callable[[], Any]]:
+    """
+    The queries behind the sidebar of `base.html`, keyed the way the tags look
+    their results up in the `sidebar` context variable. A view can run them
+    ahead of rendering, e.g. concurrently with its own queries. With `fresh`,
+    they bypass the stale-while-revalidate cache and the caches of the tag
+    cloud and the archive.
+    """
+    total, latest, most_commented = (
+        (_total_posts, _latest_posts, _most_commented_posts)
+        if fresh
+        else (_cached_total_posts, _cached_latest_posts, _cached_most_commented_posts)
+    )
+    return {
+        "total_posts": total,
+        f"latest_posts:{latest_count}": lambda: latest(latest_count),
+        f"most_commented_posts:{most_commented_count}": lambda: most_commented(
+            most_commented_count
+        ),
+        "tag_cloud": lambda: tagcounts.cloud(fresh=fresh),
+        "archive_months": lambda: archive.months(fresh=fresh),
+    }
+
+
+def _prefetched(context: Context, key: str) -> Any:
+    prefetched: dict[str, Any] = context.get(SIDEBAR) or {}
+    return prefetched.get(key)
+
+
+@register.simple_tag(takes_context=True)
+def total_posts(context: Context) -> int:
+    total: int | None = _prefetched(context, "total_posts")
+    return _cached_total_posts() if total is None else total
+
+
+@register.inclusion_tag("blog/post/latest_posts.html", takes_context=True)
+def show_latest_posts(context: Context, count: int = 5) -> dict[str, Any]:
+    latest_posts = _prefetched(context, f"latest_posts:{count}")
+    if latest_posts is None:
+        latest_posts = _cached_latest_posts(count)
     return {"latest_posts": latest_posts}
 
 
-@register.simple_tag
-def get_most_commented_posts(count: int = 5) -> QuerySet[Post]:
-    return Post.published.annotate(total_comments=Count("comments")).order_by("-total_comments")[
-        :count
-    ]
+@register.simple_tag(takes_context=True)
+def get_most_commented_posts(context: Context, count: int = 5) -> list[Post]:
+    posts: list[Post] | None = _prefetched(context, f"most_commented_posts:{count}")
+    return _cached_most_commented_posts(count) if posts is None else posts
+
+
+@register.inclusion_tag("blog/post/tag_cloud.html", takes_context=True)
+def show_tag_cloud(context: Context) -> dict[str, Any]:
+    tag_cloud = _prefetched(context, "tag_cloud")
+    if tag_cloud is None:
+        tag_cloud = tagcounts.cloud()
+    return {"tag_cloud": tag_cloud}
+
+
+@register.inclusion_tag("blog/post/archive.html", takes_context=True)
+def show_archive(context: Context) -> dict[str, Any]:
+    months: list[ArchiveMonth] | None = _prefetched(context, "archive_months")
+    if months is None:
+        months = archive.months()
+    # The months come latest first, those of a year together.
+    years: dict[int, list[ArchiveMonth]] = {}
+    for month in months:
+        years.setdefault(month.year, []).append(month)
+    return {
+        "archive_years": [
+            (year, sum(m.posts for m in year_months), year_months)
+            for year, year_months in years.items()
+        ]
+    }
 
 
 @register.filter(name="markdown")
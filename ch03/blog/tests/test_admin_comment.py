@@ -0,0 +1,121 @@
+from http import HTTPStatus
+from typing import Any
+
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models.signals import post_delete
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .. import moderation
+from ..factories import CommentFactory, PostFactory
+from ..models import Comment, Post
+from ..signals import comments_moderated
+
+
+class TestCommentAdminActions(TestCase):
+    admin_user: User
+    post1: Post
+    post2: Post
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.admin_user = User.objects.create_superuser(
+            username="admin",
+            email="admin@example.com",
+            password="password",
+        )
+        cls.post1 = PostFactory.create(status=Post.Status.PUBLISHED)
+        cls.post2 = PostFactory.create(status=Post.Status.PUBLISHED)
+
+    def setUp(self) -> None:
+        self.client.login(username="admin", password="password")
+        self.url = reverse("admin:blog_comment_changelist")
+        self.comments = [
+            *CommentFactory.create_batch(3, post=self.post1, active=True),
+            *CommentFactory.create_batch(2, post=self.post2, active=False),
+        ]
+        self.moderated: list[set[int]] = []
+        comments_moderated.connect(self._on_moderated)
+
+    def tearDown(self) -> None:
+        comments_moderated.disconnect(self._on_moderated)
+
+    def _on_moderated(self, sender: type[Comment], post_ids: set[int], **kwargs: Any) -> None:
+        self.moderated.append(post_ids)
+
+    def _run_action(self, action: str, comments: list[Comment]) -> None:
+        data = {"action": action, "_selected_action": [c.pk for c in comments]}
+        response = self.client.post(self.url, data)
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+
+    def test_default_delete_action_is_replaced(self) -> None:
+        response = self.client.get(self.url)
+        actions = dict(response.context["action_form"].fields["action"].choices)
+
+        self.assertNotIn("delete_selected", actions)
+        self.assertIn("delete_comments", actions)
+
+    def test_deactivate_comments(self) -> None:
+        self._run_action("deactivate_comments", self.comments)
+
+        self.assertFalse(Comment.objects.filter(active=True).exists())
+        # Only post1 had active comments, so only post1 is reported
+        self.assertEqual(self.moderated, [{self.post1.id}])
+
+    def test_activate_comments(self) -> None:
+        self._run_action("activate_comments", self.comments)
+
+        self.assertEqual(Comment.objects.filter(active=True).count(), len(self.comments))
+        self.assertEqual(self.moderated, [{self.post2.id}])
+
+    def test_delete_comments(self) -> None:
+        self._run_action("delete_comments", self.comments[:4])
+
+        self.assertEqual(list(Comment.objects.all()), self.comments[4:])
+        self.assertEqual(self.moderated, [{self.post1.id, self.post2.id}])
+
+    def test_delete_sends_no_per_row_signals(self) -> None:
+        seen: list[Comment] = []
+
+        def deleted(sender: type[Comment], instance: Comment, **kwargs: Any) -> None:
+            seen.append(instance)
+
+        post_delete.connect(deleted, sender=Comment)
+        try:
+            self._run_action("delete_comments", self.comments[:4])
+        finally:
+            post_delete.disconnect(deleted, sender=Comment)
+
+        self.assertEqual(seen, [])
+        self.assertEqual(self.moderated, [{self.post1.id, self.post2.id}])
+
+    def test_delete_query_count_is_constant(self) -> None:
+        counts = []
+        for size in (2, 200):
+            comments = CommentFactory.create_batch(size, post=self.post1)
+            with CaptureQueriesContext(connection) as ctx:
+                moderation.delete(Comment.objects.filter(pk__in=[c.pk for c in comments]))
+            counts.append(len(ctx.captured_queries))
+
+        self.assertEqual(counts[0], counts[1])
+        self.assertEqual(Comment.objects.count(), len(self.comments))
+
+    def test_no_signal_when_nothing_changes(self) -> None:
+        self._run_action("deactivate_comments", self.comments[3:])
+
+        self.assertEqual(self.moderated, [])
+
+    def test_actions_use_a_single_write_statement(self) -> None:
+        request = self.client.get(self.url).wsgi_request
+        comment_admin = admin.site.get_model_admin(Comment)
+
+        for action in ["deactivate_comments", "delete_comments"]:
+            with CaptureQueriesContext(connection) as ctx:
+                getattr(comment_admin, action)(request, Comment.objects.all())
+            writes = [
+                q["sql"] for q in ctx.captured_queries if q["sql"].startswith(("UPDATE", "DELETE"))
+            ]
+            self.assertEqual(len(writes), 1, writes)
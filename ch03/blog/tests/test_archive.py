@@ -0,0 +1,83 @@
+from datetime import datetime
+from http import HTTPStatus
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import archive
+from ..factories import PostFactory
+from ..models import ArchiveMonth, Post
+from ..tiered import cache
+
+
+def _at(year: int, month: int, day: int = 1) -> datetime:
+    return datetime(year, month, day, tzinfo=timezone.get_current_timezone())
+
+
+class ArchiveTestCase(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.march = PostFactory.create(status=Post.Status.PUBLISHED, publish=_at(2024, 3, 31))
+        PostFactory.create(status=Post.Status.PUBLISHED, publish=_at(2024, 3, 1))
+        PostFactory.create(status=Post.Status.PUBLISHED, publish=_at(2023, 12, 31))
+        PostFactory.create(status=Post.Status.DRAFT, publish=_at(2024, 4, 1))
+
+    def _counts(self) -> list[tuple[int, int, int]]:
+        return list(ArchiveMonth.objects.values_list("year", "month", "posts"))
+
+    def test_counts(self) -> None:
+        self.assertEqual(self._counts(), [(2024, 3, 2), (2023, 12, 1)])
+
+    def test_unpublish_and_move(self) -> None:
+        self.march.status = Post.Status.DRAFT
+        self.march.save()
+        self.assertEqual(self._counts(), [(2024, 3, 1), (2023, 12, 1)])
+
+        self.march.status = Post.Status.PUBLISHED
+        self.march.publish = _at(2024, 5, 2)
+        self.march.save()
+        self.assertEqual(self._counts(), [(2024, 5, 1), (2024, 3, 1), (2023, 12, 1)])
+
+    def test_delete(self) -> None:
+        Post.objects.filter(publish__lt=_at(2024, 1)).get().delete()
+
+        self.assertEqual(self._counts(), [(2024, 3, 2)])
+
+    def test_rebuild(self) -> None:
+        ArchiveMonth.objects.all().delete()
+        ArchiveMonth.objects.create(year=2020, month=1, posts=5)
+        archive.rebuild()
+
+        self.assertEqual(self._counts(), [(2024, 3, 2), (2023, 12, 1)])
+
+    def test_range_scan(self) -> None:
+        with CaptureQueriesContext(connection) as queries:
+            list(archive.published_in(2024, 3))
+
+        sql = queries[0]["sql"]
+        self.assertIn('"blog_post"."publish" >=', sql)
+        self.assertNotIn("django_datetime_extract", sql)
+
+    def test_archive_pages(self) -> None:
+        response = self.client.get(reverse("blog:post_archive_month", args=[2024, 3]))
+        self.assertEqual(len(response.context["posts"]), 2)
+        self.assertContains(response, "Posts from March 2024")
+
+        response = self.client.get(reverse("blog:post_archive_year", args=[2023]))
+        self.assertEqual(len(response.context["posts"]), 1)
+
+        response = self.client.get(reverse("blog:post_archive_month", args=[2024, 13]))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_sidebar(self) -> None:
+        self.client.get(reverse("blog:post_list"))
+        response = self.client.get(reverse("blog:post_list"))
+
+        year_url = reverse("blog:post_archive_year", args=[2024])
+        self.assertContains(response, f'<a href="{year_url}">2024</a> (2)')
+        self.assertContains(response, "March</a> (2)")
+        with self.assertNumQueries(0):
+            archive.months()
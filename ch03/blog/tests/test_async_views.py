@@ -0,0 +1,135 @@
+import asyncio
+from http import HTTPStatus
+from types import ModuleType
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.http import StreamingHttpResponse
+from django.test import AsyncRequestFactory, TransactionTestCase, override_settings
+from django.urls import include, path
+
+from .. import views
+from ..factories import CommentFactory, PostFactory
+from ..models import Post
+from ..urls import post_patterns
+
+async_urls = ModuleType("async_urls")
+async_urls.urlpatterns = [  # type: ignore[attr-defined]
+    path("blog/", include((post_patterns(async_views=True), "blog"))),
+]
+
+
+# The detail view reads from worker threads with their own connections, which
+# only see committed rows.
+@override_settings(ROOT_URLCONF=async_urls)
+class AsyncViewsTestCase(TransactionTestCase):
+    def setUp(self) -> None:
+        self.posts = [
+            PostFactory.create(status=Post.Status.PUBLISHED, tags=["django", "python"])
+            for _ in range(4)
+        ]
+        self.draft = PostFactory.create(status=Post.Status.DRAFT, tags=["django"])
+        self.post = self.posts[0]
+        CommentFactory.create_batch(2, post=self.post)
+        CommentFactory.create(post=self.post, active=False)
+
+    async def test_post_list_paginates(self) -> None:
+        response = await self.async_client.get("/blog/")
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        page = response.context["posts"]
+        self.assertEqual(len(page), 3)
+        self.assertEqual(page.paginator.num_pages, 2)
+        self.assertNotContains(response, self.draft.title)
+
+    async def test_post_list_page_fallbacks(self) -> None:
+        response = await self.async_client.get("/blog/?page=99")
+        self.assertEqual(response.context["posts"].number, 2)
+
+        response = await self.async_client.get("/blog/?page=invalid")
+        self.assertEqual(response.context["posts"].number, 1)
+
+    async def test_post_list_by_tag(self) -> None:
+        response = await self.async_client.get("/blog/tag/python/")
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.context["tag"].slug, "python")
+        self.assertEqual(response.context["posts"].paginator.count, 4)
+
+    @override_settings(BLOG_TAG_INDEX=True)
+    async def test_post_list_by_tags_from_index(self) -> None:
+        await sync_to_async(cache.clear)()
+        response = await self.async_client.get("/blog/tag/django+python/")
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.context["posts"].paginator.count, 4)
+        self.assertEqual(len(response.context["posts"]), 3)
+
+    @override_settings(BLOG_STREAMING_RESPONSES=True)
+    async def test_post_list_streams(self) -> None:
+        response = await self.async_client.get("/blog/")
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        assert isinstance(response, StreamingHttpResponse)
+        self.assertTrue(response.is_async)
+        content = b"".join([chunk async for chunk in response.streaming_content]).decode()
+        self.assertIn(self.posts[-1].title, content)
+        self.assertNotIn(self.draft.title, content)
+
+    async def test_post_list_unknown_tag_returns_404(self) -> None:
+        response = await self.async_client.get("/blog/tag/nonexistent/")
+
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    async def test_post_detail(self) -> None:
+        response = await self.async_client.get(self.post.get_absolute_url())
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.context["post"], self.post)
+        self.assertEqual(len(response.context["comments"]), 2)
+        self.assertContains(response, "2 comments")
+        self.assertEqual(len(response.context["similar_posts"]), 3)
+        self.assertNotIn(self.draft, response.context["similar_posts"])
+
+    async def test_post_detail_prefetches_sidebar(self) -> None:
+        response = await self.async_client.get(self.post.get_absolute_url())
+
+        sidebar = response.context["sidebar"]
+        self.assertEqual(sidebar["total_posts"], 4)
+        self.assertEqual(len(sidebar["latest_posts:3"]), 3)
+        self.assertEqual(sidebar["most_commented_posts:5"][0], self.post)
+        self.assertContains(response, "written 4 posts")
+
+    async def test_draft_post_detail_returns_404(self) -> None:
+        response = await self.async_client.get(self.draft.get_absolute_url())
+
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    @override_settings(BLOG_PAGE_CACHE=True)
+    async def test_post_detail_page_cache(self) -> None:
+        await cache.aclear()
+        url = self.post.get_absolute_url()
+        await self.async_client.get(url)
+
+        response = await self.async_client.get(url)
+
+        self.assertEqual(response["X-Page-Cache"], "hit")
+        self.assertContains(response, self.post.title)
+
+    @override_settings(BLOG_COALESCE_REQUESTS="local")
+    async def test_post_detail_coalesces_identical_requests(self) -> None:
+        url = self.post.get_absolute_url()
+
+        responses = await asyncio.gather(*(self.async_client.get(url) for _ in range(5)))
+
+        sources = sorted(r.get("X-Page-Cache", "") for r in responses)
+        self.assertEqual(sources, ["", "coalesced", "coalesced", "coalesced", "coalesced"])
+        for response in responses:
+            self.assertContains(response, self.post.title)
+
+    async def test_class_based_view(self) -> None:
+        request = AsyncRequestFactory().get("/blog/")
+        response = await views.AsyncPostListView.as_view()(request)  # type: ignore[misc]
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertContains(response, self.posts[0].title)
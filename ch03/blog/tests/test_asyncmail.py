@@ -0,0 +1,108 @@
+import asyncio
+from smtplib import SMTPRecipientsRefused, SMTPResponseException
+from typing import Any
+from unittest import mock
+
+from django.core.mail import EmailMessage
+from django.test import TestCase, override_settings
+
+from .. import outbox
+from ..asyncmail import AsyncEmailBackend, asend_mail
+from ..models import OutgoingEmail
+from ..smtpsink import SMTPSink, smtp_settings
+
+
+class AsyncEmailBackendTestCase(TestCase):
+    def setUp(self) -> None:
+        self.sink = self.enterContext(SMTPSink())
+        self.enterContext(override_settings(**smtp_settings(self.sink.host, self.sink.port)))
+
+    def test_messages_share_a_few_connections(self) -> None:
+        messages = [
+            EmailMessage(f"Subject {i}", "Body", to=[f"user{i}@example.com"]) for i in range(10)
+        ]
+
+        sent = asyncio.run(AsyncEmailBackend(connections=3).send_messages(messages))
+
+        self.assertEqual(sent, 10)
+        self.assertEqual(self.sink.sessions, 3)
+        self.assertCountEqual(self.sink.recipients, [[f"user{i}@example.com"] for i in range(10)])
+
+    def test_never_opens_more_connections_than_messages(self) -> None:
+        message = EmailMessage("Subject", "Body", to=["a@example.com", "b@example.com"])
+
+        asyncio.run(AsyncEmailBackend(connections=8).send_messages([message]))
+
+        self.assertEqual(self.sink.sessions, 1)
+        self.assertEqual(self.sink.recipients, [["a@example.com", "b@example.com"]])
+
+    def test_leading_dots_are_escaped(self) -> None:
+        asyncio.run(asend_mail("Subject", "first\n.second", ["user@example.com"]))
+
+        self.assertIn(b"\r\n..second\r\n", self.sink.messages[0])
+
+    def test_unreachable_server_is_reported_per_message(self) -> None:
+        messages = [EmailMessage("Subject", "Body", to=["user@example.com"])] * 2
+
+        with override_settings(EMAIL_PORT=1):
+            results = asyncio.run(AsyncEmailBackend(connections=2).send_each(messages))
+
+        self.assertTrue(all(isinstance(e, OSError) for e in results))
+
+    def test_outbox_delivery_over_async_connections(self) -> None:
+        for i in range(5):
+            outbox.enqueue(subject=f"Subject {i}", body="Body", to=f"user{i}@example.com")
+
+        result = outbox.deliver(connections=2)
+
+        self.assertEqual(result.sent, 5)
+        self.assertEqual(len(self.sink.messages), 5)
+        self.assertEqual(self.sink.sessions, 2)
+        self.assertFalse(OutgoingEmail.objects.exclude(status=OutgoingEmail.Status.SENT).exists())
+
+
+class AsyncEmailBackendErrorsTestCase(TestCase):
+    messages = [EmailMessage("Subject", "Body", to=["user@example.com"])] * 2
+
+    def setUp(self) -> None:
+        self.enterContext(mock.patch("blog.asyncmail.RECONNECT_DELAYS", (0, 0)))
+
+    def _send(self, sink: SMTPSink, **overrides: Any) -> list[Exception | None]:
+        settings = {**smtp_settings(sink.host, sink.port), "EMAIL_TIMEOUT": 5, **overrides}
+        with override_settings(**settings):
+            return asyncio.run(AsyncEmailBackend(connections=1).send_each(self.messages * 5))
+
+    def test_refused_greeting_fails_the_batch(self) -> None:
+        with SMTPSink(greeting=b"554 Busy") as sink:
+            results = self._send(sink)
+
+        self.assertEqual(len(results), 10)
+        self.assertTrue(all(isinstance(e, SMTPResponseException) for e in results))
+        # One session and two retries for the whole batch, none used to send
+        self.assertEqual(sink.sessions, 3)
+        self.assertNotIn(b"MAIL", sink.commands)
+
+    def test_failed_login_fails_the_batch(self) -> None:
+        with SMTPSink(replies={b"AUTH": b"535 Bad credentials"}) as sink:
+            results = self._send(sink, EMAIL_HOST_USER="user", EMAIL_HOST_PASSWORD="secret")
+
+        self.assertTrue(all(isinstance(e, SMTPResponseException) for e in results))
+        self.assertEqual(sink.sessions, 3)
+        self.assertNotIn(b"MAIL", sink.commands)
+
+    def test_refused_recipients_after_pipelined_data(self) -> None:
+        with SMTPSink(replies={b"RCPT": b"550 No such user"}) as sink:
+            results = self._send(sink)
+
+        self.assertTrue(all(isinstance(e, SMTPRecipientsRefused) for e in results))
+        # The data phase was ended, the session kept.
+        self.assertEqual(sink.sessions, 1)
+        self.assertEqual(sink.commands.count(b"RSET"), len(results))
+
+    def test_refused_recipients_without_pipelining(self) -> None:
+        replies = {b"EHLO": b"250 sink", b"RCPT": b"550 No such user"}
+        with SMTPSink(replies=replies) as sink:
+            results = self._send(sink)
+
+        self.assertTrue(all(isinstance(e, SMTPRecipientsRefused) for e in results))
+        self.assertNotIn(b"DATA", sink.commands)
@@ -0,0 +1,134 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import authorstats, moderation
+from ..factories import CommentFactory, PostFactory
+from ..models import AuthorStats, Comment, Post
+from ..tiered import cache
+
+
+class AuthorStatsTestCase(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.author = User.objects.create_user(username="author")
+        now = timezone.now()
+        self.posts = [
+            PostFactory.create(
+                author=self.author, status=Post.Status.PUBLISHED, publish=now - timedelta(days=i)
+            )
+            for i in range(7)
+        ]
+        PostFactory.create(author=self.author, status=Post.Status.DRAFT)
+        CommentFactory.create_batch(2, post=self.posts[0])
+        CommentFactory.create(post=self.posts[1], active=False)
+
+    def _stats(self) -> tuple[int, int]:
+        stats = AuthorStats.objects.get(author=self.author)
+        return stats.published_posts, stats.comments
+
+    def test_counts(self) -> None:
+        stats = AuthorStats.objects.get(author=self.author)
+        self.assertEqual(self._stats(), (7, 2))
+        self.assertEqual(stats.last_published, self.posts[0].publish)
+
+    def test_follows_changes(self) -> None:
+        self.posts[0].status = Post.Status.DRAFT
+        self.posts[0].save()
+        self.assertEqual(self._stats(), (6, 0))
+
+        other = User.objects.create_user(username="other")
+        self.posts[1].author = other
+        self.posts[1].save()
+        self.assertEqual(self._stats(), (5, 0))
+        self.assertEqual(AuthorStats.objects.get(author=other).published_posts, 1)
+
+        self.posts[2].delete()
+        self.assertEqual(self._stats(), (4, 0))
+
+    def test_deleted_users(self) -> None:
+        User.objects.filter(pk=self.author.pk).delete()
+
+        self.assertFalse(AuthorStats.objects.exists())
+
+    def test_follows_comments(self) -> None:
+        comment = CommentFactory.create(post=self.posts[2])
+        self.assertEqual(self._stats(), (7, 3))
+
+        moderation.set_active(Comment.objects.filter(id=comment.id), active=False)
+        self.assertEqual(self._stats(), (7, 2))
+
+        comment.active = True
+        comment.save()
+        self.assertEqual(self._stats(), (7, 3))
+
+    def test_comment_moved_to_another_authors_post(self) -> None:
+        other = User.objects.create_user(username="other")
+        post = PostFactory.create(author=other, status=Post.Status.PUBLISHED)
+        comment = Comment.objects.filter(post=self.posts[0]).first()
+        assert comment is not None
+
+        comment.post = post
+        comment.save()
+
+        self.assertEqual(self._stats(), (7, 1))
+        self.assertEqual(AuthorStats.objects.get(author=other).comments, 1)
+
+    def test_comments_are_counted_in_place(self) -> None:
+        with CaptureQueriesContext(connection) as ctx:
+            comment = CommentFactory.create(post=self.posts[3])
+            CommentFactory.create(post=self.posts[3], active=False)
+            CommentFactory.create(post=Post.objects.get(status=Post.Status.DRAFT))
+            self.assertEqual(self._stats(), (7, 3))
+            comment.delete()
+            Comment.objects.get(post=self.posts[1]).delete()
+            self.assertEqual(self._stats(), (7, 2))
+
+        recounts = [q for q in ctx.captured_queries if "COUNT(" in q["sql"]]
+        self.assertEqual(recounts, [])
+
+    def test_keyset_pages(self) -> None:
+        seen = []
+        cursor = None
+        for _ in range(3):
+            posts, cursor = authorstats.page(self.author, cursor)
+            seen.extend(posts)
+        self.assertEqual(seen, self.posts)
+        self.assertIsNone(cursor)
+
+    def test_same_date(self) -> None:
+        twin = PostFactory.create(
+            author=self.author, status=Post.Status.PUBLISHED, publish=self.posts[2].publish
+        )
+        posts, cursor = authorstats.page(self.author)
+        self.assertEqual(posts[2:], [max(self.posts[2], twin, key=lambda p: p.id)])
+
+        posts, _ = authorstats.page(self.author, cursor)
+        self.assertEqual(posts[0], min(self.posts[2], twin, key=lambda p: p.id))
+
+    @override_settings(BLOG_STALE_WHILE_REVALIDATE=True)
+    def test_author_page(self) -> None:
+        url = reverse("blog:post_author", args=[self.author.username])
+        self.client.get(url)
+
+        # The sidebar is cached.
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+        self.assertContains(response, "7 posts,")
+        self.assertEqual(response.context["posts"], self.posts[:3])
+
+        response = self.client.get(url, {"before": response.context["next_cursor"]})
+        self.assertEqual(response.context["posts"], self.posts[3:6])
+
+    def test_not_found(self) -> None:
+        url = reverse("blog:post_author", args=[self.author.username])
+        self.assertEqual(self.client.get(url, {"before": "x"}).status_code, HTTPStatus.NOT_FOUND)
+        User.objects.create_user(username="reader")
+        url = reverse("blog:post_author", args=["reader"])
+        self.assertEqual(self.client.get(url).status_code, HTTPStatus.NOT_FOUND)
@@ -0,0 +1,89 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from taggit.models import Tag
+
+from .. import autocomplete
+from ..factories import PostFactory
+from ..models import Post
+
+
+class AutocompleteTestCase(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        PostFactory.create(status=Post.Status.PUBLISHED, tags=["Django", "Docker"])
+        PostFactory.create(status=Post.Status.PUBLISHED, tags=["Docker"])
+        PostFactory.create(status=Post.Status.DRAFT, tags=["Dart", "Python"])
+
+    def _complete(self, prefix: str) -> list[tuple[str, int]]:
+        return [(s.name, s.count) for s in autocomplete.complete(prefix)]
+
+    def test_prefix_by_popularity(self) -> None:
+        self.assertEqual(self._complete("d"), [("Docker", 2), ("Django", 1), ("Dart", 0)])
+        self.assertEqual(self._complete("DJ"), [("Django", 1)])
+        self.assertEqual(self._complete("x"), [])
+
+    def test_limit(self) -> None:
+        self.assertEqual(
+            [s.name for s in autocomplete.complete("d", limit=2)], ["Docker", "Django"]
+        )
+
+    def test_no_queries_once_built(self) -> None:
+        autocomplete.complete("d")
+        with self.assertNumQueries(0):
+            autocomplete.complete("p")
+
+    def test_follows_tag_changes(self) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            PostFactory.create_batch(3, status=Post.Status.PUBLISHED, tags=["Python"])
+        autocomplete.complete("d")
+        with self.captureOnCommitCallbacks(execute=True):
+            Tag.objects.create(name="Deno", slug="deno")
+            tag = Tag.objects.get(slug="dart")
+            tag.name = "Flutter"
+            tag.save()
+            tag = Tag.objects.get(slug="python")
+            tag.name = "Python3"
+            tag.save()
+            Tag.objects.get(slug="docker").delete()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self._complete("d"), [("Django", 1), ("Deno", 0)])
+            self.assertEqual(self._complete("f"), [("Flutter", 0)])
+            self.assertEqual(self._complete("p"), [("Python3", 3)])
+
+    def test_follows_counts(self) -> None:
+        autocomplete.complete("d")
+        with self.captureOnCommitCallbacks(execute=True):
+            PostFactory.create_batch(2, status=Post.Status.PUBLISHED, tags=["Dart"])
+
+        self.assertEqual(self._complete("d"), [("Dart", 2), ("Docker", 2), ("Django", 1)])
+
+    def test_changes_leave_readers_entries_alone(self) -> None:
+        index = autocomplete._Index([(1, "Django", "django", 1), (2, "Docker", "docker", 2)])
+        entries = index.entries
+
+        index.put(1, "Dj", "dj")
+        index.remove(2)
+        index.set_counts({1: 5})
+
+        self.assertEqual(entries.tags, {1: ("Django", "django"), 2: ("Docker", "docker")})
+        self.assertEqual(entries.counts, {1: 1, 2: 2})
+        self.assertEqual(entries.names, [("django", 1), ("docker", 2)])
+        self.assertEqual([(s.name, s.count) for s in index.complete("d", 10)], [("Dj", 5)])
+
+    def test_other_process_rebuilds(self) -> None:
+        autocomplete.complete("d")
+        Tag.objects.create(name="Deno", slug="deno")
+        # As another process committing would
+        autocomplete.invalidate()
+
+        self.assertIn(("Deno", 0), self._complete("d"))
+
+    def test_endpoint(self) -> None:
+        response = self.client.get(reverse("blog:tag_autocomplete"), {"q": "do"})
+
+        self.assertEqual(
+            response.json(), {"tags": [{"name": "Docker", "slug": "docker", "count": 2}]}
+        )
+        self.assertEqual(self.client.get(reverse("blog:tag_autocomplete")).json(), {"tags": []})
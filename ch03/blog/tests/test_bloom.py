@@ -0,0 +1,77 @@
+from http import HTTPStatus
+
+from django.core.cache import cache
+from django.http import Http404
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import bloom, lookups
+from ..factories import PostFactory
+from ..models import Post
+
+
+class BloomFilterTestCase(SimpleTestCase):
+    def test_members_are_found(self) -> None:
+        members = bloom.BloomFilter(1000)
+        for i in range(1000):
+            members.add(f"member-{i}")
+
+        self.assertTrue(all(f"member-{i}" in members for i in range(1000)))
+
+    def test_false_positive_rate(self) -> None:
+        members = bloom.BloomFilter(1000, error_rate=0.01)
+        for i in range(1000):
+            members.add(f"member-{i}")
+
+        false_positives = sum(f"other-{i}" in members for i in range(10000))
+        self.assertLess(false_positives, 200)
+
+
+@override_settings(BLOG_BLOOM_FILTER=True)
+class BloomLookupsTestCase(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        bloom._filters.reset()
+        self.post = PostFactory.create(status=Post.Status.PUBLISHED, tags=["django"])
+        publish = timezone.localtime(self.post.publish)
+        self.date = (publish.year, publish.month, publish.day)
+        # Builds the filters
+        lookups.published_post(*self.date, self.post.slug)
+
+    def test_bogus_post_is_not_queried(self) -> None:
+        with self.assertNumQueries(0), self.assertRaises(Http404):
+            lookups.published_post(*self.date, "bogus")
+
+    def test_bogus_tag_is_not_queried(self) -> None:
+        url = reverse("blog:post_list_by_tag", args=["bogus"])
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_existing_objects_are_found(self) -> None:
+        self.assertEqual(lookups.published_post(*self.date, self.post.slug), self.post)
+        self.assertEqual(lookups.tag("django").name, "django")
+
+    def test_saved_post_is_added(self) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            post = PostFactory.create(status=Post.Status.PUBLISHED, tags=["flask"])
+        publish = timezone.localtime(post.publish)
+
+        with self.assertNumQueries(2):
+            # The post and the tag, without rebuilding the filters
+            lookups.published_post(publish.year, publish.month, publish.day, post.slug)
+            lookups.tag("flask")
+
+    def test_change_elsewhere_rebuilds(self) -> None:
+        draft = PostFactory.create(status=Post.Status.DRAFT)
+        # As another process, or a write that sends no signals, would
+        Post.objects.filter(pk=draft.pk).update(status=Post.Status.PUBLISHED)
+        bloom.invalidate()
+
+        publish = timezone.localtime(draft.publish)
+        post = lookups.published_post(publish.year, publish.month, publish.day, draft.slug)
+
+        self.assertEqual(post, draft)
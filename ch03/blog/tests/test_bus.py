@@ -0,0 +1,80 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .. import bus, lookups, tiered
+from ..factories import PostFactory
+from ..models import CacheInvalidation, Post
+
+
+@override_settings(BLOG_INVALIDATION_BUS=True)
+class InvalidationBusTestCase(TestCase):
+    def setUp(self) -> None:
+        tiered.cache.clear()
+        bus.reset()
+        # The first poll only finds where the change log ends.
+        bus.poll()
+
+    def test_deletes_are_recorded(self) -> None:
+        tiered.cache.delete("a", "b")
+
+        self.assertEqual(CacheInvalidation.objects.get().keys, ["a", "b"])
+
+    def test_keys_invalidated_elsewhere_are_evicted(self) -> None:
+        tiered.cache.l1.set("a", 1)
+        tiered.cache.l1.set("b", 2)
+        # As recorded by another process
+        CacheInvalidation.objects.create(keys=["a"])
+
+        self.assertEqual(bus.poll(force=True), 1)
+
+        self.assertIsNone(tiered.cache.l1.get("a"))
+        self.assertEqual(tiered.cache.l1.get("b"), 2)
+        # Each invalidation is read once, and not recorded again.
+        self.assertEqual(bus.poll(force=True), 0)
+        self.assertEqual(CacheInvalidation.objects.count(), 1)
+
+    def test_polls_are_throttled(self) -> None:
+        CacheInvalidation.objects.create(keys=["a"])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(bus.poll(), 0)
+
+    def test_first_poll_skips_earlier_invalidations(self) -> None:
+        CacheInvalidation.objects.create(keys=["a"])
+        bus.reset()
+
+        self.assertEqual(bus.poll(force=True), 0)
+
+    def test_old_invalidations_are_pruned(self) -> None:
+        old = CacheInvalidation.objects.create(keys=["a"])
+        CacheInvalidation.objects.filter(pk=old.pk).update(
+            created=timezone.now() - timedelta(hours=1)
+        )
+        recent = CacheInvalidation.objects.create(keys=["b"])
+
+        with self.settings(BLOG_L1_CACHE={"MAX_ENTRIES": 10, "TTL": 30}):
+            bus._cursor.pruned = 0.0
+            bus.poll(force=True)
+
+        self.assertQuerySetEqual(CacheInvalidation.objects.all(), [recent])
+
+    @override_settings(BLOG_LOOKUP_CACHE=True)
+    def test_post_change_is_broadcast(self) -> None:
+        post = PostFactory.create(status=Post.Status.PUBLISHED)
+        CacheInvalidation.objects.all().delete()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            post.title = "Updated"
+            post.save()
+
+        self.assertIn(
+            [lookups.post_key(post.id)], CacheInvalidation.objects.values_list("keys", flat=True)
+        )
+
+    @override_settings(BLOG_INVALIDATION_BUS=False)
+    def test_disabled(self) -> None:
+        tiered.cache.delete("a")
+
+        self.assertFalse(CacheInvalidation.objects.exists())
@@ -0,0 +1,34 @@
+from django.test import TestCase, override_settings
+
+from ..checks import check_rates, check_shared_cache
+
+LOCAL = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+SHARED = {"default": {"BACKEND": "django.core.cache.backends.db.DatabaseCache"}}
+
+
+class SharedCacheCheckTestCase(TestCase):
+    def test_limits_need_a_shared_cache(self) -> None:
+        with override_settings(CACHES=LOCAL, BLOG_RATELIMITS={"post_share": "1/m"}):
+            self.assertEqual([e.id for e in check_shared_cache(None)], ["blog.E001"])
+        with override_settings(CACHES=LOCAL, BLOG_RATELIMITS={}):
+            self.assertEqual(check_shared_cache(None), [])
+        with override_settings(CACHES=SHARED, BLOG_RATELIMITS={"post_share": "1/m"}):
+            self.assertEqual(check_shared_cache(None), [])
+
+    def test_versioned_structures_need_a_shared_cache(self) -> None:
+        with override_settings(CACHES=LOCAL, BLOG_BLOOM_FILTER=True, BLOG_TAG_INDEX=True):
+            errors = check_shared_cache(None)
+        self.assertEqual([e.id for e in errors], ["blog.E001", "blog.E001"])
+        self.assertIn("BLOG_BLOOM_FILTER", errors[0].msg)
+        self.assertIn("BLOG_TAG_INDEX", errors[1].msg)
+
+        with override_settings(CACHES=SHARED, BLOG_BLOOM_FILTER=True, BLOG_TAG_INDEX=True):
+            self.assertEqual(check_shared_cache(None), [])
+
+
+class RatesCheckTestCase(TestCase):
+    def test_rates_must_parse(self) -> None:
+        with override_settings(BLOG_RATELIMITS={"post_share": "1/m", "post_comment": "5/x"}):
+            self.assertEqual([e.id for e in check_rates(None)], ["blog.E002"])
+        with override_settings(BLOG_RATELIMITS={"post_share": "1/m"}):
+            self.assertEqual(check_rates(None), [])
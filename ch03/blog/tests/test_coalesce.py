@@ -0,0 +1,102 @@
+import asyncio
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from .. import coalesce
+
+
+class FlightTestCase(SimpleTestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.calls = 0
+
+    def _work(self, started: threading.Event, release: threading.Event) -> str:
+        with coalesce.flight("key") as flight:
+            if flight.result is not None:
+                result: str = flight.result
+                return result
+            self.calls += 1
+            started.set()
+            release.wait(5)
+            flight.publish("page")
+            return "page"
+
+    def _run_concurrently(self, followers: int) -> list[str]:
+        started, release = threading.Event(), threading.Event()
+        results: list[str] = []
+        leader = threading.Thread(target=lambda: results.append(self._work(started, release)))
+        leader.start()
+        started.wait(5)
+        threads = [
+            threading.Thread(target=lambda: results.append(self._work(started, release)))
+            for _ in range(followers)
+        ]
+        for thread in threads:
+            thread.start()
+        # Let the followers reach the flight before the leader lands.
+        time.sleep(0.05)
+        release.set()
+        for thread in [leader, *threads]:
+            thread.join()
+        return results
+
+    @override_settings(BLOG_COALESCE_REQUESTS=coalesce.LOCAL)
+    def test_followers_get_the_leaders_result(self) -> None:
+        results = self._run_concurrently(followers=5)
+
+        self.assertEqual(results, ["page"] * 6)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(coalesce._flights, {})
+
+    @override_settings(BLOG_COALESCE_REQUESTS=coalesce.SHARED)
+    def test_shared_flight(self) -> None:
+        results = self._run_concurrently(followers=2)
+
+        self.assertEqual(results, ["page"] * 3)
+        self.assertEqual(self.calls, 1)
+        self.assertIsNone(cache.get(coalesce._flight_key("key")))
+
+    @override_settings(BLOG_COALESCE_REQUESTS=coalesce.SHARED)
+    def test_follows_leader_of_another_process(self) -> None:
+        cache.add(coalesce._flight_key("key"), "token")
+        cache.set(coalesce._result_key("key", "token"), "page")
+
+        with coalesce.flight("key") as flight:
+            self.assertEqual(flight.result, "page")
+
+    @override_settings(BLOG_COALESCE_REQUESTS=coalesce.SHARED)
+    def test_leader_without_result(self) -> None:
+        cache.add(coalesce._flight_key("key"), "token")
+
+        def leader_landed(seconds: float) -> None:
+            cache.delete(coalesce._flight_key("key"))
+
+        with (
+            mock.patch("blog.coalesce.time.sleep", side_effect=leader_landed),
+            coalesce.flight("key") as flight,
+        ):
+            self.assertIsNone(flight.result)
+
+    def test_async_followers_get_the_leaders_result(self) -> None:
+        calls = 0
+
+        async def work() -> str:
+            nonlocal calls
+            async with coalesce.aflight("key") as flight:
+                if flight.result is not None:
+                    result: str = flight.result
+                    return result
+                calls += 1
+                await asyncio.sleep(0.01)
+                flight.publish("page")
+                return "page"
+
+        async def main() -> list[str]:
+            return await asyncio.gather(*(work() for _ in range(5)))
+
+        self.assertEqual(asyncio.run(main()), ["page"] * 5)
+        self.assertEqual(calls, 1)
@@ -0,0 +1,147 @@
+import io
+import tempfile
+from datetime import timedelta
+from http import HTTPStatus
+from pathlib import Path
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import comment_buffer
+from ..factories import PostFactory
+from ..models import Comment, Post
+
+
+class CommentBufferTestCase(TestCase):
+    post: Post
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.post = PostFactory.create(status=Post.Status.PUBLISHED)
+
+    def setUp(self) -> None:
+        cache.clear()
+        tmp = self.enterContext(tempfile.TemporaryDirectory())
+        self.buffer = Path(tmp) / "comments.jsonl"
+        self.enterContext(override_settings(BLOG_COMMENT_BUFFER=self.buffer))
+        self.url = reverse("blog:post_comment", args=[self.post.id])
+
+    def _comment(self, i: int) -> dict[str, str]:
+        return {"name": f"User {i}", "email": f"user{i}@example.com", "body": f"Comment {i}"}
+
+    def test_valid_comment_is_buffered_and_pending(self) -> None:
+        response = self.client.post(self.url, data=self._comment(1))
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertTrue(response.context["pending"])
+        self.assertContains(response, "will appear shortly")
+        self.assertFalse(Comment.objects.exists())
+        self.assertEqual(len(self.buffer.read_text().splitlines()), 1)
+
+    def test_invalid_comment_is_not_buffered(self) -> None:
+        data = self._comment(1)
+        data["email"] = "invalid-email"
+
+        response = self.client.post(self.url, data=data)
+
+        self.assertFalse(response.context["pending"])
+        self.assertFalse(self.buffer.exists())
+
+    def test_flush_inserts_in_batches(self) -> None:
+        for i in range(5):
+            self.client.post(self.url, data=self._comment(i))
+
+        with CaptureQueriesContext(connection) as ctx:
+            inserted = comment_buffer.flush(batch_size=2)
+
+        self.assertEqual(inserted, 5)
+        inserts = [
+            q for q in ctx.captured_queries if q["sql"].startswith('INSERT INTO "blog_comment"')
+        ]
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual(
+            list(self.post.comments.values_list("name", flat=True)),
+            [f"User {i}" for i in range(5)],
+        )
+        self.assertFalse(self.buffer.exists())
+        self.assertEqual(comment_buffer.flush(), 0)
+
+    def test_flush_drops_comments_on_unpublished_posts(self) -> None:
+        self.client.post(self.url, data=self._comment(1))
+        Post.objects.filter(pk=self.post.pk).update(status=Post.Status.DRAFT)
+
+        self.assertEqual(comment_buffer.flush(), 0)
+        self.assertFalse(Comment.objects.exists())
+
+    def test_flush_resumes_an_interrupted_flush(self) -> None:
+        self.client.post(self.url, data=self._comment(1))
+        self.buffer.rename(self.buffer.with_suffix(".flushing"))
+        self.client.post(self.url, data=self._comment(2))
+
+        self.assertEqual(comment_buffer.flush(), 2)
+        self.assertEqual(Comment.objects.count(), 2)
+
+    def test_flush_replayed_after_commit_inserts_nothing(self) -> None:
+        self.client.post(self.url, data=self._comment(1))
+        self.client.post(self.url, data=self._comment(2))
+        buffered = self.buffer.read_bytes()
+        self.assertEqual(comment_buffer.flush(), 2)
+
+        # The process died after the commit, before the file was removed.
+        self.buffer.with_suffix(".flushing").write_bytes(buffered)
+        self.client.post(self.url, data=self._comment(3))
+
+        self.assertEqual(comment_buffer.flush(), 1)
+        self.assertEqual(
+            list(self.post.comments.values_list("name", flat=True)),
+            ["User 1", "User 2", "User 3"],
+        )
+
+    def test_flush_keeps_submission_time(self) -> None:
+        submitted = timezone.now() - timedelta(minutes=5)
+        with mock.patch("django.utils.timezone.now", return_value=submitted):
+            self.client.post(self.url, data=self._comment(1))
+
+        comment_buffer.flush()
+
+        self.assertEqual(Comment.objects.get().created, submitted)
+
+    def test_flush_rejects_malformed_lines(self) -> None:
+        self.client.post(self.url, data=self._comment(1))
+        with open(self.buffer, "a") as f:
+            f.write('{"id": "not a uuid"}\n')
+        self.client.post(self.url, data=self._comment(2))
+        with open(self.buffer, "a") as f:
+            # Cut short by a crash
+            f.write('{"id": "')
+
+        with self.assertLogs("blog.comment_buffer", "WARNING"):
+            self.assertEqual(comment_buffer.flush(), 2)
+
+        rejected = self.buffer.with_suffix(".rejected").read_text().splitlines()
+        self.assertEqual(rejected, ['{"id": "not a uuid"}', '{"id": "'])
+        self.assertFalse(self.buffer.with_suffix(".flushing").exists())
+        self.assertEqual(Comment.objects.count(), 2)
+
+    def test_no_signal_without_comments(self) -> None:
+        self.client.post(self.url, data=self._comment(1))
+        Post.objects.filter(pk=self.post.pk).update(status=Post.Status.DRAFT)
+
+        with mock.patch("blog.comment_buffer.comments_moderated.send") as send:
+            self.assertEqual(comment_buffer.flush(), 0)
+        send.assert_not_called()
+
+    def test_command(self) -> None:
+        self.client.post(self.url, data=self._comment(1))
+        out = io.StringIO()
+
+        call_command("flush_comments", stdout=out)
+
+        self.assertIn("Inserted 1 comments", out.getvalue())
+        self.assertEqual(Comment.objects.count(), 1)
@@ -0,0 +1,81 @@
+import csv
+import io
+import json
+import tempfile
+from http import HTTPStatus
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.http import StreamingHttpResponse
+from django.test import TestCase
+from django.urls import reverse
+
+from ..factories import CommentFactory, PostFactory
+from ..models import Comment, Post
+
+
+class ExportAdminActionTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        User.objects.create_superuser(
+            username="admin", email="admin@example.com", password="password"
+        )
+
+    def setUp(self) -> None:
+        self.client.login(username="admin", password="password")
+        self.posts = PostFactory.create_batch(3)
+        self.comments = CommentFactory.create_batch(3, post=self.posts[0])
+
+    def _export(self, changelist: str, action: str, pks: list[int]) -> StreamingHttpResponse:
+        data = {"action": action, "_selected_action": pks}
+        response = self.client.post(reverse(changelist), data)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        assert isinstance(response, StreamingHttpResponse)
+        return response
+
+    def test_export_posts_as_csv(self) -> None:
+        pks = [p.pk for p in self.posts[:2]]
+        response = self._export("admin:blog_post_changelist", "export_csv", pks)
+
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn('filename="posts.csv"', response["Content-Disposition"])
+        content = b"".join(response.streaming_content).decode()  # type: ignore[arg-type]
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual([int(r["id"]) for r in rows], sorted(pks))
+        self.assertEqual(rows[0]["author__username"], self.posts[0].author.username)
+
+    def test_export_comments_as_jsonl(self) -> None:
+        pks = [c.pk for c in self.comments]
+        response = self._export("admin:blog_comment_changelist", "export_jsonl", pks)
+
+        lines = b"".join(response.streaming_content).decode().splitlines()  # type: ignore[arg-type]
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual([r["id"] for r in rows], pks)
+        self.assertEqual({r["post_id"] for r in rows}, {self.posts[0].pk})
+        self.assertEqual(rows[0]["body"], self.comments[0].body)
+
+
+class ExportRowsCommandTestCase(TestCase):
+    def setUp(self) -> None:
+        self.post = PostFactory.create(status=Post.Status.PUBLISHED)
+        CommentFactory.create_batch(4, post=self.post)
+
+    def test_stdout_csv(self) -> None:
+        out = io.StringIO()
+        call_command("export_rows", "post", stdout=out)
+
+        rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["title"], self.post.title)
+
+    def test_file_jsonl(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            output = Path(tmp) / "comments.jsonl"
+            call_command(
+                "export_rows", "comment", format="jsonl", output=str(output), stdout=io.StringIO()
+            )
+            rows = [json.loads(line) for line in output.read_text().splitlines()]
+
+        self.assertEqual(len(rows), Comment.objects.count())
+        self.assertTrue(all(r["post_id"] == self.post.pk for r in rows))
@@ -2,12 +2,14 @@ from datetime import datetime, timedelta
 
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from taggit.models import Tag
 
 from ..factories import CommentFactory, PostFactory
-from ..models import Comment, Post
+from ..models import Comment, Post, saved
 
 
 class PostTestCase(TestCase):
@@ -300,6 +302,25 @@ class PostTestCase(TestCase):
         self.assertIn(posts[1], django_posts)
         self.assertNotIn(posts[2], django_posts)
 
+    @override_settings(BLOG_TAG_INDEX=True)
+    def test_save_reads_the_stored_post_once(self) -> None:
+        post = PostFactory.create(status=Post.Status.PUBLISHED)
+        post.status = Post.Status.DRAFT
+
+        with CaptureQueriesContext(connection) as queries:
+            post.save()
+
+        reads = [q for q in queries if q["sql"].startswith('SELECT "blog_post"."status"')]
+        self.assertEqual(len(reads), 1)
+        self.assertEqual(
+            saved(post),
+            {
+                "status": Post.Status.PUBLISHED,
+                "publish": post.publish,
+                "author_id": post.author_id,
+            },
+        )
+
 
 class CommentTestCase(TestCase):
     post: Post
@@ -0,0 +1,98 @@
+import io
+from datetime import timedelta
+from smtplib import SMTPException
+from typing import Any
+from unittest import mock
+
+from django.core import mail
+from django.core.mail import get_connection
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from .. import outbox
+from ..models import OutgoingEmail
+
+
+class OutboxDeliveryTestCase(TestCase):
+    def setUp(self) -> None:
+        for i in range(3):
+            outbox.enqueue(subject=f"Subject {i}", body="Body", to=f"user{i}@example.com")
+
+    def test_enqueue_does_not_send(self) -> None:
+        self.assertEqual(len(mail.outbox), 0)
+        pending = OutgoingEmail.objects.filter(status=OutgoingEmail.Status.PENDING)
+        self.assertEqual(pending.count(), 3)
+
+    def test_batch_reuses_one_connection(self) -> None:
+        with mock.patch("blog.outbox.get_connection", wraps=get_connection) as factory:
+            result = outbox.deliver(batch_size=10)
+
+        factory.assert_called_once()
+        self.assertEqual(result.sent, 3)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertFalse(OutgoingEmail.objects.exclude(status=OutgoingEmail.Status.SENT).exists())
+
+    def test_batch_size_limits_delivery(self) -> None:
+        result = outbox.deliver(batch_size=2)
+
+        self.assertEqual(result.sent, 2)
+        self.assertEqual(OutgoingEmail.objects.filter(status=OutgoingEmail.Status.SENT).count(), 2)
+
+    def test_failed_send_is_retried_with_backoff(self) -> None:
+        with mock.patch("blog.outbox.EmailMessage.send", side_effect=SMTPException("busy")):
+            result = outbox.deliver()
+
+        self.assertEqual(result.retried, 3)
+        email = OutgoingEmail.objects.first()
+        assert email is not None
+        self.assertEqual(email.status, OutgoingEmail.Status.PENDING)
+        self.assertEqual(email.attempts, 1)
+        self.assertIn("busy", email.last_error)
+        self.assertGreater(email.next_attempt, timezone.now())
+
+        # Not due yet, nothing is picked up
+        self.assertEqual(outbox.deliver().sent, 0)
+
+        # Once due, the retry succeeds
+        OutgoingEmail.objects.update(next_attempt=timezone.now())
+        self.assertEqual(outbox.deliver().sent, 3)
+
+    def test_backoff_doubles(self) -> None:
+        email = OutgoingEmail.objects.first()
+        assert email is not None
+        delays = []
+        for _ in range(3):
+            before = timezone.now()
+            outbox._record_failure(email, SMTPException("busy"), max_attempts=10)
+            delays.append(email.next_attempt - before)
+
+        self.assertAlmostEqual(delays[1] / delays[0], 2, places=2)
+        self.assertAlmostEqual(delays[2] / delays[1], 2, places=2)
+
+    def test_gives_up_after_max_attempts(self) -> None:
+        with mock.patch("blog.outbox.EmailMessage.send", side_effect=SMTPException("rejected")):
+            for _ in range(2):
+                OutgoingEmail.objects.update(next_attempt=timezone.now() - timedelta(seconds=1))
+                result = outbox.deliver(max_attempts=2)
+
+        self.assertEqual(result.failed, 3)
+        self.assertFalse(OutgoingEmail.objects.exclude(status=OutgoingEmail.Status.FAILED).exists())
+
+    def test_unreachable_server_retries_whole_batch(self) -> None:
+        def open_fails(self: Any) -> None:
+            raise OSError("connection refused")
+
+        with mock.patch("django.core.mail.backends.locmem.EmailBackend.open", open_fails):
+            result = outbox.deliver()
+
+        self.assertEqual(result.retried, 3)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_command(self) -> None:
+        out = io.StringIO()
+        call_command("send_queued_mail", batch_size=2, stdout=out)
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertIn("Sent 2", out.getvalue())
+        self.assertIn("Sent 1", out.getvalue())
@@ -0,0 +1,181 @@
+from http import HTTPStatus
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from taggit.models import Tag
+
+from .. import moderation
+from ..factories import CommentFactory, PostFactory
+from ..models import Comment, Post
+
+
+@override_settings(BLOG_PAGE_CACHE=True)
+class PageCacheTestCase(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.django_post = PostFactory.create(status=Post.Status.PUBLISHED, tags=["django"])
+        self.flask_post = PostFactory.create(status=Post.Status.PUBLISHED, tags=["flask"])
+        self.list_url = reverse("blog:post_list")
+        self.django_url = reverse("blog:post_list_by_tag", args=["django"])
+        self.flask_url = reverse("blog:post_list_by_tag", args=["flask"])
+
+    def _cached(self, url: str) -> bool:
+        return self.client.get(url).get("X-Page-Cache") == "hit"
+
+    def _warm(self, *urls: str) -> None:
+        for url in urls:
+            self.client.get(url)
+            self.assertTrue(self._cached(url), url)
+
+    def test_second_request_is_a_hit(self) -> None:
+        response = self.client.get(self.list_url)
+        self.assertEqual(response["X-Page-Cache"], "miss")
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.list_url)
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response["X-Page-Cache"], "hit")
+        self.assertContains(response, self.django_post.title)
+
+    def test_key_includes_only_relevant_params(self) -> None:
+        self._warm(self.list_url)
+
+        self.assertTrue(self._cached(f"{self.list_url}?utm_source=feed"))
+        self.assertFalse(self._cached(f"{self.list_url}?page=2"))
+
+    def test_session_bypasses_cache(self) -> None:
+        self._warm(self.list_url)
+        self.client.cookies[settings.SESSION_COOKIE_NAME] = "session"
+
+        self.assertFalse(self._cached(self.list_url))
+
+    def test_csrf_token_is_per_reader(self) -> None:
+        url = self.django_post.get_absolute_url()
+        self._warm(url)
+
+        response = self.client.get(url)
+
+        token = response.cookies[settings.CSRF_COOKIE_NAME].value
+        self.assertTrue(token)
+        self.assertNotContains(response, "__blog_page_cache_csrf_token__")
+        self.assertContains(response, 'name="csrfmiddlewaretoken"')
+
+        # The token of the cached page is accepted when posting the form.
+        csrf_client = self.client_class(enforce_csrf_checks=True)
+        csrf_client.cookies[settings.CSRF_COOKIE_NAME] = token
+        page = csrf_client.get(url).content.decode()
+        value = page.split('name="csrfmiddlewaretoken" value="')[1].split('"')[0]
+        data = {"name": "Reader", "email": "reader@example.com", "body": "Hi"}
+        response = csrf_client.post(
+            reverse("blog:post_comment", args=[self.django_post.id]),
+            {**data, "csrfmiddlewaretoken": value},
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_comment_purges_its_post_only(self) -> None:
+        django_detail = self.django_post.get_absolute_url()
+        flask_detail = self.flask_post.get_absolute_url()
+        CommentFactory.create(post=self.flask_post)
+        self._warm(django_detail, flask_detail, self.list_url)
+
+        # Only the most commented posts of the sidebar are recomputed.
+        with (
+            mock.patch("blog.templatetags.blog_tags._total_posts") as total_posts,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            CommentFactory.create(post=self.flask_post)
+
+        total_posts.assert_not_called()
+        self.assertFalse(self._cached(flask_detail))
+        self.assertTrue(self._cached(django_detail))
+        self.assertTrue(self._cached(self.list_url))
+
+    def test_sidebar_change_purges_every_page(self) -> None:
+        django_detail = self.django_post.get_absolute_url()
+        self._warm(django_detail, self.list_url)
+
+        # The first comment reorders the most commented posts.
+        with self.captureOnCommitCallbacks(execute=True):
+            CommentFactory.create(post=self.flask_post)
+
+        self.assertFalse(self._cached(django_detail))
+        self.assertFalse(self._cached(self.list_url))
+
+    def test_post_change_purges_its_tag_pages(self) -> None:
+        self._warm(self.django_url, self.flask_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.django_post.body = "Updated"
+            self.django_post.save()
+
+        self.assertFalse(self._cached(self.django_url))
+        self.assertTrue(self._cached(self.flask_url))
+
+    def test_retagging_purges_old_and_new_tag_pages(self) -> None:
+        python_url = reverse("blog:post_list_by_tag", args=["python"])
+        PostFactory.create(status=Post.Status.PUBLISHED, tags=["python"])
+        self._warm(self.django_url, self.flask_url, python_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.django_post.tags.set(["python"])
+
+        self.assertFalse(self._cached(self.django_url))
+        self.assertFalse(self._cached(python_url))
+        # The tag cloud of the sidebar changed too.
+        self.assertFalse(self._cached(self.flask_url))
+        self.assertContains(self.client.get(python_url), self.django_post.title)
+
+    def test_tag_rename_purges_pages_showing_it(self) -> None:
+        self._warm(self.list_url, self.django_post.get_absolute_url())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            tag = Tag.objects.get(name="django")
+            tag.name = "Django"
+            tag.save()
+
+        self.assertFalse(self._cached(self.list_url))
+        self.assertFalse(self._cached(self.django_post.get_absolute_url()))
+
+    def test_moderation_purges_posts(self) -> None:
+        comment = CommentFactory.create(post=self.django_post)
+        url = self.django_post.get_absolute_url()
+        self._warm(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            moderation.set_active(Comment.objects.filter(pk=comment.pk), False)
+
+        self.assertFalse(self._cached(url))
+
+    def test_unpublished_post_is_not_served(self) -> None:
+        url = self.django_post.get_absolute_url()
+        self._warm(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.django_post.status = Post.Status.DRAFT
+            self.django_post.save()
+
+        self.assertEqual(self.client.get(url).status_code, HTTPStatus.NOT_FOUND)
+
+    @override_settings(BLOG_STALE_WHILE_REVALIDATE=True)
+    def test_purged_pages_do_not_show_stale_values(self) -> None:
+        django_detail = self.django_post.get_absolute_url()
+        self._warm(self.list_url, django_detail)
+        self.assertContains(self.client.get(self.list_url), "written 2 posts")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            post = PostFactory.create(status=Post.Status.PUBLISHED, tags=["django"])
+
+        response = self.client.get(self.list_url)
+        self.assertEqual(response["X-Page-Cache"], "miss")
+        self.assertContains(response, "written 3 posts")
+        self.assertEqual(list(self.client.get(django_detail).context["similar_posts"]), [post])
+
+    @override_settings(BLOG_PAGE_CACHE=False)
+    def test_disabled(self) -> None:
+        self.client.get(self.list_url)
+
+        self.assertFalse(self._cached(self.list_url))
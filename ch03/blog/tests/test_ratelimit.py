@@ -0,0 +1,109 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..factories import PostFactory
+from ..models import Comment, Post
+from ..ratelimit import Rate, _take, limited_count
+
+
+class RateTestCase(TestCase):
+    def test_parse(self) -> None:
+        self.assertEqual(Rate.parse("5/m"), Rate(5, 60))
+        self.assertEqual(Rate.parse("100/hour"), Rate(100, 3600))
+        for rate in ("5/x", "5", "0/m", "five/m"):
+            with self.subTest(rate=rate), self.assertRaises(ValueError):
+                Rate.parse(rate)
+
+    def test_concurrent_requests_share_the_limit(self) -> None:
+        cache.clear()
+        with (
+            mock.patch("blog.ratelimit.time.time", return_value=1020.0),
+            ThreadPoolExecutor(8) as executor,
+        ):
+            waits = list(executor.map(lambda _: _take("blog:test", Rate(5, 60)), range(40)))
+
+        self.assertEqual(waits.count(0), 5)
+
+
+@override_settings(BLOG_RATELIMITS={"post_comment": "2/m", "post_share": "1/m"})
+class RateLimitViewTestCase(TestCase):
+    post: Post
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.post = PostFactory.create(status=Post.Status.PUBLISHED)
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.comment_url = reverse("blog:post_comment", args=[self.post.id])
+        self.share_url = reverse("blog:post_share", args=[self.post.id])
+        self.comment = {"name": "Bot", "email": "bot@example.com", "body": "Spam"}
+
+    def test_burst_then_limited(self) -> None:
+        with mock.patch("blog.ratelimit.time.time", return_value=1020.0):
+            for _ in range(2):
+                response = self.client.post(self.comment_url, data=self.comment)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+
+            with self.assertNumQueries(0):
+                response = self.client.post(self.comment_url, data=self.comment)
+
+        self.assertEqual(response.status_code, HTTPStatus.TOO_MANY_REQUESTS)
+        # Half into the next minute, the first one weighs 1 request.
+        self.assertEqual(response["Retry-After"], "90")
+        self.assertEqual(Comment.objects.count(), 2)
+        self.assertEqual(limited_count("post_comment"), 1)
+
+    def test_window_slides_over_time(self) -> None:
+        with mock.patch("blog.ratelimit.time.time", return_value=1000.0):
+            self.client.post(self.share_url, data={})
+            response = self.client.post(self.share_url, data={})
+            self.assertEqual(response.status_code, HTTPStatus.TOO_MANY_REQUESTS)
+            self.assertEqual(response["Retry-After"], "80")
+
+        # A third of the window before still counts.
+        with mock.patch("blog.ratelimit.time.time", return_value=1060.0):
+            response = self.client.post(self.share_url, data={})
+            self.assertEqual(response.status_code, HTTPStatus.TOO_MANY_REQUESTS)
+
+        with mock.patch("blog.ratelimit.time.time", return_value=1080.0):
+            response = self.client.post(self.share_url, data={})
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_clients_have_separate_buckets(self) -> None:
+        self.client.post(self.share_url, data={}, REMOTE_ADDR="10.0.0.1")
+        response = self.client.post(self.share_url, data={}, REMOTE_ADDR="10.0.0.2")
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_rejected_requests_do_not_count(self) -> None:
+        with mock.patch("blog.ratelimit.time.time", return_value=1020.0):
+            for _ in range(5):
+                self.client.post(self.comment_url, data=self.comment)
+
+        # Half into the next minute, only the 2 accepted comments weigh 1.
+        with mock.patch("blog.ratelimit.time.time", return_value=1110.0):
+            response = self.client.post(self.comment_url, data=self.comment)
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_get_requests_are_not_limited(self) -> None:
+        for _ in range(3):
+            response = self.client.get(self.share_url)
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_stats_command(self) -> None:
+        for _ in range(3):
+            self.client.post(self.share_url, data={})
+        out = io.StringIO()
+
+        call_command("ratelimit_stats", stdout=out)
+
+        self.assertIn("post_share (1/m): 2 limited", out.getvalue())
@@ -0,0 +1,113 @@
+import multiprocessing
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase
+
+from ..shmcache import WAYS, SharedMemoryCache
+
+OPTIONS = {"MAX_ENTRIES": 64, "MAX_VALUE_SIZE": 1024}
+
+
+def _set_in_child(location: str) -> None:
+    SharedMemoryCache(location, {"OPTIONS": OPTIONS}).set("key", "from another process")
+
+
+class SharedMemoryCacheTestCase(SimpleTestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.location = str(Path(directory.name) / "cache")
+        self.cache = self._cache()
+
+    def _cache(self, **options: int) -> SharedMemoryCache:
+        return SharedMemoryCache(self.location, {"OPTIONS": {**OPTIONS, **options}})
+
+    def test_set_get_delete(self) -> None:
+        self.cache.set("key", {"posts": [1, 2]})
+
+        self.assertEqual(self.cache.get("key"), {"posts": [1, 2]})
+        self.assertTrue(self.cache.delete("key"))
+        self.assertIsNone(self.cache.get("key"))
+        self.assertFalse(self.cache.delete("key"))
+
+    def test_add(self) -> None:
+        self.assertTrue(self.cache.add("key", 1))
+        self.assertFalse(self.cache.add("key", 2))
+        self.assertEqual(self.cache.get("key"), 1)
+
+    def test_incr(self) -> None:
+        self.cache.set("key", 1)
+
+        self.assertEqual(self.cache.incr("key", 2), 3)
+        self.assertEqual(self.cache.decr("key"), 2)
+        with self.assertRaises(ValueError):
+            self.cache.incr("missing")
+
+    def test_expiry(self) -> None:
+        self.cache.set("key", 1, timeout=10)
+        self.cache.set("forever", 1, timeout=None)
+
+        with mock.patch("blog.shmcache.time.time", return_value=time.time() + 11):
+            self.assertIsNone(self.cache.get("key"))
+            self.assertEqual(self.cache.get("forever"), 1)
+            self.assertTrue(self.cache.add("key", 2))
+
+    def test_touch(self) -> None:
+        self.cache.set("key", 1, timeout=10)
+
+        self.assertTrue(self.cache.touch("key", timeout=None))
+
+        with mock.patch("blog.shmcache.time.time", return_value=time.time() + 11):
+            self.assertEqual(self.cache.get("key"), 1)
+
+    def test_large_values_are_not_cached(self) -> None:
+        self.cache.set("key", "small")
+        self.cache.set("key", "x" * 2048)
+
+        self.assertIsNone(self.cache.get("key"))
+        self.assertFalse(self.cache.add("other", "x" * 2048))
+
+    def test_long_keys(self) -> None:
+        key = "k" * 300
+        with self.assertWarns(Warning):
+            self.cache.set(key, 1)
+        with self.assertWarns(Warning):
+            self.assertEqual(self.cache.get(key), 1)
+
+    def test_clock_gives_read_entries_a_second_chance(self) -> None:
+        cache = self._cache(MAX_ENTRIES=WAYS)
+        for i in range(WAYS):
+            cache.set(i, i)
+        cache.get(0)
+
+        cache.set("new", 1)
+
+        self.assertEqual(cache.get(0), 0)
+        self.assertIsNone(cache.get(1))
+        self.assertEqual(cache.get("new"), 1)
+
+    def test_clear(self) -> None:
+        self.cache.set("key", 1)
+
+        self.cache.clear()
+
+        self.assertIsNone(self.cache.get("key"))
+
+    def test_shared_between_processes(self) -> None:
+        process = multiprocessing.get_context("fork").Process(
+            target=_set_in_child, args=[self.location]
+        )
+        process.start()
+        process.join()
+
+        self.assertEqual(self.cache.get("key"), "from another process")
+
+    def test_other_options_are_rejected(self) -> None:
+        self.cache.set("key", 1)
+
+        with self.assertRaises(ImproperlyConfigured):
+            self._cache(MAX_VALUE_SIZE=2048).get("key")
@@ -0,0 +1,122 @@
+import io
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError
+from django.test import TestCase
+from taggit.models import Tag, TaggedItem
+
+from .. import autocomplete, bloom, lookups, snapshot, tagindex
+from ..factories import CommentFactory, PostFactory
+from ..models import Comment, Post
+
+
+class SnapshotTestCase(TestCase):
+    def setUp(self) -> None:
+        self.posts = PostFactory.create_batch(3, tags=["django", "python"])
+        PostFactory.create(tags=["flask"])
+        CommentFactory.create_batch(2, post=self.posts[0])
+
+    def _rows(self) -> dict[str, list[tuple[object, ...]]]:
+        return {
+            "users": list(User.objects.order_by("pk").values_list()),
+            "posts": list(Post.objects.order_by("pk").values_list()),
+            "comments": list(Comment.objects.order_by("pk").values_list()),
+            "tags": list(Tag.objects.order_by("pk").values_list()),
+            "tagged": list(
+                TaggedItem.objects.order_by("pk").values_list("pk", "tag_id", "object_id")
+            ),
+        }
+
+    @staticmethod
+    def _flush() -> None:
+        TaggedItem.objects.all().delete()
+        Tag.objects.all().delete()
+        User.objects.all().delete()
+
+    def test_round_trip_preserves_rows(self) -> None:
+        before = self._rows()
+        out = io.StringIO()
+        exported = snapshot.export(out)
+
+        self._flush()
+        self.assertFalse(Post.objects.exists())
+        imported = snapshot.load(io.StringIO(out.getvalue()), batch_size=3)
+
+        self.assertEqual(self._rows(), before)
+        self.assertEqual(imported.rows, exported.rows)
+        self.assertEqual(exported.rows["blog.comment"], 2)
+        self.assertEqual(exported.rows["taggit.taggeditem"], 7)
+
+    def test_imported_tags_are_usable(self) -> None:
+        out = io.StringIO()
+        snapshot.export(out)
+        self._flush()
+        snapshot.load(io.StringIO(out.getvalue()))
+
+        post = Post.objects.get(pk=self.posts[0].pk)
+        self.assertEqual(set(post.tags.names()), {"django", "python"})
+        self.assertEqual(Post.objects.filter(tags__name__in=["python"]).count(), 3)
+
+    def test_conflict_loads_nothing(self) -> None:
+        out = io.StringIO()
+        snapshot.export(out)
+        tag_id = Tag.objects.get(name="django").pk
+        self._flush()
+        # The users load, then a tag conflicts with this one.
+        Tag.objects.create(pk=tag_id, name="other", slug="other")
+        before = self._rows()
+
+        with self.assertRaises(IntegrityError):
+            snapshot.load(io.StringIO(out.getvalue()), batch_size=2)
+
+        self.assertEqual(self._rows(), before)
+
+    def test_commands(self) -> None:
+        before = self._rows()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / "blog.jsonl")
+            out = io.StringIO()
+            call_command("export_blog", path, stdout=out)
+            self.assertIn("rows/s", out.getvalue())
+
+            self._flush()
+            out = io.StringIO()
+            call_command("import_blog", path, batch_size=4, stdout=out)
+            self.assertIn("rows/s", out.getvalue())
+
+        self.assertEqual(self._rows(), before)
+
+    def test_malformed_snapshot_loads_nothing(self) -> None:
+        out = io.StringIO()
+        snapshot.export(out)
+        lines = out.getvalue().splitlines()
+        self._flush()
+        before = self._rows()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "blog.jsonl"
+            for bad in ('{"model": "blog.post"', '{"model": "auth.group", "fields": {}}'):
+                path.write_text("\n".join([*lines[:3], bad, *lines[3:]]))
+                with self.assertRaisesMessage(CommandError, "line 4:"):
+                    call_command("import_blog", str(path), stdout=io.StringIO())
+            with self.assertRaisesMessage(CommandError, "--batch-size"):
+                call_command("import_blog", str(path), batch_size=0, stdout=io.StringIO())
+
+        self.assertEqual(self._rows(), before)
+
+    def test_import_invalidates_caches(self) -> None:
+        versions = [bloom.VERSION_KEY, tagindex.VERSION_KEY, autocomplete.VERSION_KEY]
+        cache.set_many(dict.fromkeys(versions, "before"))
+        generation = lookups.post_key(1)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / "blog.jsonl")
+            call_command("export_blog", path, stdout=io.StringIO())
+            self._flush()
+            call_command("import_blog", path, stdout=io.StringIO())
+
+        for key in versions:
+            self.assertNotEqual(cache.get(key), "before", key)
+        self.assertNotEqual(lookups.post_key(1), generation)
@@ -0,0 +1,84 @@
+from collections.abc import AsyncIterator
+from http import HTTPStatus
+from typing import Any
+
+from django.http import StreamingHttpResponse
+from django.template import engines
+from django.template.loader import render_to_string
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from .. import streaming
+from ..factories import PostFactory
+from ..models import Post
+
+
+class StreamingTestCase(TestCase):
+    posts: list[Post]
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.posts = [
+            PostFactory.create(status=Post.Status.PUBLISHED, tags=["django"]) for _ in range(4)
+        ]
+
+    def _content(self, response: Any) -> str:
+        return b"".join(response.streaming_content).decode()
+
+    def test_stream_matches_render(self) -> None:
+        request = RequestFactory().get("/blog/")
+        context = {"posts": Post.published.all()[:3], "tag": None}
+
+        chunks = list(streaming.stream(request, "blog/post/list.html", context))
+
+        self.assertGreater(len(chunks), 1)
+        self.assertHTMLEqual(
+            "".join(chunks), render_to_string("blog/post/list.html", context, request)
+        )
+
+    def test_head_is_sent_before_queries(self) -> None:
+        request = RequestFactory().get("/blog/")
+        chunks = streaming.stream(request, "blog/post/list.html", {"posts": Post.published.all()})
+
+        with self.assertNumQueries(0):
+            head = next(chunks)
+            while "</head>" not in head:
+                head += next(chunks)
+        self.assertIn("blog.css", head)
+        self.assertNotIn(self.posts[0].title, head)
+
+    def test_block_super(self) -> None:
+        request = RequestFactory().get("/blog/")
+        template = engines["django"].from_string(
+            '{% extends "blog/post/list.html" %}'
+            "{% block title %}Tagged | {{ block.super }}{% endblock %}"
+        )
+
+        content = "".join(streaming._stream(template.template, request, {}))  # type: ignore[attr-defined]
+
+        self.assertIn("<title>Tagged | My Blog</title>", content)
+        self.assertHTMLEqual(content, template.render({}, request))
+
+    @override_settings(BLOG_STREAMING_RESPONSES=True)
+    def test_post_list_streams(self) -> None:
+        response = self.client.get(reverse("blog:post_list"))
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertIsInstance(response, StreamingHttpResponse)
+        content = self._content(response)
+        self.assertIn(self.posts[-1].title, content)
+        self.assertIn("I've written 4 posts", content)
+
+    def test_post_list_renders_by_default(self) -> None:
+        response = self.client.get(reverse("blog:post_list"))
+
+        self.assertNotIsInstance(response, StreamingHttpResponse)
+        self.assertEqual(response.context["posts"].paginator.count, 4)
+
+    async def test_content_is_async_under_asgi(self) -> None:
+        chunks = iter(["<html>", "</html>"])
+
+        content = streaming.content(AsyncRequestFactory().get("/blog/"), chunks)
+
+        assert isinstance(content, AsyncIterator)
+        self.assertEqual([chunk async for chunk in content], ["<html>", "</html>"])
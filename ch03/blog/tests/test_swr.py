@@ -0,0 +1,104 @@
+import time
+from unittest import mock
+
+from django.core.cache import cache as shared_cache
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+
+from .. import swr
+from ..factories import PostFactory
+from ..models import Post
+from ..tiered import cache
+
+
+class GetOrComputeTestCase(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.calls = 0
+
+    def _compute(self) -> int:
+        self.calls += 1
+        return self.calls
+
+    def _get(self) -> int:
+        value: int = swr.get_or_compute("key", self._compute, fresh_for=60, stale_for=60)
+        return value
+
+    def _expire(self) -> None:
+        value, _ = cache.get("key")
+        cache.set("key", (value, time.time() - 1))
+
+    def test_fresh_value_is_not_recomputed(self) -> None:
+        self.assertEqual(self._get(), 1)
+        self.assertEqual(self._get(), 1)
+        self.assertEqual(self.calls, 1)
+
+    def test_stale_value_is_recomputed_once(self) -> None:
+        self._get()
+        self._expire()
+
+        self.assertEqual(self._get(), 2)
+        self.assertEqual(self._get(), 2)
+        self.assertEqual(self.calls, 2)
+
+    def test_stale_value_is_served_while_another_worker_recomputes(self) -> None:
+        self._get()
+        self._expire()
+        shared_cache.add("key:lock", 1)
+
+        self.assertEqual(self._get(), 1)
+        self.assertEqual(self.calls, 1)
+
+    def test_missing_value_waits_for_another_worker(self) -> None:
+        shared_cache.add("key:lock", 1)
+
+        def computed_meanwhile(seconds: float) -> None:
+            cache.set("key", (42, time.time() + 60))
+
+        with mock.patch("blog.swr.time.sleep", side_effect=computed_meanwhile):
+            self.assertEqual(self._get(), 42)
+        self.assertEqual(self.calls, 0)
+
+    def test_missing_value_is_computed_if_the_other_worker_is_gone(self) -> None:
+        shared_cache.add("key:lock", 1)
+
+        with mock.patch.object(swr, "MISS_WAIT", 0):
+            self.assertEqual(self._get(), 1)
+
+    def test_lock_is_released_on_error(self) -> None:
+        def fail() -> int:
+            raise ValueError
+
+        with self.assertRaises(ValueError):
+            swr.get_or_compute("key", fail, fresh_for=60, stale_for=60)
+        self.assertIsNone(shared_cache.get("key:lock"))
+
+
+class CachedTestCase(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        PostFactory.create_batch(3, status=Post.Status.PUBLISHED)
+        self.template = Template("{% load blog_tags %}{% total_posts %}")
+
+    @override_settings(BLOG_STALE_WHILE_REVALIDATE=True)
+    def test_template_tag_is_cached(self) -> None:
+        self.assertEqual(self.template.render(Context()), "3")
+        PostFactory.create(status=Post.Status.PUBLISHED)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.template.render(Context()), "3")
+
+    @override_settings(BLOG_STALE_WHILE_REVALIDATE=True)
+    def test_arguments_are_part_of_the_key(self) -> None:
+        template = Template(
+            "{% load blog_tags %}{% get_most_commented_posts 1 as one %}"
+            "{% get_most_commented_posts 2 as two %}{{ one|length }}{{ two|length }}"
+        )
+
+        self.assertEqual(template.render(Context()), "12")
+
+    def test_disabled(self) -> None:
+        self.template.render(Context())
+        PostFactory.create(status=Post.Status.PUBLISHED)
+
+        self.assertEqual(self.template.render(Context()), "4")
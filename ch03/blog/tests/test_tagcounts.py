@@ -0,0 +1,77 @@
+from django.test import TestCase
+from django.urls import reverse
+from taggit.models import Tag
+
+from .. import tagcounts
+from ..factories import PostFactory
+from ..models import Post, TagCount
+from ..tiered import cache
+
+
+class TagCountsTestCase(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.post = PostFactory.create(status=Post.Status.PUBLISHED, tags=["django", "python"])
+        PostFactory.create(status=Post.Status.PUBLISHED, tags=["django"])
+        PostFactory.create(status=Post.Status.DRAFT, tags=["django", "python"])
+
+    def _counts(self) -> dict[str, int]:
+        return {c.tag.slug: c.published_posts for c in TagCount.objects.select_related("tag")}
+
+    def test_counts_published_posts(self) -> None:
+        self.assertEqual(self._counts(), {"django": 2, "python": 1})
+
+    def test_status_change(self) -> None:
+        self.post.status = Post.Status.DRAFT
+        self.post.save()
+
+        self.assertEqual(self._counts(), {"django": 1, "python": 0})
+
+    def test_retag(self) -> None:
+        self.post.tags.remove("python")
+        self.post.tags.add("orm")
+        self.assertEqual(self._counts(), {"django": 2, "python": 0, "orm": 1})
+
+        self.post.tags.clear()
+        self.assertEqual(self._counts(), {"django": 1, "python": 0, "orm": 0})
+
+    def test_delete(self) -> None:
+        self.post.delete()
+
+        self.assertEqual(self._counts(), {"django": 1, "python": 0})
+
+    def test_rebuild(self) -> None:
+        TagCount.objects.all().delete()
+        tagcounts.rebuild()
+
+        self.assertEqual(self._counts(), {"django": 2, "python": 1})
+
+    def test_cloud(self) -> None:
+        PostFactory.create_batch(8, status=Post.Status.PUBLISHED, tags=["django"])
+
+        cloud = tagcounts.cloud()
+
+        self.assertEqual([(t.slug, t.count) for t in cloud], [("django", 10), ("python", 1)])
+        self.assertEqual([t.weight for t in cloud], [tagcounts.WEIGHTS, 1])
+
+    def test_cloud_follows_changes(self) -> None:
+        tagcounts.cloud()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.tags.add("orm")
+        self.assertIn("orm", [t.slug for t in tagcounts.cloud()])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Tag.objects.filter(slug="orm").update(name="ORM")
+            Tag.objects.get(slug="orm").save()
+        self.assertIn("ORM", [t.name for t in tagcounts.cloud()])
+
+    def test_sidebar_cached(self) -> None:
+        self.client.get(reverse("blog:post_list"))
+        response = self.client.get(reverse("blog:post_list"))
+
+        self.assertContains(
+            response, f'href="{reverse("blog:post_list_by_tag", args=["django"])}"', html=False
+        )
+        self.assertContains(response, 'class="weight-5"')
+        with self.assertNumQueries(0):
+            tagcounts.cloud()
@@ -0,0 +1,170 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from taggit.models import Tag
+
+from .. import tagindex
+from ..factories import PostFactory
+from ..models import Post
+
+
+class PostIdsTestCase(SimpleTestCase):
+    def test_parse(self) -> None:
+        self.assertEqual(tagindex.parse("a+b"), (["a", "b"], True))
+        self.assertEqual(tagindex.parse("a,b"), (["a", "b"], False))
+        self.assertEqual(tagindex.parse("a"), (["a"], False))
+
+    def test_slices(self) -> None:
+        ids = list(range(100, 120))
+        bitmap = sum(1 << n for n in (0, 3, 8, 9, 15, 19))
+        post_ids = tagindex.PostIds(bitmap, ids)
+
+        self.assertEqual(len(post_ids), 6)
+        self.assertEqual(post_ids[0:3], [100, 103, 108])
+        self.assertEqual(post_ids[3:6], [109, 115, 119])
+        self.assertEqual(post_ids[5:9], [119])
+        self.assertEqual(post_ids[4], 115)
+        self.assertEqual(tagindex.PostIds(0, ids)[0:3], [])
+
+
+class TagPagesTestCase(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        now = timezone.now()
+        self.both = PostFactory.create(
+            status=Post.Status.PUBLISHED, tags=["django", "python"], publish=now
+        )
+        self.django = PostFactory.create(
+            status=Post.Status.PUBLISHED, tags=["django"], publish=now - timedelta(days=1)
+        )
+        self.python = PostFactory.create(
+            status=Post.Status.PUBLISHED, tags=["python"], publish=now - timedelta(days=2)
+        )
+        PostFactory.create(status=Post.Status.DRAFT, tags=["django", "python"])
+
+    def _posts(self, tags: str, page: int = 1) -> list[Post]:
+        url = reverse("blog:post_list_by_tag", args=[tags])
+        response = self.client.get(url, {"page": page})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        return list(response.context["posts"])
+
+    def test_all_tags(self) -> None:
+        self.assertEqual(self._posts("django+python"), [self.both])
+
+    def test_any_tag(self) -> None:
+        self.assertEqual(self._posts("django,python"), [self.both, self.django, self.python])
+
+    def test_heading(self) -> None:
+        response = self.client.get(reverse("blog:post_list_by_tag", args=["django+python"]))
+
+        self.assertContains(response, '"django" and "python"')
+        self.assertIsNone(response.context["tag"])
+
+    def test_unknown_tag(self) -> None:
+        url = reverse("blog:post_list_by_tag", args=["django+bogus"])
+
+        self.assertEqual(self.client.get(url).status_code, HTTPStatus.NOT_FOUND)
+
+
+@override_settings(BLOG_TAG_INDEX=True)
+class IndexedTagPagesTestCase(TagPagesTestCase):
+    def test_pagination(self) -> None:
+        older = [
+            PostFactory.create(
+                status=Post.Status.PUBLISHED,
+                tags=["python"],
+                publish=timezone.now() - timedelta(days=days),
+            )
+            for days in (3, 4, 5)
+        ]
+
+        self.assertEqual(self._posts("python", page=1), [self.both, self.python, *older[:1]])
+        self.assertEqual(len(self._posts("python", page=2)), 2)
+        self.assertEqual(self._posts("python", page=9), self._posts("python", page=2))
+
+    def test_retagging_updates_the_index_in_place(self) -> None:
+        self._posts("django+python")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.django.tags.add("python", "web")
+            self.both.tags.remove(Tag.objects.get(slug="django"))
+
+        tag_ids = list(Tag.objects.filter(slug__in=["python", "web"]).values_list("id", flat=True))
+        with self.assertNumQueries(0):
+            post_ids = tagindex.select(tag_ids, match_all=True)[0:3]
+        self.assertEqual(post_ids, [self.django.id])
+        self.assertEqual(self._posts("django+python"), [self.django])
+
+    def test_only_moving_published_posts_rebuilds_the_index(self) -> None:
+        self._posts("django")
+        version = cache.get(tagindex.VERSION_KEY)
+        draft = Post.objects.get(status=Post.Status.DRAFT)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            draft.title = "Still a draft"
+            draft.save()
+            self.django.title = "Edited"
+            self.django.save()
+        self.assertEqual(cache.get(tagindex.VERSION_KEY), version)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.django.publish = timezone.now() + timedelta(days=1)
+            self.django.save()
+        self.assertNotEqual(cache.get(tagindex.VERSION_KEY), version)
+        self.assertEqual(self._posts("django"), [self.django, self.both])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            draft.status = Post.Status.PUBLISHED
+            draft.save()
+        self.assertEqual(self._posts("django"), [self.django, self.both, draft])
+
+    def test_index_answers_without_queries(self) -> None:
+        self._posts("django,python")
+
+        tag_ids = [tag.id for tag in self.both.tags.all()]
+
+        with self.assertNumQueries(0):
+            post_ids = tagindex.select(tag_ids, match_all=False)[0:3]
+
+        self.assertEqual(post_ids, [self.both.id, self.django.id, self.python.id])
+
+    def test_facets(self) -> None:
+        PostFactory.create(status=Post.Status.PUBLISHED, tags=["python", "async"])
+        PostFactory.create(status=Post.Status.PUBLISHED, tags=["python", "async", "web"])
+
+        response = self.client.get(reverse("blog:post_list_by_tag", args=["python"]))
+
+        facets = [(facet.name, facet.count, slugs) for facet, slugs in response.context["facets"]]
+        self.assertEqual(
+            facets,
+            [
+                ("async", 2, "python+async"),
+                ("django", 1, "python+django"),
+                ("web", 1, "python+web"),
+            ],
+        )
+        self.assertContains(response, 'href="/blog/tag/python+async/"')
+
+    def test_facets_of_any_tag(self) -> None:
+        PostFactory.create(status=Post.Status.PUBLISHED, tags=["web", "async"])
+
+        response = self.client.get(reverse("blog:post_list_by_tag", args=["django,web"]))
+
+        facets = [(facet.name, facet.count, slugs) for facet, slugs in response.context["facets"]]
+        self.assertEqual(facets, [("async", 1, "async"), ("python", 1, "python")])
+
+    def test_facets_follow_renames(self) -> None:
+        url = reverse("blog:post_list_by_tag", args=["django"])
+        self.client.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            tag = Tag.objects.get(slug="python")
+            tag.name = "Python"
+            tag.save()
+
+        facet, _ = self.client.get(url).context["facets"][0]
+        self.assertEqual(facet.name, "Python")
@@ -0,0 +1,96 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from taggit.models import Tag, TaggedItem
+
+from .. import tagindex, tidytags
+from ..factories import PostFactory
+from ..models import Post, TagCount
+
+
+class TidyTagsTestCase(TestCase):
+    def setUp(self) -> None:
+        self.both = PostFactory.create(status=Post.Status.PUBLISHED, tags=["python", "Python"])
+        self.upper = PostFactory.create(status=Post.Status.PUBLISHED, tags=["Python"])
+        self.short = PostFactory.create(status=Post.Status.PUBLISHED, tags=["py", "python"])
+        self.lower = PostFactory.create(status=Post.Status.PUBLISHED, tags=[" PYTHON "])
+        Tag.objects.create(name="unused", slug="unused")
+
+    def _tidy(self, *args: str) -> str:
+        out = StringIO()
+        call_command("tidy_tags", *args, stdout=out)
+        return out.getvalue()
+
+    def _tags(self, post: Post) -> list[str]:
+        return sorted(post.tags.values_list("name", flat=True))
+
+    def test_normalize(self) -> None:
+        output = self._tidy("--normalize")
+
+        # The most used name is kept.
+        kept = Tag.objects.get(name="python")
+        self.assertFalse(Tag.objects.filter(name__in=["Python", " PYTHON "]).exists())
+        for post in (self.both, self.upper, self.lower):
+            self.assertEqual(self._tags(post), ["python"])
+        self.assertEqual(self._tags(self.short), ["py", "python"])
+        self.assertEqual(TagCount.objects.get(tag=kept).published_posts, 4)
+        self.assertIn("into python (2 tagged items moved)", output)
+
+    def test_merge_and_prune(self) -> None:
+        self._tidy("--merge", "py", "python", "--prune")
+
+        self.assertEqual(self._tags(self.short), ["python"])
+        self.assertFalse(Tag.objects.filter(slug__in=["py", "unused"]).exists())
+        self.assertEqual(TaggedItem.objects.count(), 5)
+
+    def test_merge_queries_independent_of_posts(self) -> None:
+        PostFactory.create_batch(20, status=Post.Status.PUBLISHED, tags=["py", "Python"])
+        python = Tag.objects.get(slug="python")
+        sources = list(Tag.objects.filter(name__in=["py", "Python"]))
+        # Not one per post
+        with self.assertNumQueries(9):
+            tidytags.merge(python, sources)
+
+        self.assertEqual(python.taggit_taggeditem_items.count(), 23)
+
+    @override_settings(BLOG_PAGE_CACHE=True)
+    def test_merge_purges_the_kept_tags_pages(self) -> None:
+        cache.clear()
+        PostFactory.create(status=Post.Status.PUBLISHED, tags=["py"])
+        url = reverse("blog:post_list_by_tag", args=["python"])
+        self.assertEqual(self.client.get(url).context["posts"].paginator.count, 2)
+        self.assertEqual(self.client.get(url)["X-Page-Cache"], "hit")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            tidytags.merge(Tag.objects.get(slug="python"), [Tag.objects.get(slug="py")])
+
+        response = self.client.get(url)
+        self.assertEqual(response["X-Page-Cache"], "miss")
+        self.assertEqual(response.context["posts"].paginator.count, 3)
+
+    @override_settings(BLOG_TAG_INDEX=True)
+    def test_merge_updates_the_tag_index(self) -> None:
+        cache.clear()
+        python = Tag.objects.get(slug="python")
+        self.assertEqual(len(tagindex.select([python.id], True)), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            tidytags.merge(python, list(Tag.objects.filter(name__in=["Python", " PYTHON "])))
+
+        self.assertEqual(len(tagindex.select([python.id], True)), 4)
+
+    def test_dry_run(self) -> None:
+        output = self._tidy("--normalize", "--prune", "--dry-run")
+
+        self.assertIn("Deleted unused", output)
+        self.assertEqual(Tag.objects.count(), 5)
+        self.assertEqual(self._tags(self.both), ["Python", "python"])
+
+    def test_errors(self) -> None:
+        with self.assertRaises(CommandError):
+            self._tidy()
+        with self.assertRaises(CommandError):
+            self._tidy("--merge", "nope", "python")
@@ -0,0 +1,189 @@
+from datetime import timedelta
+from http import HTTPStatus
+from unittest import mock
+
+from django.core.cache import cache as shared_cache
+from django.http import Http404
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from taggit.models import Tag
+
+from .. import lookups, tiered
+from ..factories import PostFactory
+from ..models import Post
+
+
+class LRUCacheTestCase(SimpleTestCase):
+    def test_evicts_least_recently_used(self) -> None:
+        lru = tiered.LRUCache(max_entries=2, ttl=60)
+        lru.set("a", 1)
+        lru.set("b", 2)
+        lru.get("a")
+        lru.set("c", 3)
+
+        self.assertEqual(lru.get("a"), 1)
+        self.assertIsNone(lru.get("b"))
+        self.assertEqual(len(lru), 2)
+
+    def test_evicts_expired(self) -> None:
+        lru = tiered.LRUCache(max_entries=2, ttl=60)
+        lru.set("a", 1)
+        lru.set("b", 2, ttl=1)
+
+        with mock.patch("blog.tiered.time.monotonic", return_value=lru._entries["b"][1]):
+            self.assertIsNone(lru.get("b"))
+            self.assertEqual(lru.get("a"), 1)
+
+
+class TwoTierCacheTestCase(SimpleTestCase):
+    def setUp(self) -> None:
+        self.cache = tiered.TwoTierCache(tiered.LRUCache(max_entries=10, ttl=60))
+        self.cache.clear()
+
+    def test_l1_hit_skips_shared_cache(self) -> None:
+        self.cache.set("key", [1])
+
+        with mock.patch.object(shared_cache, "get") as get:
+            self.assertEqual(self.cache.get("key"), [1])
+        get.assert_not_called()
+
+    def test_shared_hit_fills_l1(self) -> None:
+        shared_cache.set("key", "value")
+
+        self.assertEqual(self.cache.get("key"), "value")
+        self.assertEqual(self.cache.l1.get("key"), "value")
+
+    def test_values_are_copied(self) -> None:
+        self.cache.set("key", [1])
+        self.cache.get("key").append(2)
+
+        self.assertEqual(self.cache.get("key"), [1])
+
+    def test_delete_evicts_l1(self) -> None:
+        tiered.cache.set("key", "value")
+
+        tiered.cache.delete("key")
+
+        self.assertIsNone(tiered.cache.l1.get("key"))
+        self.assertIsNone(tiered.cache.get("key"))
+
+
+@override_settings(BLOG_LOOKUP_CACHE=True)
+class LookupsTestCase(TestCase):
+    def setUp(self) -> None:
+        tiered.cache.clear()
+        self.post = PostFactory.create(status=Post.Status.PUBLISHED, tags=["django"])
+        publish = timezone.localtime(self.post.publish)
+        self.date = (publish.year, publish.month, publish.day)
+
+    def test_post_lookup_is_cached(self) -> None:
+        lookups.published_post(*self.date, self.post.slug)
+
+        with self.assertNumQueries(0):
+            post = lookups.published_post(*self.date, self.post.slug)
+            self.assertEqual(post, self.post)
+            self.assertEqual(post.author, self.post.author)
+
+    def test_post_change_is_seen(self) -> None:
+        lookups.published_post(*self.date, self.post.slug)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.title = "Updated"
+            self.post.save()
+            # Evicted once committed, a request before would cache the old row again.
+            self.assertIsNotNone(tiered.cache.get(lookups.post_key(self.post.id)))
+
+        self.assertEqual(lookups.published_post(*self.date, self.post.slug).title, "Updated")
+
+    def test_old_url_is_gone_after_the_post_moves(self) -> None:
+        lookups.published_post(*self.date, self.post.slug)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.publish -= timedelta(days=1)
+            self.post.save()
+
+        with self.assertRaises(Http404):
+            lookups.published_post(*self.date, self.post.slug)
+
+    def test_unpublished_post_is_not_found(self) -> None:
+        lookups.published_post(*self.date, self.post.slug)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.status = Post.Status.DRAFT
+            self.post.save()
+
+        with self.assertRaises(Http404):
+            lookups.published_post(*self.date, self.post.slug)
+
+    def test_tag_lookup(self) -> None:
+        lookups.tag("django")
+        with self.assertNumQueries(0):
+            self.assertEqual(lookups.tag("django").name, "django")
+
+        tag = Tag.objects.get(slug="django")
+        with self.captureOnCommitCallbacks(execute=True):
+            tag.slug = "django-framework"
+            tag.save()
+
+        with self.assertRaises(Http404):
+            lookups.tag("django")
+
+    def test_post_detail_view(self) -> None:
+        url = self.post.get_absolute_url()
+        self.client.get(url)
+
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.context["post"], self.post)
+
+
+@override_settings(BLOG_NEGATIVE_LOOKUP_CACHE=True)
+class NegativeLookupsTestCase(TestCase):
+    def setUp(self) -> None:
+        tiered.cache.clear()
+        self.draft = PostFactory.create(status=Post.Status.DRAFT)
+        publish = timezone.localtime(self.draft.publish)
+        self.date = (publish.year, publish.month, publish.day)
+
+    def test_miss_is_cached(self) -> None:
+        with self.assertNumQueries(1), self.assertRaises(Http404):
+            lookups.published_post(*self.date, self.draft.slug)
+
+        with self.assertNumQueries(0), self.assertRaises(Http404):
+            lookups.published_post(*self.date, self.draft.slug)
+
+    def test_publishing_forgets_the_miss(self) -> None:
+        with self.assertRaises(Http404):
+            lookups.published_post(*self.date, self.draft.slug)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.draft.status = Post.Status.PUBLISHED
+            self.draft.save()
+
+        self.assertEqual(lookups.published_post(*self.date, self.draft.slug), self.draft)
+
+    def test_share_and_comment_views(self) -> None:
+        share_url = reverse("blog:post_share", args=[self.draft.id])
+        comment_url = reverse("blog:post_comment", args=[self.draft.id])
+        self.assertEqual(self.client.get(share_url).status_code, HTTPStatus.NOT_FOUND)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(share_url).status_code, HTTPStatus.NOT_FOUND)
+            self.assertEqual(self.client.post(comment_url).status_code, HTTPStatus.NOT_FOUND)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.draft.status = Post.Status.PUBLISHED
+            self.draft.save()
+
+        self.assertEqual(self.client.get(share_url).status_code, HTTPStatus.OK)
+
+    def test_creating_the_tag_forgets_the_miss(self) -> None:
+        with self.assertRaises(Http404):
+            lookups.tag("django")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Tag.objects.create(name="django", slug="django")
+
+        self.assertEqual(lookups.tag("django").name, "django")
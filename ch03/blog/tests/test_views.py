@@ -9,6 +9,7 @@ from django.urls import reverse
 from django.utils import timezone
 from taggit.models import Tag
 
+from .. import outbox
 from ..factories import CommentFactory, PostFactory
 from ..forms import CommentForm, EmailPostForm
 from ..models import Comment, Post
@@ -439,6 +440,9 @@ class PostShareViewTestCase(TestCase):
         form_data = PostShareViewTestCase._form_data()
 
         response = self.client.post(self.url, data=form_data)
+        # The view only queues the email, the worker sends it.
+        self.assertEqual(len(mail.outbox), 0)
+        outbox.deliver()
 
         # The test runner replaces the normal email backend with a testing backend.
         # https://docs.djangoproject.com/en/5.2/topics/testing/tools/#email-services
@@ -460,6 +464,7 @@ class PostShareViewTestCase(TestCase):
         form_data["email"] = "invalid-email"
 
         response = self.client.post(self.url, data=form_data)
+        outbox.deliver()
 
         # Check no email was sent
         self.assertEqual(len(mail.outbox), 0)
@@ -481,6 +486,7 @@ class PostShareViewTestCase(TestCase):
         }
 
         response = self.client.post(self.url, data=form_data)
+        outbox.deliver()
 
         # Check no email was sent
         self.assertEqual(len(mail.outbox), 0)
@@ -503,6 +509,7 @@ class PostShareViewTestCase(TestCase):
 
     def test_email_contains_absolute_url(self) -> None:
         _ = self.client.post(self.url, data=PostShareViewTestCase._form_data())
+        outbox.deliver()
 
         sent_email = mail.outbox[0]
         self.assertIn("http://", sent_email.body)
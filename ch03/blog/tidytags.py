@@ -0,0 +1,88 @@
+"""
+Bulk tag maintenance: merging duplicate tags and deleting unused ones.
+
+A merge moves the tagged items of the merged tags to the one kept with two
+statements, whatever the number of posts: one deletes the items whose post
+already has the kept tag, or another merged tag, the other points the rest at
+the kept tag. The update sends no signals, so the pages and the tag index
+showing the kept tag are invalidated explicitly. Deleting the merged tags
+then sends the signals the caches follow, and the kept tag is recounted once.
+"""
+
+from collections import defaultdict
+from collections.abc import Sequence
+
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Q
+from django.db.models.functions import Lower, Trim
+from taggit.models import Tag, TaggedItem
+
+from . import pagecache, tagcounts, tagindex
+
+
+def duplicates() -> list[list[Tag]]:
+    """
+    The tags whose names only differ in case or surrounding spaces, each group
+    the most used tag first.
+    """
+    keys = (
+        Tag.objects.annotate(key=Lower(Trim("name")))
+        .values("key")
+        .annotate(tags=Count("id"))
+        .filter(tags__gt=1)
+        .values_list("key", flat=True)
+    )
+    tags = (
+        Tag.objects.annotate(key=Lower(Trim("name")), items=Count("taggit_taggeditem_items"))
+        .filter(key__in=keys)
+        .order_by("-items", "id")
+    )
+    groups: defaultdict[str, list[Tag]] = defaultdict(list)
+    for tag in tags:
+        groups[tag.key].append(tag)
+    return [group for _, group in sorted(groups.items())]
+
+
+def merge(target: Tag, sources: Sequence[Tag]) -> int:
+    """
+    Move the tagged items of `sources` to `target` and delete them. Returns
+    the number of items moved.
+    """
+    source_ids = [tag.id for tag in sources if tag.id != target.id]
+    if not source_ids:
+        return 0
+    items = TaggedItem.objects.filter(tag_id__in=source_ids)
+    same_object = {
+        "content_type_id": OuterRef("content_type_id"),
+        "object_id": OuterRef("object_id"),
+    }
+    # An object can have a tag once.
+    items.filter(
+        Q(Exists(TaggedItem.objects.filter(tag_id=target.id, **same_object)))
+        | Q(
+            Exists(
+                TaggedItem.objects.filter(
+                    tag_id__in=source_ids, id__lt=OuterRef("id"), **same_object
+                )
+            )
+        )
+    ).delete()
+    moved: int = items.update(tag_id=target.id)
+    # The update sent no signals, the deletes do.
+    pagecache.purge_tag(target.id)
+    if tagindex.enabled():
+        # Others would rebuild without the change before the commit.
+        transaction.on_commit(tagindex.invalidate)
+    Tag.objects.filter(id__in=source_ids).delete()
+    tagcounts.refresh([target.id])
+    return moved
+
+
+def prune() -> list[str]:
+    """
+    Delete the tags of no object. Returns their names.
+    """
+    unused = Tag.objects.filter(~Exists(TaggedItem.objects.filter(tag_id=OuterRef("id"))))
+    names = sorted(unused.values_list("name", flat=True))
+    unused.delete()
+    return names
@@ -0,0 +1,121 @@
+"""
+A two-tier cache: a small LRU in each worker process (L1) in front of the
+shared Django cache (L2).
+
+L1 hits cost neither a round trip nor unpickling. Deleting a key sends
+`cache_invalidated`, which evicts it from this process's L1. Other processes
+evict it when the invalidation bus (`blog.bus`) is on, or else may serve their
+L1 entry until it expires, `BLOG_L1_CACHE["TTL"]` seconds at most.
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache as shared_cache
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from .signals import cache_invalidated
+
+MISSING = object()
+
+
+class LRUCache:
+    """
+    A thread-safe LRU of at most `max_entries`, each kept at most `ttl` seconds.
+    """
+
+    def __init__(self, max_entries: int, ttl: float) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[Any, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            value, expires = entry
+            if time.monotonic() >= expires:
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        expires = time.monotonic() + min(self.ttl, self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class TwoTierCache:
+    """
+    The subset of the Django cache API the blog uses, with an L1 in front.
+    Values are copied on the way out of L1, so callers may modify them.
+    """
+
+    def __init__(self, l1: LRUCache) -> None:
+        self.l1 = l1
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self.l1.get(key, MISSING)
+        if value is MISSING:
+            value = shared_cache.get(key, MISSING)
+            if value is MISSING:
+                return default
+            self.l1.set(key, value)
+        return copy.copy(value)
+
+    def set(self, key: str, value: Any, timeout: float | None = None) -> None:
+        shared_cache.set(key, value, timeout)
+        self.l1.set(key, copy.copy(value), timeout)
+
+    def delete(self, *keys: str) -> None:
+        """
+        Delete `keys` from the shared tier and from L1.
+        """
+        shared_cache.delete_many(keys)
+        cache_invalidated.send(sender=TwoTierCache, keys=set(keys))
+
+    def clear(self) -> None:
+        shared_cache.clear()
+        self.l1.clear()
+
+
+def _l1() -> LRUCache:
+    options = settings.BLOG_L1_CACHE
+    return LRUCache(options["MAX_ENTRIES"], options["TTL"])
+
+
+cache = TwoTierCache(_l1())
+
+
+@receiver(cache_invalidated)
+def _evict(keys: set[str], **kwargs: Any) -> None:
+    for key in keys:
+        cache.l1.delete(key)
+
+
+@receiver(setting_changed)
+def _reconfigure(setting: str, **kwargs: Any) -> None:
+    if setting == "BLOG_L1_CACHE":
+        cache.l1 = _l1()
@@ -1,17 +1,40 @@
-from django.urls import path
+from django.conf import settings
+from django.urls import URLPattern, path, register_converter
+from django.urls.converters import StringConverter
 
 from . import views
 from .feeds import LatestPostsFeed
 
 app_name = "blog"
 
-urlpatterns = [
-    # post views
-    path("", views.post_list, name="post_list"),
-    # path("", views.PostListView.as_view(), name="post_list"),
-    path("tag/<slug:tag_slug>/", views.post_list, name="post_list_by_tag"),
-    path("<int:year>/<int:month>/<int:day>/<slug:post>/", views.post_detail, name="post_detail"),
-    path("<int:post_id>/share/", views.post_share, name="post_share"),
-    path("<int:post_id>/comment/", views.post_comment, name="post_comment"),
-    path("feed/", LatestPostsFeed(), name="post_feed"),
-]
+
+class TagsConverter(StringConverter):
+    # A tag slug, or several joined by "+" for all of them or "," for any
+    regex = r"[-a-zA-Z0-9_]+(?:(?:\+[-a-zA-Z0-9_]+)+|(?:,[-a-zA-Z0-9_]+)+)?"
+
+
+register_converter(TagsConverter, "tags")
+
+
+def post_patterns(async_views: bool) -> list[URLPattern]:
+    # The native async read views avoid a thread hop per request under ASGI
+    post_list = views.apost_list if async_views else views.post_list
+    post_detail = views.apost_detail if async_views else views.post_detail
+    return [
+        # post views
+        path("", post_list, name="post_list"),
+        # path("", views.PostListView.as_view(), name="post_list"),
+        # path("", views.AsyncPostListView.as_view(), name="post_list"),
+        path("tag/<tags:tag_slug>/", post_list, name="post_list_by_tag"),
+        path("tags/autocomplete/", views.tag_autocomplete, name="tag_autocomplete"),
+        path("author/<str:username>/", views.post_author, name="post_author"),
+        path("<int:year>/", views.post_archive, name="post_archive_year"),
+        path("<int:year>/<int:month>/", views.post_archive, name="post_archive_month"),
+        path("<int:year>/<int:month>/<int:day>/<slug:post>/", post_detail, name="post_detail"),
+        path("<int:post_id>/share/", views.post_share, name="post_share"),
+        path("<int:post_id>/comment/", views.post_comment, name="post_comment"),
+        path("feed/", LatestPostsFeed(), name="post_feed"),
+    ]
+
+
+urlpatterns = post_patterns(settings.BLOG_ASYNC_VIEWS)
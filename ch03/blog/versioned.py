@@ -0,0 +1,80 @@
+"""
+Per-process structures built from the database, such as the Bloom filters and
+the in-memory indexes, kept in step across processes by a version in the
+shared cache.
+
+Each process builds its own on first use, and rebuilds it once the version
+moved. A change bumps the version once committed, so the other processes
+rebuild theirs. The process that made the change applies it to its own in
+place instead, if it had seen every change before it. Writes that send no
+signals must call `invalidate()`.
+"""
+
+import threading
+import uuid
+from collections.abc import Callable
+
+from django.core.cache import cache
+
+
+class Versioned[T]:
+    """
+    The value `build()` returns, rebuilt once the version under `key` moved or
+    `expired()` says so.
+    """
+
+    def __init__(
+        self, key: str, build: Callable[[], T], expired: Callable[[T], bool] = lambda value: False
+    ) -> None:
+        self.key = key
+        self.build = build
+        self.expired = expired
+        self.value: T | None = None
+        # The version `value` is up to date with
+        self.version = ""
+        self.lock = threading.Lock()
+
+    def _version(self) -> str:
+        version: str | None = cache.get(self.key)
+        if version is None:
+            cache.add(self.key, uuid.uuid4().hex, timeout=None)
+            version = cache.get(self.key)
+        return version or ""
+
+    def get(self) -> T:
+        version = self._version()
+        with self.lock:
+            if self.value is None or self.version != version or self.expired(self.value):
+                self.value = self.build()
+                self.version = version
+            return self.value
+
+    def invalidate(self) -> str:
+        """
+        Make every process rebuild its value. Returns the new version.
+        """
+        version = uuid.uuid4().hex
+        cache.set(self.key, version, timeout=None)
+        return version
+
+    def reset(self) -> None:
+        """
+        Drop the value of this process, rebuilt on next use.
+        """
+        with self.lock:
+            self.value = None
+
+    def update(self, change: Callable[[T], bool | None]) -> None:
+        """
+        Apply a committed `change` to the value of this process and make the
+        others rebuild theirs. `change` returns `False` if it can't be applied,
+        the value is then rebuilt on next use.
+        """
+        with self.lock:
+            up_to_date = self.value is not None and self.version == cache.get(self.key)
+            version = self.invalidate()
+            if self.value is None or not up_to_date or change(self.value) is False:
+                self.value = None
+                return
+            # This process has seen every change, it keeps its value.
+            self.version = version
@@ -1,55 +1,153 @@
-from django.core.mail import send_mail
-from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
-from django.db.models import Count
-from django.http import HttpRequest, HttpResponse
-from django.shortcuts import get_object_or_404, render
-from django.views.decorators.http import require_POST
+import asyncio
+import datetime
+from collections.abc import Callable, Iterable
+from dataclasses import asdict
+from typing import Any
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import close_old_connections
+from django.db.models import Count, QuerySet
+from django.http import Http404, HttpRequest, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.shortcuts import render
+from django.views import View
+from django.views.decorators.http import require_GET, require_POST
 from django.views.generic import ListView
 from taggit.models import Tag
 
+from . import (
+    archive,
+    authorstats,
+    autocomplete,
+    comment_buffer,
+    lookups,
+    outbox,
+    pagecache,
+    swr,
+    tagindex,
+)
 from .forms import CommentForm, EmailPostForm
 from .models import Post
+from .ratelimit import ratelimit
+from .streaming import render_streaming
+from .templatetags.blog_tags import SIDEBAR, sidebar_queries
 
 
-def post_list(request: HttpRequest, tag_slug: str | None = None) -> HttpResponse:
+@pagecache.cache_page(params=("page",))
+def post_list(
+    request: HttpRequest, tag_slug: str | None = None
+) -> HttpResponse | StreamingHttpResponse:
     all_posts = Post.published.all()
-    tag = None
+    tags, match_all = [], False
     if tag_slug:
-        tag = get_object_or_404(Tag, slug=tag_slug)
-        all_posts = all_posts.filter(tags__in=[tag])
-    paginator = Paginator(all_posts, 3)
+        slugs, match_all = tagindex.parse(tag_slug)
+        tags = [lookups.tag(slug) for slug in slugs]
+    _list_depends_on(request, tags)
     page_number = request.GET.get("page", 1)
+    facets: list[tagindex.Facet] = []
+    if tags and tagindex.enabled():
+        posts, facets = _indexed_page(all_posts, tags, match_all, page_number)
+    else:
+        posts = _page(Paginator(_tagged(all_posts, tags, match_all), 3), page_number)
+    context = _list_context(posts, tags, match_all, facets)
+    if settings.BLOG_STREAMING_RESPONSES:
+        return render_streaming(request, "blog/post/list.html", context)
+    return render(request, "blog/post/list.html", context)
+
+
+def _page(paginator: Paginator[Any], page_number: Any) -> Page[Any]:
     try:
-        posts = paginator.page(page_number)
+        return paginator.page(page_number)
     except PageNotAnInteger:
         # If page_number is not an integer get the first page
-        posts = paginator.page(1)
+        return paginator.page(1)
     except EmptyPage:
         # If page_number is out of range get last page of results
-        posts = paginator.page(paginator.num_pages)
-    return render(request, "blog/post/list.html", {"posts": posts, "tag": tag})
+        return paginator.page(paginator.num_pages)
 
 
-def post_detail(request: HttpRequest, year: int, month: int, day: int, post: str) -> HttpResponse:
-    p = get_object_or_404(
-        Post,
-        status=Post.Status.PUBLISHED,
-        slug=post,
-        publish__year=year,
-        publish__month=month,
-        publish__day=day,
+def _tagged(posts: QuerySet[Post], tags: list[Tag], match_all: bool) -> QuerySet[Post]:
+    if match_all or len(tags) <= 1:
+        for tag in tags:
+            posts = posts.filter(tags__in=[tag])
+        return posts
+    # A post with several of the tags would be listed once per tag.
+    return posts.filter(tags__in=tags).distinct()
+
+
+def _indexed_page(
+    posts: QuerySet[Post], tags: list[Tag], match_all: bool, page_number: Any
+) -> tuple[Page[Post], list[tagindex.Facet]]:
+    """
+    The page of the tagged posts, paginated over their ids in the tag index,
+    and the related tags of all of them.
+    """
+    tag_ids = [tag.id for tag in tags]
+    page = _page(Paginator(tagindex.select(tag_ids, match_all), 3), page_number)
+    by_id = posts.in_bulk(page.object_list)
+    # Without the posts unpublished since the index was built
+    page.object_list = [by_id[post_id] for post_id in page.object_list if post_id in by_id]
+    return page, tagindex.facets(tag_ids, match_all)
+
+
+def _list_context(
+    posts: Page[Post], tags: list[Tag], match_all: bool, facets: list[tagindex.Facet]
+) -> dict[str, Any]:
+    # Facets narrow the page down, except on pages of any of several tags.
+    narrow = [tag.slug for tag in tags] if match_all or len(tags) == 1 else []
+    return {
+        "posts": posts,
+        "tag": tags[0] if len(tags) == 1 else None,
+        "tags": tags,
+        "match_all": match_all,
+        "facets": [(facet, tagindex.MATCH_ALL.join([*narrow, facet.slug])) for facet in facets],
+    }
+
+
+@pagecache.cache_page(params=("page",))
+def post_archive(request: HttpRequest, year: int, month: int | None = None) -> HttpResponse:
+    try:
+        all_posts = archive.published_in(year, month)
+    except ValueError:
+        raise Http404("No such year or month.") from None
+    _list_depends_on(request, [])
+    posts = _page(Paginator(all_posts, 3), request.GET.get("page", 1))
+    context = _list_context(posts, [], False, [])
+    context.update(period=datetime.date(year, month or 1, 1), month=month)
+    return render(request, "blog/post/list.html", context)
+
+
+def post_author(request: HttpRequest, username: str) -> HttpResponse:
+    # The author and their totals in one query, their posts and tags in two more
+    try:
+        author = User.objects.select_related("blog_stats").get(
+            username=username, blog_stats__published_posts__gt=0
+        )
+        posts, next_cursor = authorstats.page(author, request.GET.get("before"))
+    except User.DoesNotExist:
+        raise Http404("No author matches the given query.") from None
+    except ValueError:
+        raise Http404("Invalid page.") from None
+    return render(
+        request,
+        "blog/post/author.html",
+        {"author": author, "stats": author.blog_stats, "posts": posts, "next_cursor": next_cursor},
     )
 
+
+@pagecache.cache_page()
+def post_detail(request: HttpRequest, year: int, month: int, day: int, post: str) -> HttpResponse:
+    p = lookups.published_post(year, month, day, post)
+
     # List of active comments for this post
     comments = p.comments.filter(active=True)
     # Form for users to comment
     form = CommentForm()
 
-    post_tags_ids = p.tags.values_list("id", flat=True)
-    similar_posts = Post.published.filter(tags__in=post_tags_ids).exclude(id=p.id)
-    similar_posts = similar_posts.annotate(same_tags=Count("tags")).order_by(
-        "-same_tags", "-publish"
-    )[:4]
+    similar_posts = _similar_posts_list(p)
+    _detail_depends_on(request, p, p.tags.values_list("id", flat=True))
 
     return render(
         request,
@@ -58,6 +156,32 @@ def post_detail(request: HttpRequest, year: int, month: int, day: int, post: str
     )
 
 
+def _list_depends_on(request: HttpRequest, tags: list[Tag]) -> None:
+    groups = [pagecache.tag_group(tag.id) for tag in tags] or [pagecache.LIST]
+    pagecache.depends_on(request, *pagecache.SIDEBAR_GROUPS, pagecache.TAGS, *groups)
+
+
+def _detail_depends_on(request: HttpRequest, p: Post, tag_ids: Iterable[int]) -> None:
+    # Similar posts are picked among the posts sharing a tag.
+    similar = map(pagecache.tag_group, tag_ids)
+    pagecache.depends_on(
+        request, *pagecache.SIDEBAR_GROUPS, pagecache.TAGS, pagecache.post_group(p.id), *similar
+    )
+
+
+def _similar_posts(p: Post) -> QuerySet[Post]:
+    post_tags_ids = p.tags.values_list("id", flat=True)
+    similar_posts = Post.published.filter(tags__in=post_tags_ids).exclude(id=p.id)
+    return similar_posts.annotate(same_tags=Count("tags")).order_by("-same_tags", "-publish")[:4]
+
+
+# Its tag count annotation is among the most expensive queries of the blog.
+# Any post change may change the similar posts of the others.
+@swr.cached(fresh_for=5 * 60, stale_for=60 * 60, group=pagecache.LIST, key=lambda p: p.id)
+def _similar_posts_list(p: Post) -> list[Post]:
+    return list(_similar_posts(p))
+
+
 class PostListView(ListView[Post]):
     """
     Alternative post list view
@@ -69,9 +193,10 @@ class PostListView(ListView[Post]):
     template_name = "blog/post/list.html"
 
 
+@ratelimit("post_share")
 def post_share(request: HttpRequest, post_id: int) -> HttpResponse:
     # Retrieve post by id
-    post = get_object_or_404(Post, id=post_id, status=Post.Status.PUBLISHED)
+    post = lookups.published_post_by_id(post_id)
     sent = False
 
     if request.method == "POST":
@@ -85,13 +210,9 @@ def post_share(request: HttpRequest, post_id: int) -> HttpResponse:
             message = (
                 f"Read {post.title} at {post_url}\n\n{cd['name']}'s comments: {cd['comments']}"
             )
-            send_mail(
-                subject=subject,
-                message=message,
-                from_email=None,
-                recipient_list=[cd["to"]],
-                fail_silently=False,
-            )
+            # Delivered by the `send_queued_mail` worker, so the request
+            # doesn't wait on the mail server.
+            outbox.enqueue(subject=subject, body=message, to=cd["to"])
             sent = True
 
     else:
@@ -103,10 +224,20 @@ def post_share(request: HttpRequest, post_id: int) -> HttpResponse:
     )
 
 
+@require_GET
+def tag_autocomplete(request: HttpRequest) -> JsonResponse:
+    # The tags starting with `q`, the most used first, from the in-memory index
+    prefix = request.GET.get("q", "").strip()
+    suggestions = autocomplete.complete(prefix) if prefix else []
+    return JsonResponse({"tags": [asdict(s) for s in suggestions]})
+
+
+@ratelimit("post_comment")
 @require_POST
 def post_comment(request: HttpRequest, post_id: int) -> HttpResponse:
-    post = get_object_or_404(Post, id=post_id, status=Post.Status.PUBLISHED)
+    post = lookups.published_post_by_id(post_id)
     comment = None
+    pending = False
     # A comment was posted
     form = CommentForm(data=request.POST)
     if form.is_valid():
@@ -114,10 +245,150 @@ def post_comment(request: HttpRequest, post_id: int) -> HttpResponse:
         comment = form.save(commit=False)
         # Assign the post to the comment
         comment.post = post
-        # Save the comment to the database
-        comment.save()
+        if comment_buffer.enabled():
+            # Inserted later in a batch by `flush_comments`
+            comment_buffer.append(post, form.cleaned_data)
+            pending = True
+        else:
+            # Save the comment to the database
+            comment.save()
     return render(
         request,
         "blog/post/comment.html",
-        {"post": post, "form": form, "comment": comment},
+        {"post": post, "form": form, "comment": comment, "pending": pending},
+    )
+
+
+# Native async versions of the read views, for ASGI deployments (`ch03.asgi`).
+# Queries go through the async ORM API, only template rendering runs in a thread.
+
+
+async def apaginate(queryset: QuerySet[Post], per_page: int, page_number: Any) -> Page[Post]:
+    """
+    `Paginator.page()` with the same fallbacks as `post_list`, using `acount()`
+    and async iteration instead of the synchronous queries of `Paginator`.
+    """
+    paginator = Paginator(queryset, per_page)
+    # Prime the cached property, so `num_pages` doesn't run a synchronous COUNT
+    paginator.count = await queryset.acount()
+    try:
+        number = paginator.validate_number(page_number)
+    except PageNotAnInteger:
+        # If page_number is not an integer get the first page
+        number = 1
+    except EmptyPage:
+        # If page_number is out of range get last page of results
+        number = paginator.num_pages
+    bottom = (number - 1) * per_page
+    posts = [post async for post in queryset[bottom : bottom + per_page]]
+    return Page(posts, number, paginator)
+
+
+async def arender(
+    request: HttpRequest, template_name: str, context: dict[str, Any]
+) -> HttpResponse:
+    return await sync_to_async(render)(request, template_name, context)
+
+
+def _run_query(query: Callable[[], Any]) -> Any:
+    try:
+        return query()
+    finally:
+        # Worker threads outlive the request, their connections must not.
+        close_old_connections()
+
+
+async def agather(queries: dict[str, Callable[[], Any]]) -> dict[str, Any]:
+    """
+    Run independent ORM queries concurrently, each in a worker thread with its
+    own database connection, and return their results under the same keys.
+    The queries must not depend on uncommitted changes of the calling thread.
+    """
+    results = await asyncio.gather(
+        *(sync_to_async(_run_query, thread_sensitive=False)(q) for q in queries.values())
+    )
+    return dict(zip(queries, results, strict=True))
+
+
+def _listed_posts() -> QuerySet[Post]:
+    # Everything `list.html` reads per post, so rendering runs no queries for them
+    return Post.published.select_related("author").prefetch_related("tags")  # type: ignore[misc]
+
+
+@pagecache.cache_page(params=("page",))
+async def apost_list(
+    request: HttpRequest, tag_slug: str | None = None
+) -> HttpResponse | StreamingHttpResponse:
+    all_posts = _listed_posts()
+    tags, match_all = [], False
+    if tag_slug:
+        slugs, match_all = tagindex.parse(tag_slug)
+        tags = [await lookups.atag(slug) for slug in slugs]
+    _list_depends_on(request, tags)
+    page_number = request.GET.get("page", 1)
+    facets: list[tagindex.Facet] = []
+    if tags and tagindex.enabled():
+        indexed_page = sync_to_async(_indexed_page)
+        posts, facets = await indexed_page(all_posts, tags, match_all, page_number)
+    else:
+        posts = await apaginate(_tagged(all_posts, tags, match_all), 3, page_number)
+    context = _list_context(posts, tags, match_all, facets)
+    if settings.BLOG_STREAMING_RESPONSES:
+        return render_streaming(request, "blog/post/list.html", context)
+    return await arender(request, "blog/post/list.html", context)
+
+
+@pagecache.cache_page()
+async def apost_detail(
+    request: HttpRequest, year: int, month: int, day: int, post: str
+) -> HttpResponse:
+    p = await lookups.apublished_post(year, month, day, post)
+
+    # Independent of each other once the post is known
+    results = await agather(
+        {
+            "comments": lambda: list(p.comments.filter(active=True)),
+            "similar_posts": lambda: _similar_posts_list(p),
+            "tag_ids": lambda: list(p.tags.values_list("id", flat=True)),
+            **sidebar_queries(),
+        }
     )
+    comments = results.pop("comments")
+    similar_posts = results.pop("similar_posts")
+    _detail_depends_on(request, p, results.pop("tag_ids"))
+    # Form for users to comment
+    form = CommentForm()
+
+    return await arender(
+        request,
+        "blog/post/detail.html",
+        {
+            "post": p,
+            "comments": comments,
+            "form": form,
+            "similar_posts": similar_posts,
+            SIDEBAR: results,
+        },
+    )
+
+
+class AsyncPostListView(View):
+    """
+    Alternative async post list view
+    """
+
+    paginate_by = 3
+    template_name = "blog/post/list.html"
+
+    async def get(self, request: HttpRequest) -> HttpResponse:
+        page = await apaginate(_listed_posts(), self.paginate_by, request.GET.get("page", 1))
+        return await arender(
+            request,
+            self.template_name,
+            {
+                "posts": page.object_list,
+                "page_obj": page,
+                "paginator": page.paginator,
+                "is_paginated": page.has_other_pages(),
+            },
+        )
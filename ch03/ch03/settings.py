@@ -133,3 +133,65 @@ STATIC_URL = "static/"
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
+
+# Append comments to this file and insert them in batches with `flush_comments`,
+# instead of one INSERT per comment. Disabled when `None`.
+BLOG_COMMENT_BUFFER: Path | None = None
+
+# Limits per client for the blog's write views, e.g.
+# {"post_comment": "5/m", "post_share": "3/m"} allows 5 comments in any minute.
+# A missing entry disables the limit. Needs a default cache shared by the worker
+# processes, which keeps the counters.
+BLOG_RATELIMITS: dict[str, str] = {}
+
+# Route the blog's read views to their native async versions. Only worth it when
+# serving `ch03.asgi:application`, under WSGI each request would start an event loop.
+BLOG_ASYNC_VIEWS = False
+
+# Stream the post list pages while they render, so the head reaches the browser
+# before the page's queries run. Errors past the first chunk truncate the page
+# instead of returning a 500.
+BLOG_STREAMING_RESPONSES = False
+
+# Cache the blog's read pages for readers without a session cookie. Pages are
+# purged when the posts, comments or tags they show change, so the timeout
+# only bounds how long an unpopular page takes up space.
+BLOG_PAGE_CACHE = False
+BLOG_PAGE_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Cache the sidebar and similar posts, serving stale values while a single
+# worker recomputes them, instead of every worker querying at once on expiry.
+BLOG_STALE_WHILE_REVALIDATE = False
+
+# Make identical concurrent requests for a blog page that isn't cached wait for
+# one of them to render it: "local" within a process, "shared" also across
+# processes through the cache. Disabled when `None`.
+BLOG_COALESCE_REQUESTS: str | None = None
+
+# Per-process LRU in front of the shared cache for the blog's hottest lookups.
+# Entries changed by another process are served until they expire, unless
+# `BLOG_INVALIDATION_BUS` is on.
+BLOG_L1_CACHE = {"MAX_ENTRIES": 1000, "TTL": 30}
+
+# Cache the post and tag lookups by slug of the read views in both tiers.
+BLOG_LOOKUP_CACHE = False
+
+# Remember for a minute the post and tag lookups that found nothing, so
+# repeated requests for unpublished or deleted posts get a 404 without a query.
+BLOG_NEGATIVE_LOOKUP_CACHE = False
+
+# Broadcast the keys deleted from the two-tier cache to every worker process on
+# the host through a change-log table, polled at the start of requests.
+BLOG_INVALIDATION_BUS = False
+
+# Answer requests for post URLs and tag slugs that don't exist with a 404 from a
+# per-process Bloom filter, without a query. Needs a cache shared by the worker
+# processes, through which they learn of new posts and tags.
+BLOG_BLOOM_FILTER = False
+
+# Answer the tag pages, including those of several tags (`/blog/tag/a+b/` for
+# posts with all of them, `/blog/tag/a,b/` with any), from in-memory bitmaps of
+# each tag's posts instead of joins, and show the related tags of their posts
+# with counts. Needs a cache shared by the worker processes, through which they
+# learn of changes.
+BLOG_TAG_INDEX = False